@@ -3,14 +3,26 @@ from __future__ import annotations
 import json
 import logging
 import os
+import sys
 from logging import FileHandler, Formatter, StreamHandler
 
 import click
 
-from molid.db.db_utils import create_offline_db
+from molid.client import search_config_from_app
+from molid.db.compact_index import enable_compact_index
+from molid.db.composition import build_compositions
+from molid.db.db_utils import create_offline_db, initialize_database
+from molid.db.name_index import enable_name_index
+from molid.db.name_keys import build_name_keys
 from molid.db.offline_db_cli import enrich_cas_database, update_database, use_database
+from molid.db.schema import MASS_INDEXES, master_extra_columns
 from molid.pipeline import search_from_file
-from molid.search.service import SearchConfig, SearchService
+from molid.search.batch import detect_format, read_queries, stream_batch
+from molid.search.inchikey_index import build_inchikey_index, inchikey_index_dir
+from molid.search.service import SearchService
+from molid.search.similarity import build_fingerprints, fingerprint_dir
+from molid.server import DEFAULT_HOST, DEFAULT_PORT, serve
+from molid.utils.metrics import load_stats, persist_stats
 from molid.utils.settings import load_config, save_config
 
 
@@ -78,6 +90,20 @@ def set_sources(sources: tuple[str, ...]) -> None:
     click.echo(f"✔ Default sources set to: {', '.join(normalized)}")
 
 
+@config.command("set-master-properties")
+@click.argument("properties", nargs=-1)
+def set_master_properties(properties: tuple[str, ...]) -> None:
+    """Set the optional PubChem properties ingested into the master DB."""
+    try:
+        columns = list(master_extra_columns(properties))
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    save_config(master_properties=json.dumps(columns))
+    click.echo(
+        f"✔ Master properties set to: {', '.join(columns) or '(core columns only)'}"
+    )
+
+
 @config.command("set-cache-writes")
 @click.argument("enabled", type=bool)
 def set_cache_writes(enabled: bool) -> None:
@@ -117,7 +143,7 @@ def db_create(db_path: str | None) -> None:
     """Initialize a new offline DB."""
     cfg = load_config()
     final_path = db_path or cfg.master_db or "pubchem_data_FULL.db"
-    create_offline_db(final_path)
+    create_offline_db(final_path, cfg.master_properties)
     click.echo(f"Initialized master DB at {final_path}")
 
 
@@ -150,6 +176,7 @@ def db_update(
         max_files=max_files or cfg.max_files,
         download_folder=download_folder or cfg.download_folder,
         processed_folder=processed_folder or cfg.processed_folder,
+        properties=cfg.master_properties,
     )
     click.echo(f"Updated database at {path}")
 
@@ -218,15 +245,135 @@ def db_enrich_cas(
     click.echo(f"CAS enrichment completed for {path}")
 
 
+@db.command("compact-index")
+@click.option("--db-file", "db_path", default=None, type=str, help="Path to master DB")
+@click.option(
+    "--keep-text-indexes",
+    is_flag=True,
+    help="Keep the TEXT identifier indexes (no space saving; lookups still use hashes).",
+)
+def db_compact_index(db_path: str | None, keep_text_indexes: bool) -> None:
+    """Index InChIKey/InChI/SMILES by 64-bit hashes instead of full text."""
+    cfg = load_config()
+    path = db_path or cfg.master_db
+    if not path or not os.path.isfile(path):
+        raise click.UsageError(
+            "No master DB found; use `molid config set-master` or `--db-file`."
+        )
+    enable_compact_index(path, drop_text_indexes=not keep_text_indexes)
+    click.echo(f"Compact identifier index enabled for {path}")
+
+
+@db.command("name-index")
+@click.option("--db-file", "db_path", default=None, type=str, help="Path to master DB")
+def db_name_index(db_path: str | None) -> None:
+    """Build the full-text (FTS5) index over compound names."""
+    cfg = load_config()
+    path = db_path or cfg.master_db
+    if not path or not os.path.isfile(path):
+        raise click.UsageError(
+            "No master DB found; use `molid config set-master` or `--db-file`."
+        )
+    if not enable_name_index(path, "compound_data"):
+        raise click.ClickException("This SQLite build has no FTS5 support.")
+    click.echo(f"Name index ready for {path}")
+
+
+@db.command("fingerprints")
+@click.option("--db-file", "db_path", default=None, type=str, help="Path to master DB")
+def db_fingerprints(db_path: str | None) -> None:
+    """Build the fingerprint store used by similarity search (needs OpenBabel)."""
+    cfg = load_config()
+    path = db_path or cfg.master_db
+    if not path or not os.path.isfile(path):
+        raise click.UsageError(
+            "No master DB found; use `molid config set-master` or `--db-file`."
+        )
+    try:
+        n = build_fingerprints(path)
+    except ImportError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Fingerprinted {n} compounds into {fingerprint_dir(path)}")
+
+
+@db.command("inchikey-index")
+@click.option("--db-file", "db_path", default=None, type=str, help="Path to master DB")
+def db_inchikey_index(db_path: str | None) -> None:
+    """Export the memory-mapped InChIKey → CID array index of the master DB."""
+    cfg = load_config()
+    path = db_path or cfg.master_db
+    if not path or not os.path.isfile(path):
+        raise click.UsageError(
+            "No master DB found; use `molid config set-master` or `--db-file`."
+        )
+    n = build_inchikey_index(path)
+    click.echo(f"Indexed {n} InChIKeys into {inchikey_index_dir(path)}")
+
+
+@db.command("reindex")
+@click.option("--db-file", "db_path", default=None, type=str, help="Path to master DB")
+def db_reindex(db_path: str | None) -> None:
+    """Rebuild the derived lookup tables and mass indexes of the master DB."""
+    cfg = load_config()
+    path = db_path or cfg.master_db
+    if not path or not os.path.isfile(path):
+        raise click.UsageError(
+            "No master DB found; use `molid config set-master` or `--db-file`."
+        )
+    names = build_name_keys(path)
+    compounds = build_compositions(path)
+    initialize_database(path, MASS_INDEXES)
+    click.echo(
+        f"Indexed {names} normalized names and the element counts of "
+        f"{compounds} compounds in {path}"
+    )
+
+
 @cli.command("search")
-@click.argument("identifier", type=str)
+@click.argument("identifier", type=str, required=False)
 @click.option(
     "--id-type",
     type=click.Choice(["inchikey", "smiles", "cid", "name", "molecularformula", "cas"]),
     default="inchikey",
 )
-def do_search(identifier: str, id_type: str) -> None:
-    """Search for a molecule by identifier."""
+@click.option(
+    "--batch",
+    "batch_path",
+    type=click.Path(dir_okay=False, allow_dash=True),
+    default=None,
+    help="Read many identifiers from FILE ('-' for stdin); writes JSONL to stdout.",
+)
+@click.option(
+    "--format",
+    "batch_format",
+    type=click.Choice(["auto", "lines", "csv", "jsonl"]),
+    default="auto",
+    show_default=True,
+    help="Batch input format (auto: by file extension, else one identifier per line).",
+)
+@click.option("--column", default=None, help="CSV column holding the identifiers.")
+@click.option(
+    "--workers", type=int, default=4, show_default=True, help="Parallel batch workers."
+)
+@click.option(
+    "--chunk-size",
+    type=int,
+    default=256,
+    show_default=True,
+    help="Queries resolved together per batch worker call.",
+)
+def do_search(
+    identifier: str | None,
+    id_type: str,
+    batch_path: str | None,
+    batch_format: str,
+    column: str | None,
+    workers: int,
+    chunk_size: int,
+) -> None:
+    """Search for a molecule by identifier (or many with --batch)."""
+    if (identifier is None) == (batch_path is None):
+        raise click.UsageError("Pass either an IDENTIFIER or --batch FILE.")
     cfg = load_config()
     # Quick preflight for local sources
     sources = [
@@ -243,6 +390,36 @@ def do_search(identifier: str, id_type: str) -> None:
         raise click.UsageError(
             "No default cache DB; use `molid config set-cache` first."
         )
+    try:
+        if batch_path is not None:
+            fmt = detect_format(batch_path) if batch_format == "auto" else batch_format
+            with click.open_file(batch_path, "r", encoding="utf-8") as fh:
+                try:
+                    summary = stream_batch(
+                        _make_service(cfg, sources),
+                        read_queries(fh, fmt, id_type, column),
+                        sys.stdout,
+                        workers=workers,
+                        chunk_size=chunk_size,
+                    )
+                except ValueError as e:
+                    raise click.UsageError(str(e)) from e
+            click.echo(summary.format(), err=True)
+        else:
+            _run_search(cfg, sources, identifier, id_type)
+    finally:
+        _persist_stats(cfg.stats_file)
+
+
+def _make_service(cfg, sources: list[str]) -> SearchService:
+    return SearchService(
+        master_db=cfg.master_db,
+        cache_db=cfg.cache_db,
+        cfg=search_config_from_app(cfg, sources),
+    )
+
+
+def _run_search(cfg, sources: list[str], identifier: str, id_type: str) -> None:
     # If the user passed a readable file path, treat it as file input.
     # This ensures .xyz/.extxyz/.sdf go through the pipeline (and optional OpenBabel path).
     if os.path.isfile(identifier):
@@ -253,14 +430,7 @@ def do_search(identifier: str, id_type: str) -> None:
             click.echo(f"ERROR: {e}")
             return
     else:
-        svc = SearchService(
-            master_db=cfg.master_db,
-            cache_db=cfg.cache_db,
-            cfg=SearchConfig(
-                sources=sources,
-                cache_writes=bool(cfg.cache_writes),
-            ),
-        )
+        svc = _make_service(cfg, sources)
         try:
             results, source = svc.search({id_type: identifier})
         except RuntimeError as e:
@@ -270,6 +440,133 @@ def do_search(identifier: str, id_type: str) -> None:
     click.echo(json.dumps(results, indent=2))
 
 
+def _persist_stats(path: str) -> None:
+    try:
+        persist_stats(path)
+    except OSError as e:
+        logging.getLogger(__name__).debug("Could not persist stats to %s: %s", path, e)
+
+
+def _fmt_ms(v: float | None) -> str:
+    return "-" if v is None else f"{v:.1f}"
+
+
+@cli.command("stats")
+@click.option("--json", "as_json", is_flag=True, help="Print the raw snapshot.")
+@click.option("--reset", is_flag=True, help="Clear the accumulated statistics.")
+def do_stats(as_json: bool, reset: bool) -> None:
+    """Show lookup statistics accumulated by `molid search`."""
+    cfg = load_config()
+    if reset:
+        try:
+            os.remove(cfg.stats_file)
+        except FileNotFoundError:
+            pass
+        click.echo(f"Statistics reset ({cfg.stats_file})")
+        return
+
+    snap = load_stats(cfg.stats_file)
+    if as_json:
+        click.echo(json.dumps(snap, indent=2))
+        return
+
+    counters = snap.get("counters", {})
+    hists = snap.get("histograms", {})
+
+    def c(name: str) -> int:
+        return int(counters.get(name, 0))
+
+    click.echo(f"Stats file: {cfg.stats_file}")
+    click.echo(
+        f"Searches: {c('search.requests')} "
+        f"(resolved {c('search.resolved')}, unresolved {c('search.unresolved')}, "
+        f"result-cache hits {c('search.result_cache_hits')})"
+    )
+    click.echo("\nTier      hit   miss   skip  error  p50 ms  p95 ms")
+    for tier in ("master", "cache", "api"):
+        lat = hists.get(f"tier.{tier}.latency_ms") or hists.get(
+            f"tier.{tier}.batch_ms", {}
+        )
+        click.echo(
+            f"{tier:<7}{c(f'tier.{tier}.hit'):>6}{c(f'tier.{tier}.miss'):>7}"
+            f"{c(f'tier.{tier}.skip'):>7}{c(f'tier.{tier}.error'):>7}"
+            f"{_fmt_ms(lat.get('p50')):>8}{_fmt_ms(lat.get('p95')):>8}"
+        )
+    sql = hists.get("sql.query_ms", {})
+    click.echo(
+        f"\nSQL: {c('sql.statements')} statements, "
+        f"{_fmt_ms(sql.get('sum'))} ms total, p95 {_fmt_ms(sql.get('p95'))} ms"
+    )
+    http = hists.get("http.latency_ms", {})
+    per_lookup = hists.get("api.http_calls_per_lookup", {})
+    statuses = ", ".join(
+        f"{k.rsplit('.', 1)[-1]}: {int(v)}"
+        for k, v in counters.items()
+        if k.startswith("http.status.")
+    )
+    click.echo(
+        f"HTTP: {c('http.requests')} requests, {c('http.retries')} retries, "
+        f"{c('http.errors')} errors, {c('http.bytes')} bytes, "
+        f"p95 {_fmt_ms(http.get('p95'))} ms" + (f" [{statuses}]" if statuses else "")
+    )
+    mean = per_lookup.get("mean")
+    click.echo(
+        f"HTTP calls per API lookup: mean {'-' if mean is None else f'{mean:.2f}'}, "
+        f"max {per_lookup.get('max') if per_lookup.get('max') is not None else '-'}"
+    )
+
+
+@cli.command("serve")
+@click.option("--host", default=DEFAULT_HOST, show_default=True)
+@click.option("--port", type=int, default=DEFAULT_PORT, show_default=True)
+@click.option(
+    "--workers",
+    type=int,
+    default=8,
+    show_default=True,
+    help="Worker threads (max concurrently served connections).",
+)
+@click.option(
+    "--idle-timeout",
+    type=float,
+    default=2.0,
+    show_default=True,
+    help="Seconds an idle keep-alive connection may hold a worker.",
+)
+@click.option(
+    "--request-timeout",
+    type=float,
+    default=15.0,
+    show_default=True,
+    help="Seconds a client may stall while sending a request.",
+)
+@click.option(
+    "--max-queued",
+    type=int,
+    default=64,
+    show_default=True,
+    help="Connections waiting for a worker before new ones get 503.",
+)
+def do_serve(
+    host: str,
+    port: int,
+    workers: int,
+    idle_timeout: float,
+    request_timeout: float,
+    max_queued: int,
+) -> None:
+    """Serve lookups over a local HTTP/JSON API."""
+    click.echo(f"Serving MolID on http://{host}:{port} ({workers} workers)", err=True)
+    serve(
+        host=host,
+        port=port,
+        workers=workers,
+        idle_timeout=idle_timeout,
+        request_timeout=request_timeout,
+        max_queued=max_queued,
+    )
+
+
 @config.command("set-cas-expand")
 @click.argument("enabled", type=bool)
 def set_cas_expand(enabled: bool) -> None:
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections.abc import Sequence
+from typing import Any
+
+from molid.db.composition import Composition
+from molid.search.service import SearchConfig, SearchService
+from molid.utils import settings
+from molid.utils.settings import AppConfig, load_config
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["MolIDClient", "get_client", "search_config_from_app"]
+
+
+def _settings_fingerprint() -> tuple[Any, ...]:
+    """
+    Cheap identity of everything that feeds AppConfig: the MOLID_* environment
+    and the (mtime, size) of the env file(s). Changes trigger a rebuild.
+    """
+    env = tuple(sorted((k, v) for k, v in os.environ.items() if k.startswith("MOLID_")))
+    files = []
+    for f in dict.fromkeys(
+        [str(settings.ENV_FILE), str(AppConfig.model_config.get("env_file") or "")]
+    ):
+        if not f:
+            continue
+        try:
+            st = os.stat(f)
+            files.append((f, st.st_mtime_ns, st.st_size))
+        except OSError:
+            files.append((f, None, None))
+    return env, tuple(files)
+
+
+class MolIDClient:
+    """
+    Long-lived, thread-safe holder of a SearchService built from the current
+    settings. The config snapshot, the service (and the resources it holds,
+    such as the cache schema check and capability probes) are reused across
+    lookups and rebuilt only when the settings change.
+
+    A service replaced after a settings change is not closed: callers still
+    holding it (in-flight lookups, or a reference taken from `service`) keep
+    using it. Once the last reference is dropped it is garbage collected,
+    which releases its result cache and shuts its API workers down.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._fingerprint: tuple[Any, ...] | None = None
+        self._config: AppConfig | None = None
+        self._service: SearchService | None = None
+
+    def _refresh(self) -> tuple[AppConfig, SearchService]:
+        fingerprint = _settings_fingerprint()
+        config, service = self._config, self._service
+        if (
+            config is not None
+            and service is not None
+            and fingerprint == self._fingerprint
+        ):
+            return config, service
+
+        with self._lock:
+            if (
+                self._config is None
+                or self._service is None
+                or fingerprint != self._fingerprint
+            ):
+                logger.debug("Building MolID search service from settings")
+                config = load_config()
+                service = _build_service(config)
+                # The old service is only dropped, not closed: other threads
+                # may still be searching with it (see the class docstring).
+                self._config, self._service = config, service
+                self._fingerprint = fingerprint
+            return self._config, self._service
+
+    @property
+    def config(self) -> AppConfig:
+        """Current configuration snapshot."""
+        return self._refresh()[0]
+
+    @property
+    def service(self) -> SearchService:
+        """Current SearchService (rebuilt if the settings changed)."""
+        return self._refresh()[1]
+
+    def search(
+        self,
+        query: dict[str, Any],
+        fields: Sequence[str] | None = None,
+        compact_records: bool = False,
+    ) -> tuple[list[dict[str, Any]], str]:
+        return self.service.search(query, fields, compact_records)
+
+    def search_many(
+        self,
+        queries: list[dict[str, Any]],
+        fields: Sequence[str] | None = None,
+        compact_records: bool = False,
+    ) -> list[tuple[list[dict[str, Any]], str] | None]:
+        return self.service.search_many(queries, fields, compact_records)
+
+    async def asearch(
+        self,
+        query: dict[str, Any],
+        fields: Sequence[str] | None = None,
+        compact_records: bool = False,
+    ) -> tuple[list[dict[str, Any]], str]:
+        return await self.service.asearch(query, fields, compact_records)
+
+    async def asearch_many(
+        self,
+        queries: list[dict[str, Any]],
+        fields: Sequence[str] | None = None,
+        compact_records: bool = False,
+    ) -> list[tuple[list[dict[str, Any]], str] | None]:
+        return await self.service.asearch_many(queries, fields, compact_records)
+
+    def search_names(
+        self, text: str, limit: int = 20, prefix: bool = True
+    ) -> tuple[list[dict[str, Any]], str]:
+        """Full-text name search of the local sources (see SearchService)."""
+        return self.service.search_names(text, limit=limit, prefix=prefix)
+
+    def search_composition(
+        self, composition: Composition, limit: int = 100
+    ) -> tuple[list[dict[str, Any]], str]:
+        """Master compounds by element-count ranges (see SearchService)."""
+        return self.service.search_composition(composition, limit=limit)
+
+    def search_mass(
+        self,
+        masses: Sequence[float],
+        ppm: float | None = 5.0,
+        da: float | None = None,
+        column: str = "MonoisotopicMass",
+        limit: int | None = None,
+    ) -> dict[float, list[dict[str, Any]]]:
+        """Master candidates per target mass within a ppm/Da window (see SearchService)."""
+        return self.service.search_mass(
+            masses, ppm=ppm, da=da, column=column, limit=limit
+        )
+
+    def search_similar(
+        self, smiles: str, k: int = 10, threshold: float = 0.0
+    ) -> tuple[list[dict[str, Any]], str]:
+        """Fingerprint nearest neighbours in the master DB (see SearchService)."""
+        return self.service.search_similar(smiles, k=k, threshold=threshold)
+
+    def stats(self) -> dict[str, Any]:
+        """Lookup statistics of the current service (see SearchService.stats)."""
+        return self.service.stats()
+
+    def reset(self) -> None:
+        """Drop the cached config and service; the next call rebuilds them."""
+        with self._lock:
+            if self._service is not None:
+                self._service.close()
+            self._fingerprint = self._config = self._service = None
+
+
+def search_config_from_app(
+    cfg: AppConfig, sources: Sequence[str] | None = None
+) -> SearchConfig:
+    """SearchConfig carrying the lookup settings of `cfg`; `sources` overrides its sources."""
+    return SearchConfig(
+        sources=list(cfg.sources if sources is None else sources),
+        cache_writes=bool(cfg.cache_writes),
+        result_cache_size=cfg.result_cache_size,
+        result_cache_ttl=cfg.result_cache_ttl,
+        negative_cache_ttl=cfg.negative_cache_ttl,
+        api_concurrency=cfg.api_concurrency,
+        master_readonly=cfg.master_readonly,
+        master_mmap_size=cfg.master_mmap_size,
+        master_cache_size=cfg.master_cache_size,
+        sqlite_journal_mode=cfg.sqlite_journal_mode,
+        sqlite_synchronous=cfg.sqlite_synchronous,
+        sqlite_cache_size=cfg.sqlite_cache_size,
+        sqlite_temp_store=cfg.sqlite_temp_store,
+        sqlite_busy_timeout=cfg.sqlite_busy_timeout,
+        sqlite_statement_cache=cfg.sqlite_statement_cache,
+    )
+
+
+def _build_service(cfg: AppConfig) -> SearchService:
+    from molid.pipeline import _sanity_check
+
+    _sanity_check(cfg.master_db, cfg.cache_db, cfg.sources)
+    return SearchService(
+        master_db=cfg.master_db, cache_db=cfg.cache_db, cfg=search_config_from_app(cfg)
+    )
+
+
+_client = MolIDClient()
+
+
+def get_client() -> MolIDClient:
+    """Return the process-wide MolIDClient."""
+    return _client
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any
+
+from molid.db.sqlite_manager import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+MASTER_TABLE = "compound_data"
+
+# Hash column → (source column, number of leading characters hashed or None)
+HASH_COLUMNS: dict[str, tuple[str, int | None]] = {
+    "InChIKeyHash": ("InChIKey", None),
+    "InChIKey14Hash": ("InChIKey", 14),
+    "InChIHash": ("InChI", None),
+    "SMILESHash": ("CanonicalSMILES", None),
+    "IsomericSMILESHash": ("IsomericSMILES", None),
+}
+
+# Normalized id_type → (hash column, SQL expression the hash was taken of)
+HASH_PROBES: dict[str, tuple[str, str]] = {
+    "inchikey": ("InChIKeyHash", "InChIKey"),
+    "inchikey14": ("InChIKey14Hash", "substr(InChIKey, 1, 14)"),
+    "inchi": ("InChIHash", "InChI"),
+    "canonicalsmiles": ("SMILESHash", "CanonicalSMILES"),
+    "isomericsmiles": ("IsomericSMILESHash", "IsomericSMILES"),
+}
+
+# Text indexes made redundant by the hash indexes
+TEXT_INDEXES = (
+    "idx_inchikey",
+    "idx_compound_inchikey14",
+    "idx_compound_inchi",
+    "idx_compound_canonicalsmiles",
+    "idx_compound_isomericsmiles",
+)
+
+_BACKFILL_BATCH = 50_000
+
+_enabled_cache: dict[str, tuple[int, bool]] = {}
+_enabled_lock = threading.Lock()
+
+
+def hash64(text: Any) -> int | None:
+    """Stable signed 64-bit hash (BLAKE2b) of a text value; None stays None."""
+    if text is None:
+        return None
+    digest = hashlib.blake2b(str(text).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little", signed=True)
+
+
+def _hash_index_name(column: str) -> str:
+    return f"idx_compound_{column.lower()}"
+
+
+def compact_index_enabled(db_file: str) -> bool:
+    """
+    True if the master DB carries the hashed identifier indexes.
+    The answer is cached per path until the file's mtime changes.
+    """
+    try:
+        mtime = os.stat(db_file).st_mtime_ns
+    except OSError:
+        return False
+    with _enabled_lock:
+        hit = _enabled_cache.get(db_file)
+        if hit is not None and hit[0] == mtime:
+            return hit[1]
+
+    row = DatabaseManager(db_file).query_one(
+        "SELECT 1 AS ok FROM sqlite_master WHERE type = 'index' AND name = ?",
+        [_hash_index_name("InChIKeyHash")],
+    )
+    enabled = row is not None
+    with _enabled_lock:
+        _enabled_cache[db_file] = (mtime, enabled)
+    return enabled
+
+
+def missing_hash_columns(db_file: str) -> list[str]:
+    """Hash columns whose source column exists but which are not yet added."""
+    db = DatabaseManager(db_file)
+    existing = {r["name"] for r in db.query_all(f"PRAGMA table_info({MASTER_TABLE})")}
+    return [
+        col
+        for col, (src, _) in HASH_COLUMNS.items()
+        if src in existing and col not in existing
+    ]
+
+
+def hash_row(record: dict[str, Any]) -> dict[str, Any]:
+    """Return the hash columns for one compound_data record."""
+    out: dict[str, Any] = {}
+    for col, (src, prefix) in HASH_COLUMNS.items():
+        value = record.get(src)
+        if value is not None and prefix is not None:
+            value = str(value)[:prefix]
+        out[col] = hash64(value)
+    return out
+
+
+def probe_value(id_type: str, id_value: Any) -> int | None:
+    """Hash of `id_value` as stored in the hash column for `id_type`."""
+    if id_type == "inchikey14":
+        id_value = str(id_value)[:14]
+    return hash64(id_value)
+
+
+def enable_compact_index(db_file: str, drop_text_indexes: bool = True) -> None:
+    """
+    Add INTEGER hash columns for InChIKey, its 14-char block, InChI and
+    both SMILES flavors to the master DB, backfill them, index them and
+    (optionally) drop the large TEXT indexes they replace.
+
+    Lookups keep comparing the full text, so hash collisions cannot produce
+    wrong matches. Safe to re-run (hash columns added by newer versions are
+    backfilled then); new ingests fill the hash columns.
+    """
+    with sqlite3.connect(db_file) as conn:
+        existing = {r[1] for r in conn.execute(f"PRAGMA table_info({MASTER_TABLE})")}
+        # Masters predating a source column (e.g. IsomericSMILES) skip its hash
+        hashed = {c: s for c, (s, _) in HASH_COLUMNS.items() if s in existing}
+        for col in hashed:
+            if col not in existing:
+                conn.execute(f"ALTER TABLE {MASTER_TABLE} ADD COLUMN {col} INTEGER")
+        conn.commit()
+
+        sources = sorted(set(hashed.values()))
+        set_clause = ", ".join(f"{col} = ?" for col in hashed)
+        pending = " OR ".join(
+            f"({col} IS NULL AND {src} IS NOT NULL)" for col, src in hashed.items()
+        )
+        last_cid = -1
+        total = 0
+        while True:
+            rows = conn.execute(
+                f"SELECT CID, {', '.join(sources)} FROM {MASTER_TABLE} "
+                f"WHERE CID > ? AND ({pending}) ORDER BY CID LIMIT ?",
+                [last_cid, _BACKFILL_BATCH],
+            ).fetchall()
+            if not rows:
+                break
+            updates = []
+            for cid, *values in rows:
+                hashes = hash_row(dict(zip(sources, values)))
+                updates.append([*(hashes[col] for col in hashed), cid])
+            conn.executemany(
+                f"UPDATE {MASTER_TABLE} SET {set_clause} WHERE CID = ?", updates
+            )
+            conn.commit()
+            last_cid = rows[-1][0]
+            total += len(rows)
+            logger.info("Hashed identifiers for %d compounds", total)
+
+        for col in hashed:
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {_hash_index_name(col)} "
+                f"ON {MASTER_TABLE}({col})"
+            )
+        if drop_text_indexes:
+            for name in TEXT_INDEXES:
+                conn.execute(f"DROP INDEX IF EXISTS {name}")
+        conn.commit()
+        if drop_text_indexes:
+            conn.execute("VACUUM")
+
+    with _enabled_lock:
+        _enabled_cache.pop(db_file, None)
+    logger.info("Compact identifier index enabled for %s", db_file)
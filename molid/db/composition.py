@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+from molid.db.sqlite_manager import DatabaseManager
+from molid.utils.formula import parse_formula
+
+logger = logging.getLogger(__name__)
+
+MASTER_TABLE = "compound_data"
+COMPOSITION_TABLE = "compound_elements"
+
+COMPOSITION_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS {COMPOSITION_TABLE} (
+    element     TEXT NOT NULL,            -- element symbol, e.g. 'Cl'
+    count       INTEGER NOT NULL,         -- atoms of `element` in MolecularFormula
+    CID         INTEGER NOT NULL,
+    PRIMARY KEY (element, count, CID)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_compound_elements_cid ON {COMPOSITION_TABLE}(CID);
+"""
+
+# Element symbol → exact count or inclusive (min, max) range; max None = open
+Composition = Mapping[str, int | tuple[int, int | None]]
+
+_BACKFILL_BATCH = 50_000
+_SYMBOL = re.compile(r"[A-Z][a-z]?")
+
+_enabled_cache: dict[str, tuple[int, bool]] = {}
+_enabled_lock = threading.Lock()
+
+
+def composition_enabled(db_file: str) -> bool:
+    """
+    True if the master DB carries the element-count table.
+    The answer is cached per path until the file's mtime changes.
+    """
+    try:
+        mtime = os.stat(db_file).st_mtime_ns
+    except OSError:
+        return False
+    with _enabled_lock:
+        hit = _enabled_cache.get(db_file)
+        if hit is not None and hit[0] == mtime:
+            return hit[1]
+
+    row = DatabaseManager(db_file).query_one(
+        "SELECT 1 AS ok FROM sqlite_master WHERE type = 'table' AND name = ?",
+        [COMPOSITION_TABLE],
+    )
+    enabled = row is not None
+    with _enabled_lock:
+        _enabled_cache[db_file] = (mtime, enabled)
+    return enabled
+
+
+def element_rows(records: Iterable[Mapping[str, Any]]) -> list[tuple[str, int, Any]]:
+    """(element, count, CID) rows parsed from the MolecularFormula of `records`."""
+    rows = []
+    for rec in records:
+        cid, formula = rec.get("CID"), rec.get("MolecularFormula")
+        if cid is None or not formula:
+            continue
+        rows.extend((el, n, cid) for el, n in parse_formula(str(formula)).items())
+    return rows
+
+
+def write_compositions(
+    db_file: str, records: list[dict[str, Any]], columns: Iterable[str]
+) -> None:
+    """Replace the element counts of the given (just upserted) compound records."""
+    if "MolecularFormula" not in columns:
+        return
+    mgr = DatabaseManager(db_file)
+    mgr.executemany(
+        f"DELETE FROM {COMPOSITION_TABLE} WHERE CID = ?",
+        [(rec["CID"],) for rec in records if rec.get("CID") is not None],
+    )
+    mgr.executemany(
+        f"INSERT OR IGNORE INTO {COMPOSITION_TABLE} (element, count, CID) "
+        f"VALUES (?, ?, ?)",
+        element_rows(records),
+    )
+
+
+def build_compositions(db_file: str) -> int:
+    """
+    Create the element-count table and (re)fill it from compound_data in CID
+    batches. Safe to re-run; returns the number of compounds indexed.
+    """
+    total = 0
+    with sqlite3.connect(db_file) as conn:
+        conn.executescript(COMPOSITION_SCHEMA)
+        conn.execute(f"DELETE FROM {COMPOSITION_TABLE}")
+        last_cid = -1
+        while True:
+            rows = conn.execute(
+                f"SELECT CID, MolecularFormula FROM {MASTER_TABLE} "
+                f"WHERE CID > ? ORDER BY CID LIMIT ?",
+                [last_cid, _BACKFILL_BATCH],
+            ).fetchall()
+            if not rows:
+                break
+            conn.executemany(
+                f"INSERT OR IGNORE INTO {COMPOSITION_TABLE} (element, count, CID) "
+                f"VALUES (?, ?, ?)",
+                element_rows({"CID": cid, "MolecularFormula": f} for cid, f in rows),
+            )
+            conn.commit()
+            last_cid = rows[-1][0]
+            total += len(rows)
+            logger.info("Indexed element counts for %d compounds", total)
+
+    with _enabled_lock:
+        _enabled_cache.pop(db_file, None)
+    return total
+
+
+def _bounds(element: str, spec: Any) -> tuple[int, int | None]:
+    if isinstance(spec, bool):
+        raise TypeError(f"Invalid count for {element}: {spec!r}")
+    if isinstance(spec, int):
+        lo, hi = spec, spec
+    else:
+        try:
+            lo, hi = spec
+        except (TypeError, ValueError):
+            raise TypeError(
+                f"Count for {element} must be an int or a (min, max) pair"
+            ) from None
+        lo = int(lo or 0)
+        hi = None if hi is None else int(hi)
+    if lo < 0 or (hi is not None and hi < lo):
+        raise ValueError(f"Invalid count range for {element}: {spec!r}")
+    return lo, hi
+
+
+def composition_cids(composition: Composition) -> tuple[str, list[Any]]:
+    """
+    Compound SELECT yielding the CIDs whose element counts satisfy
+    `composition`, plus its parameters. Elements with a minimum of at least
+    one are INTERSECTed from the (element, count) index; ranges that admit
+    zero atoms are applied by EXCEPTing the CIDs above their maximum.
+    Elements not named are unconstrained.
+    """
+    if not composition:
+        raise ValueError("Composition must name at least one element")
+
+    required: list[tuple[str, list[Any]]] = []
+    excluded: list[tuple[str, list[Any]]] = []
+    for element, spec in composition.items():
+        if not _SYMBOL.fullmatch(str(element)):
+            raise ValueError(f"Not an element symbol: {element!r}")
+        lo, hi = _bounds(element, spec)
+        base = f"SELECT CID FROM {COMPOSITION_TABLE} WHERE element = ?"
+        if lo > 0 and hi is None:
+            required.append((f"{base} AND count >= ?", [element, lo]))
+        elif lo > 0:
+            required.append((f"{base} AND count BETWEEN ? AND ?", [element, lo, hi]))
+        elif hi is not None:
+            excluded.append((f"{base} AND count > ?", [element, hi]))
+
+    if not required:
+        # Only upper bounds: start from every compound with a parsed formula
+        required.append((f"SELECT DISTINCT CID FROM {COMPOSITION_TABLE}", []))
+
+    parts = [" INTERSECT ".join(sql for sql, _ in required)]
+    parts += [sql for sql, _ in excluded]
+    params = [p for _, ps in (*required, *excluded) for p in ps]
+    return " EXCEPT ".join(parts), params
@@ -1,9 +1,33 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Iterable
 from typing import Any, Optional
 
-from molid.db.schema import CACHE_SCHEMA, OFFLINE_SCHEMA
+from molid.db.compact_index import (
+    HASH_COLUMNS,
+    compact_index_enabled,
+    enable_compact_index,
+    hash_row,
+    missing_hash_columns,
+)
+from molid.db.composition import (
+    COMPOSITION_SCHEMA,
+    composition_enabled,
+    write_compositions,
+)
+from molid.db.name_index import enable_name_index, fts5_available
+from molid.db.name_keys import NAME_KEYS_SCHEMA, name_keys_enabled, write_name_keys
+from molid.db.schema import (
+    BEST_CAS_BACKFILL,
+    CACHE_SCHEMA,
+    DEFAULT_MASTER_EXTRA,
+    MASS_INDEXES,
+    OFFLINE_ADDED_COLUMNS,
+    OFFLINE_SCHEMA,
+    OFFLINE_TEXT_INDEXES,
+    master_extra_columns,
+)
 from molid.db.sqlite_manager import DatabaseManager
 
 logger = logging.getLogger(__name__)
@@ -34,14 +58,62 @@ def initialize_database(db_file: str, sql_script: str) -> None:
     DatabaseManager(db_file).initialize(sql_script)
 
 
-def create_offline_db(db_file: str) -> None:
-    """Create or update the full offline PubChem database schema."""
+def add_missing_columns(db_file: str, table: str, columns: dict[str, str]) -> list[str]:
+    """ALTER `table` to add those of `columns` (name → SQL type) it lacks."""
+    db = DatabaseManager(db_file)
+    existing = {r["name"].lower() for r in db.query_all(f"PRAGMA table_info({table})")}
+    added = [c for c in columns if c.lower() not in existing]
+    for col in added:
+        logger.info("Adding column %s to %s in %s", col, table, db_file)
+        db.execute(f"ALTER TABLE {table} ADD COLUMN {col} {columns[col]}")
+    return added
+
+
+def create_offline_db(
+    db_file: str, properties: Iterable[str] = DEFAULT_MASTER_EXTRA
+) -> None:
+    """
+    Create or update the full offline PubChem database schema, including
+    the columns of the optional master `properties` (see MASTER_EXTRA_PROPERTIES).
+    """
     initialize_database(db_file, OFFLINE_SCHEMA)
+    add_missing_columns(
+        db_file,
+        "compound_data",
+        {**OFFLINE_ADDED_COLUMNS, **master_extra_columns(properties)},
+    )
+    if not compact_index_enabled(db_file):
+        initialize_database(db_file, OFFLINE_TEXT_INDEXES)
+    elif missing_hash_columns(db_file):
+        # Compact masters hash newly added identifier columns instead of
+        # TEXT-indexing them; keep the TEXT indexes only if they were kept.
+        kept = DatabaseManager(db_file).query_one(
+            "SELECT 1 AS ok FROM sqlite_master WHERE type = 'index' AND name = ?",
+            ["idx_inchikey"],
+        )
+        enable_compact_index(db_file, drop_text_indexes=kept is None)
+    # New master DBs get the derived lookup tables up front so ingest fills them;
+    # existing ones opt in with `molid db name-index` / `molid db reindex`.
+    if not DatabaseManager(db_file).query_one(
+        "SELECT 1 AS ok FROM compound_data LIMIT 1"
+    ):
+        initialize_database(db_file, NAME_KEYS_SCHEMA)
+        initialize_database(db_file, COMPOSITION_SCHEMA)
+        initialize_database(db_file, MASS_INDEXES)
+        if fts5_available():
+            enable_name_index(db_file, "compound_data")
 
 
 def create_cache_db(db_file: str) -> None:
     """Create or update the user-specific API cache database schema."""
     initialize_database(db_file, CACHE_SCHEMA)
+    db = DatabaseManager(db_file)
+    if not db.query_one("SELECT 1 AS ok FROM best_cas LIMIT 1") and db.query_one(
+        "SELECT 1 AS ok FROM cas_mapping LIMIT 1"
+    ):
+        initialize_database(db_file, BEST_CAS_BACKFILL)
+    if fts5_available():
+        enable_name_index(db_file, "cached_molecules")
 
 
 def upsert_archive_state(db_file: str, name: str, **fields: Any) -> None:
@@ -82,6 +154,11 @@ def save_to_database(db_file: str, data: list[dict], columns: list[str]) -> None
         return
 
     db = DatabaseManager(db_file)
+    if compact_index_enabled(db_file):
+        # Keep the hash columns in step with the identifier columns written
+        hashed = [h for h, (src, _) in HASH_COLUMNS.items() if src in columns]
+        data = [{**row, **hash_row(row)} for row in data]
+        columns = list(dict.fromkeys([*columns, *hashed]))
     # Build a parameterized UPSERT that updates all non-key columns
     nonkey = [c for c in columns if c != "CID"]
     insert_cols = ", ".join(columns)
@@ -96,3 +173,7 @@ def save_to_database(db_file: str, data: list[dict], columns: list[str]) -> None
     """
     params = [[row.get(c) for c in columns] for row in data]
     db.executemany(sql, params)
+    if name_keys_enabled(db_file):
+        write_name_keys(db_file, data, columns)
+    if composition_enabled(db_file):
+        write_compositions(db_file, data, columns)
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import functools
+import logging
+import os
+import re
+import sqlite3
+import threading
+
+from molid.db.sqlite_manager import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+# Content table → its FTS5 name index (external content, rowid = CID)
+NAME_INDEX_TABLES: dict[str, str] = {
+    "compound_data": "compound_data_names",
+    "cached_molecules": "cached_molecules_names",
+}
+NAME_COLUMNS = ("Title", "IUPACName")
+
+_enabled_cache: dict[tuple[str, str], tuple[int, bool]] = {}
+_enabled_lock = threading.Lock()
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+@functools.cache
+def fts5_available() -> bool:
+    """True if the linked SQLite library was built with FTS5."""
+    try:
+        with sqlite3.connect(":memory:") as conn:
+            conn.execute("CREATE VIRTUAL TABLE temp.probe USING fts5(x)")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def name_index_sql(table: str) -> str:
+    """FTS5 table over Title/IUPACName of `table` plus the triggers keeping it current."""
+    fts = NAME_INDEX_TABLES[table]
+    cols = ", ".join(NAME_COLUMNS)
+    new = ", ".join(f"NEW.{c}" for c in NAME_COLUMNS)
+    old = ", ".join(f"OLD.{c}" for c in NAME_COLUMNS)
+    return f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+    {cols},
+    content='{table}',
+    content_rowid='CID',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_{fts}_insert AFTER INSERT ON {table}
+BEGIN
+    INSERT INTO {fts} (rowid, {cols}) VALUES (NEW.CID, {new});
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_{fts}_delete AFTER DELETE ON {table}
+BEGIN
+    INSERT INTO {fts} ({fts}, rowid, {cols}) VALUES ('delete', OLD.CID, {old});
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_{fts}_update AFTER UPDATE OF {cols} ON {table}
+BEGIN
+    INSERT INTO {fts} ({fts}, rowid, {cols}) VALUES ('delete', OLD.CID, {old});
+    INSERT INTO {fts} (rowid, {cols}) VALUES (NEW.CID, {new});
+END;
+"""
+
+
+def name_index_enabled(db_file: str, table: str) -> bool:
+    """
+    True if `table` in `db_file` has its FTS5 name index (and FTS5 is usable).
+    The answer is cached per path until the file's mtime changes.
+    """
+    if not fts5_available():
+        return False
+    try:
+        mtime = os.stat(db_file).st_mtime_ns
+    except OSError:
+        return False
+    key = (db_file, table)
+    with _enabled_lock:
+        hit = _enabled_cache.get(key)
+        if hit is not None and hit[0] == mtime:
+            return hit[1]
+
+    row = DatabaseManager(db_file).query_one(
+        "SELECT 1 AS ok FROM sqlite_master WHERE type = 'table' AND name = ?",
+        [NAME_INDEX_TABLES[table]],
+    )
+    enabled = row is not None
+    with _enabled_lock:
+        _enabled_cache[key] = (mtime, enabled)
+    return enabled
+
+
+def enable_name_index(db_file: str, table: str) -> bool:
+    """
+    Create the FTS5 name index of `table` and index the rows it already holds.
+    New rows are indexed by triggers from then on. Returns False (and leaves
+    the DB untouched) when SQLite lacks FTS5. Safe to re-run.
+    """
+    if not fts5_available():
+        logger.warning("SQLite has no FTS5 support; name index not created.")
+        return False
+    if name_index_enabled(db_file, table):
+        return True
+
+    fts = NAME_INDEX_TABLES[table]
+    mgr = DatabaseManager(db_file)
+    mgr.initialize(name_index_sql(table))
+    if mgr.query_one(f"SELECT 1 AS ok FROM {table} LIMIT 1"):
+        logger.info("Building name index %s over existing rows of %s", fts, table)
+        mgr.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+
+    with _enabled_lock:
+        _enabled_cache.pop((db_file, table), None)
+    return True
+
+
+def match_expression(text: str, prefix: bool = True) -> str | None:
+    """
+    FTS5 MATCH expression requiring every word of `text` (in either name
+    column); with `prefix` the last word may be incomplete ("benz" → benzene).
+    Quoting keeps user input from being read as FTS5 syntax.
+    """
+    tokens = _TOKEN.findall(text or "")
+    if not tokens:
+        return None
+    terms = [f'"{t}"' for t in tokens]
+    if prefix:
+        terms[-1] += " *"
+    return " ".join(terms)
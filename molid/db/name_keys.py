@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+import unicodedata
+from collections.abc import Iterable
+from typing import Any
+
+from molid.db.sqlite_manager import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+MASTER_TABLE = "compound_data"
+NAME_KEYS_TABLE = "compound_names"
+# Normalized id_type → compound_data column whose folded values are indexed
+NAME_KEY_FIELDS: dict[str, str] = {"title": "Title", "iupacname": "IUPACName"}
+
+NAME_KEYS_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS {NAME_KEYS_TABLE} (
+    name_key    TEXT NOT NULL,            -- fold_name(value)
+    field       TEXT NOT NULL,            -- 'Title' or 'IUPACName'
+    CID         INTEGER NOT NULL,
+    PRIMARY KEY (name_key, field, CID)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_compound_names_cid ON {NAME_KEYS_TABLE}(CID);
+"""
+
+_BACKFILL_BATCH = 50_000
+
+_enabled_cache: dict[str, tuple[int, bool]] = {}
+_enabled_lock = threading.Lock()
+
+
+def fold_name(value: Any) -> str | None:
+    """Case- and whitespace-insensitive key of a name ("  Benzene " → "benzene")."""
+    if value is None:
+        return None
+    key = " ".join(unicodedata.normalize("NFKC", str(value)).casefold().split())
+    return key or None
+
+
+def name_keys_enabled(db_file: str) -> bool:
+    """
+    True if the master DB carries the normalized-name table.
+    The answer is cached per path until the file's mtime changes.
+    """
+    try:
+        mtime = os.stat(db_file).st_mtime_ns
+    except OSError:
+        return False
+    with _enabled_lock:
+        hit = _enabled_cache.get(db_file)
+        if hit is not None and hit[0] == mtime:
+            return hit[1]
+
+    row = DatabaseManager(db_file).query_one(
+        "SELECT 1 AS ok FROM sqlite_master WHERE type = 'table' AND name = ?",
+        [NAME_KEYS_TABLE],
+    )
+    enabled = row is not None
+    with _enabled_lock:
+        _enabled_cache[db_file] = (mtime, enabled)
+    return enabled
+
+
+def name_key_rows(records: Iterable[dict[str, Any]]) -> list[tuple[str, str, Any]]:
+    """(name_key, field, CID) rows for the name columns present in `records`."""
+    rows = []
+    for rec in records:
+        cid = rec.get("CID")
+        if cid is None:
+            continue
+        for col in NAME_KEY_FIELDS.values():
+            key = fold_name(rec.get(col))
+            if key is not None:
+                rows.append((key, col, cid))
+    return rows
+
+
+def write_name_keys(
+    db_file: str, records: list[dict[str, Any]], columns: Iterable[str]
+) -> None:
+    """Replace the name keys of the given (just upserted) compound records."""
+    fields = [c for c in NAME_KEY_FIELDS.values() if c in columns]
+    if not fields:
+        return
+    mgr = DatabaseManager(db_file)
+    mgr.executemany(
+        f"DELETE FROM {NAME_KEYS_TABLE} WHERE CID = ? AND field = ?",
+        [
+            (rec["CID"], f)
+            for rec in records
+            if rec.get("CID") is not None
+            for f in fields
+        ],
+    )
+    mgr.executemany(
+        f"INSERT OR IGNORE INTO {NAME_KEYS_TABLE} (name_key, field, CID) VALUES (?, ?, ?)",
+        name_key_rows(
+            {"CID": r.get("CID"), **{f: r.get(f) for f in fields}} for r in records
+        ),
+    )
+
+
+def build_name_keys(db_file: str) -> int:
+    """
+    Create the normalized-name table and (re)fill it from compound_data in
+    CID batches. Safe to re-run; returns the number of name keys written.
+    """
+    cols = ", ".join(NAME_KEY_FIELDS.values())
+    total = 0
+    with sqlite3.connect(db_file) as conn:
+        conn.executescript(NAME_KEYS_SCHEMA)
+        conn.execute(f"DELETE FROM {NAME_KEYS_TABLE}")
+        last_cid = -1
+        while True:
+            rows = conn.execute(
+                f"SELECT CID, {cols} FROM {MASTER_TABLE} "
+                f"WHERE CID > ? ORDER BY CID LIMIT ?",
+                [last_cid, _BACKFILL_BATCH],
+            ).fetchall()
+            if not rows:
+                break
+            keys = name_key_rows(
+                dict(zip(("CID", *NAME_KEY_FIELDS.values()), row)) for row in rows
+            )
+            conn.executemany(
+                f"INSERT OR IGNORE INTO {NAME_KEYS_TABLE} (name_key, field, CID) "
+                f"VALUES (?, ?, ?)",
+                keys,
+            )
+            conn.commit()
+            last_cid = rows[-1][0]
+            total += len(keys)
+            logger.info("Indexed %d normalized names", total)
+
+    with _enabled_lock:
+        _enabled_cache.pop(db_file, None)
+    return total
@@ -2,6 +2,7 @@ import ftplib
 import logging
 import os
 import sys
+from collections.abc import Iterable, Mapping
 from datetime import date, datetime, timezone
 from pathlib import Path
 from typing import Optional, Tuple
@@ -15,7 +16,7 @@ from molid.db.db_utils import (
     save_to_database,
     upsert_archive_state,
 )
-from molid.db.schema import NUMERIC_FIELDS
+from molid.db.schema import DEFAULT_MASTER_EXTRA, NUMERIC_FIELDS, master_properties
 from molid.pubchemproc.file_handler import read_expected_md5, verify_md5
 from molid.pubchemproc.pubchem import unpack_and_process_file
 from molid.utils.conversion import coerce_numeric_fields
@@ -60,9 +61,10 @@ def _prepare_environment(
     download_folder: str,
     processed_folder: str,
     min_free_gb: int = MIN_FREE_GB,
+    properties: Iterable[str] = DEFAULT_MASTER_EXTRA,
 ) -> None:
     """Ensure DB schema exists, folders are present, and disk space is sufficient."""
-    create_offline_db(database_file)
+    create_offline_db(database_file, properties)
     os.makedirs(download_folder, exist_ok=True)
     os.makedirs(processed_folder, exist_ok=True)
     check_disk_space(min_free_gb)
@@ -159,6 +161,7 @@ def _ingest(
     file_name: str,
     download_folder: str,
     processed_folder: str,
+    sdf_tags: Mapping[str, str] | None = None,
 ) -> bool:
     """Unpack, process, and persist one archive. Returns success flag."""
 
@@ -166,13 +169,17 @@ def _ingest(
         if not data:
             return
         cleaned = [coerce_numeric_fields(rec, NUMERIC_FIELDS) for rec in data]
-        save_to_database(database_file, cleaned, list(cleaned[0].keys()))
+        # Records only carry the SDF tags they have; write the union so an
+        # optional property absent from the first record is not dropped.
+        columns = list(dict.fromkeys(col for rec in cleaned for col in rec))
+        save_to_database(database_file, cleaned, columns)
 
     return unpack_and_process_file(
         file_name=file_name,
         download_folder=download_folder,
         processed_folder=processed_folder,
         process_callback=_process_and_save,
+        properties=sdf_tags,
     )
 
 
@@ -217,6 +224,7 @@ def _process_single_archive(
     item: tuple[str, str, str],
     download_folder: str,
     processed_folder: str,
+    sdf_tags: Mapping[str, str] | None = None,
 ) -> bool:
     """Process one (remote_gz, remote_md5, source) tuple and return success flag."""
     remote_gz, remote_md5, source = item
@@ -237,7 +245,7 @@ def _process_single_archive(
         _record_failure(database_file, file_name, source, "checksum failed")
         return False
 
-    ok = _ingest(database_file, file_name, download_folder, processed_folder)
+    ok = _ingest(database_file, file_name, download_folder, processed_folder, sdf_tags)
     if ok:
         _record_success(database_file, file_name, md5_path, source)
         logger.info("Completed: %s", file_name)
@@ -254,6 +262,7 @@ def _process_update_plan(
     download_folder: str,
     processed_folder: str,
     max_consecutive_failures: int = MAX_CONSECUTIVE_FAILURES,
+    sdf_tags: Mapping[str, str] | None = None,
 ) -> tuple[int, int]:
     """Run the ingest loop with failure backoff. Returns (successes, failures)."""
     successes = failures = 0
@@ -263,7 +272,7 @@ def _process_update_plan(
         for item in bar:
             try:
                 ok = _process_single_archive(
-                    database_file, item, download_folder, processed_folder
+                    database_file, item, download_folder, processed_folder, sdf_tags
                 )
                 if ok:
                     successes += 1
@@ -292,14 +301,22 @@ def update_database(
     max_files: Optional[int] = None,
     download_folder: str = DEFAULT_DOWNLOAD_FOLDER,
     processed_folder: str = DEFAULT_PROCESSED_FOLDER,
+    properties: Iterable[str] = DEFAULT_MASTER_EXTRA,
 ) -> tuple[int, int]:
-    """Update DB in three compact steps and return (successes, failures)."""
+    """
+    Update DB in three compact steps and return (successes, failures).
+    `properties` names the optional master properties to ingest besides the
+    core columns (see MASTER_EXTRA_PROPERTIES); missing columns are added.
+    """
     logger.info("Starting update for DB: %s", database_file)
-    _prepare_environment(database_file, download_folder, processed_folder, MIN_FREE_GB)
+    sdf_tags = master_properties(properties)  # rejects unknown names up front
+    _prepare_environment(
+        database_file, download_folder, processed_folder, MIN_FREE_GB, properties
+    )
     last_dt = _get_last_ingested_date(database_file)
     plan = _build_update_plan(last_dt, max_files)
     successes, failures = _process_update_plan(
-        database_file, plan, download_folder, processed_folder
+        database_file, plan, download_folder, processed_folder, sdf_tags=sdf_tags
     )
     logger.info("Update finished — %d succeeded, %d failed", successes, failures)
     return successes, failures
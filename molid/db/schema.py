@@ -1,4 +1,5 @@
 import re
+from collections.abc import Iterable
 
 
 def _extract_columns(schema: str, table: str) -> tuple[str, ...]:
@@ -22,6 +23,16 @@ NUMERIC_FIELDS = [
     "TPSA",
     "Complexity",
     "Charge",
+    "HBondDonorCount",
+    "HBondAcceptorCount",
+    "RotatableBondCount",
+    "HeavyAtomCount",
+    "IsotopeAtomCount",
+    "AtomStereoCount",
+    "UndefinedAtomStereoCount",
+    "BondStereoCount",
+    "UndefinedBondStereoCount",
+    "CovalentUnitCount",
 ]
 
 """
@@ -37,6 +48,7 @@ CREATE TABLE IF NOT EXISTS compound_data (
     IUPACName           TEXT,
     MolecularFormula    TEXT,
     CanonicalSMILES     TEXT,   -- connectivity/topology only
+    IsomericSMILES      TEXT,   -- stereo + isotope
     InChIKey            TEXT,
     InChI               TEXT,
     ExactMass           REAL,
@@ -44,11 +56,6 @@ CREATE TABLE IF NOT EXISTS compound_data (
     MonoisotopicMass    REAL,
     CAS                 TEXT
 );
-CREATE INDEX IF NOT EXISTS idx_inchikey                 ON compound_data(InChIKey);
-CREATE INDEX IF NOT EXISTS idx_compound_inchikey14      ON compound_data(substr(InChIKey, 1, 14));
-CREATE INDEX IF NOT EXISTS idx_compound_inchi           ON compound_data(InChI);
-CREATE INDEX IF NOT EXISTS idx_compound_canonicalsmiles ON compound_data(CanonicalSMILES);
-
 CREATE INDEX IF NOT EXISTS idx_compound_cas             ON compound_data(CAS);
 CREATE INDEX IF NOT EXISTS idx_compound_formula         ON compound_data(MolecularFormula);
 
@@ -76,6 +83,25 @@ CREATE TABLE IF NOT EXISTS processed_archives (
 );
 """
 
+# Mass indexes behind mass-window searches (new masters / `molid db reindex`)
+MASS_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_compound_exactmass        ON compound_data(ExactMass);
+CREATE INDEX IF NOT EXISTS idx_compound_monoisotopicmass ON compound_data(MonoisotopicMass);
+"""
+
+# Columns added to compound_data since its first release (column → SQL type);
+# create_offline_db ALTERs them into older master DBs.
+OFFLINE_ADDED_COLUMNS: dict[str, str] = {"IsomericSMILES": "TEXT"}
+
+# Identifier TEXT indexes; skipped when the compact hash index replaces them
+OFFLINE_TEXT_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_inchikey                 ON compound_data(InChIKey);
+CREATE INDEX IF NOT EXISTS idx_compound_inchikey14      ON compound_data(substr(InChIKey, 1, 14));
+CREATE INDEX IF NOT EXISTS idx_compound_inchi           ON compound_data(InChI);
+CREATE INDEX IF NOT EXISTS idx_compound_canonicalsmiles ON compound_data(CanonicalSMILES);
+CREATE INDEX IF NOT EXISTS idx_compound_isomericsmiles  ON compound_data(IsomericSMILES);
+"""
+
 # Columns present in the offline table (compound_data)
 OFFLINE_COLUMNS = _extract_columns(OFFLINE_SCHEMA, "compound_data")
 
@@ -85,7 +111,8 @@ OFFLINE_SDF_TAGS: dict[str, str] = {
     "Title": "Title",
     "IUPACName": "PUBCHEM_IUPAC_NAME",
     "MolecularFormula": "PUBCHEM_MOLECULAR_FORMULA",
-    "SMILES": "PUBCHEM_SMILES",
+    "CanonicalSMILES": "PUBCHEM_CONNECTIVITY_SMILES",
+    "IsomericSMILES": "PUBCHEM_SMILES",
     "InChIKey": "PUBCHEM_IUPAC_INCHIKEY",
     "InChI": "PUBCHEM_IUPAC_INCHI",
     "ExactMass": "PUBCHEM_EXACT_MASS",
@@ -93,10 +120,67 @@ OFFLINE_SDF_TAGS: dict[str, str] = {
     "MonoisotopicMass": "PUBCHEM_MONOISOTOPIC_MASS",
 }
 
+# Older PubChem SDF tag → the current tag it was renamed to
+SDF_TAG_ALIASES: dict[str, str] = {
+    "PUBCHEM_OPENEYE_CAN_SMILES": "PUBCHEM_CONNECTIVITY_SMILES",
+    "PUBCHEM_OPENEYE_ISO_SMILES": "PUBCHEM_SMILES",
+    "PUBCHEM_XLOGP3_AA": "PUBCHEM_XLOGP3",
+}
+
+# Optional master properties: column → (SDF tag, SQL type). Which of them a
+# master carries is configured (AppConfig.master_properties); ingest adds the
+# missing columns. Names follow PubChem's PUG REST property names.
+MASTER_EXTRA_PROPERTIES: dict[str, tuple[str, str]] = {
+    "XLogP": ("PUBCHEM_XLOGP3", "REAL"),
+    "TPSA": ("PUBCHEM_CACTVS_TPSA", "REAL"),
+    "Complexity": ("PUBCHEM_CACTVS_COMPLEXITY", "REAL"),
+    "Charge": ("PUBCHEM_TOTAL_CHARGE", "INTEGER"),
+    "HBondDonorCount": ("PUBCHEM_CACTVS_HBOND_DONOR", "INTEGER"),
+    "HBondAcceptorCount": ("PUBCHEM_CACTVS_HBOND_ACCEPTOR", "INTEGER"),
+    "RotatableBondCount": ("PUBCHEM_CACTVS_ROTATABLE_BOND", "INTEGER"),
+    "HeavyAtomCount": ("PUBCHEM_HEAVY_ATOM_COUNT", "INTEGER"),
+    "IsotopeAtomCount": ("PUBCHEM_ISOTOPIC_ATOM_COUNT", "INTEGER"),
+    "AtomStereoCount": ("PUBCHEM_ATOM_DEF_STEREO_COUNT", "INTEGER"),
+    "UndefinedAtomStereoCount": ("PUBCHEM_ATOM_UDEF_STEREO_COUNT", "INTEGER"),
+    "BondStereoCount": ("PUBCHEM_BOND_DEF_STEREO_COUNT", "INTEGER"),
+    "UndefinedBondStereoCount": ("PUBCHEM_BOND_UDEF_STEREO_COUNT", "INTEGER"),
+    "CovalentUnitCount": ("PUBCHEM_COMPONENT_COUNT", "INTEGER"),
+}
+
+# Extra properties ingested by default: those the cache DB stores as well
+DEFAULT_MASTER_EXTRA = ("XLogP", "TPSA", "Complexity", "Charge")
+
 DEFAULT_PROPERTIES_MASTER = {
     col: OFFLINE_SDF_TAGS[col] for col in OFFLINE_COLUMNS if col in OFFLINE_SDF_TAGS
 }
 
+
+def master_extra_columns(extra: Iterable[str]) -> dict[str, str]:
+    """
+    Optional master columns (column → SQL type) for the property names in
+    `extra`, matched case-insensitively; unknown names raise ValueError.
+    """
+    known = {c.lower(): c for c in MASTER_EXTRA_PROPERTIES}
+    out: dict[str, str] = {}
+    for name in extra:
+        col = known.get(str(name).lower())
+        if col is None:
+            raise ValueError(
+                f"Unknown master property {name!r}; "
+                f"choose from {', '.join(MASTER_EXTRA_PROPERTIES)}."
+            )
+        out[col] = MASTER_EXTRA_PROPERTIES[col][1]
+    return out
+
+
+def master_properties(extra: Iterable[str] = DEFAULT_MASTER_EXTRA) -> dict[str, str]:
+    """Column → SDF tag map read at ingest: the core master columns plus `extra`."""
+    return {
+        **DEFAULT_PROPERTIES_MASTER,
+        **{c: MASTER_EXTRA_PROPERTIES[c][0] for c in master_extra_columns(extra)},
+    }
+
+
 # ------------------------------------------------------------------
 # Cached db schema
 # ------------------------------------------------------------------
@@ -139,8 +223,62 @@ CREATE TABLE IF NOT EXISTS cas_mapping (
 
 CREATE INDEX IF NOT EXISTS idx_cas_mapping_cas ON cas_mapping(CAS);
 CREATE INDEX IF NOT EXISTS idx_cas_mapping_cid ON cas_mapping(CID);
+
+-- Best CAS per CID (same ranking the readers used to compute per row),
+-- kept current by the triggers below so reads are a plain keyed join.
+CREATE TABLE IF NOT EXISTS best_cas (
+    CID         INTEGER PRIMARY KEY,
+    CAS         TEXT NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_best_cas_insert AFTER INSERT ON cas_mapping
+BEGIN
+    INSERT OR REPLACE INTO best_cas (CID, CAS)
+    SELECT CID, CAS FROM cas_mapping WHERE CID = NEW.CID
+    ORDER BY (source='synonym') DESC, confidence DESC, updated_at DESC LIMIT 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_best_cas_update AFTER UPDATE ON cas_mapping
+BEGIN
+    DELETE FROM best_cas WHERE CID IN (OLD.CID, NEW.CID);
+    INSERT OR REPLACE INTO best_cas (CID, CAS)
+    SELECT CID, CAS FROM (
+        SELECT CID, CAS, ROW_NUMBER() OVER (
+            PARTITION BY CID
+            ORDER BY (source='synonym') DESC, confidence DESC, updated_at DESC
+        ) AS rn
+        FROM cas_mapping WHERE CID IN (OLD.CID, NEW.CID)
+    ) WHERE rn = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_best_cas_delete AFTER DELETE ON cas_mapping
+BEGIN
+    DELETE FROM best_cas WHERE CID = OLD.CID;
+    INSERT OR REPLACE INTO best_cas (CID, CAS)
+    SELECT CID, CAS FROM cas_mapping WHERE CID = OLD.CID
+    ORDER BY (source='synonym') DESC, confidence DESC, updated_at DESC LIMIT 1;
+END;
+
+CREATE TABLE IF NOT EXISTS negative_cache (
+    id_type     TEXT NOT NULL,            -- normalized identifier type (e.g. 'inchikey')
+    id_value    TEXT NOT NULL,
+    missed_at   TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id_type, id_value)
+);
 """
 
+# One-time backfill for cache DBs created before best_cas existed; run by
+# create_cache_db only while best_cas is empty but cas_mapping is not.
+BEST_CAS_BACKFILL = """
+INSERT INTO best_cas (CID, CAS)
+SELECT CID, CAS FROM (
+    SELECT CID, CAS, ROW_NUMBER() OVER (
+        PARTITION BY CID
+        ORDER BY (source='synonym') DESC, confidence DESC, updated_at DESC
+    ) AS rn
+    FROM cas_mapping
+) WHERE rn = 1;
+"""
 
 CACHE_COLUMNS = _extract_columns(CACHE_SCHEMA, "cached_molecules")
 
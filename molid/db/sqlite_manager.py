@@ -1,28 +1,258 @@
 from __future__ import annotations
 
 import logging
+import os
 import sqlite3
+import threading
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Sequence
+from urllib.parse import quote
+
+from molid.utils.metrics import METRICS
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class ReadOnlyOptions:
+    """How a read-only database is opened (see `register_readonly`)."""
+
+    immutable: bool = True
+    mmap_size: int = 0
+    cache_size: int | None = None
+
+
+@dataclass(frozen=True)
+class ConnectionOptions:
+    """
+    PRAGMAs and statement-cache size applied to pooled connections
+    (see `configure_connections`). None leaves the SQLite default (or the
+    setting persisted in the file) untouched.
+    """
+
+    journal_mode: str | None = None
+    synchronous: str | None = None
+    cache_size: int | None = None
+    temp_store: str | None = None
+    busy_timeout: int = 5000
+    statement_cache: int = 256
+
+    def __post_init__(self) -> None:
+        for name, allowed in _PRAGMA_CHOICES.items():
+            value = getattr(self, name)
+            if value is not None and str(value).upper() not in allowed:
+                raise ValueError(
+                    f"Invalid {name} {value!r}; expected one of {sorted(allowed)}."
+                )
+
+
+_PRAGMA_CHOICES: dict[str, frozenset[str]] = {
+    "journal_mode": frozenset(
+        {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+    ),
+    "synchronous": frozenset({"OFF", "NORMAL", "FULL", "EXTRA", "0", "1", "2", "3"}),
+    "temp_store": frozenset({"DEFAULT", "FILE", "MEMORY", "0", "1", "2"}),
+}
+
+# Registered read-only paths (resolved) → options; readers of these paths reuse
+# one connection per thread.
+_readonly: dict[str, ReadOnlyOptions] = {}
+_readonly_lock = threading.Lock()
+_local = threading.local()
+# Connection options per resolved path; paths not configured use the default.
+_default_options = ConnectionOptions()
+_path_options: dict[str, ConnectionOptions] = {}
+_resolved: dict[str, str] = {}
+
+
+def _realpath(db_path: str) -> str:
+    path = _resolved.get(db_path)
+    if path is None:
+        path = os.path.realpath(db_path)
+        if os.path.isabs(db_path):  # relative paths follow the working directory
+            _resolved[db_path] = path
+    return path
+
+
+def configure_connections(
+    options: ConnectionOptions, db_paths: Iterable[str] | None = None
+) -> None:
+    """
+    Set the options of pooled connections to `db_paths`, or the default for
+    every path without options of its own. Connections opened with other
+    options are replaced at their next checkout, in every thread.
+    """
+    global _default_options
+    if db_paths is None:
+        _default_options = options
+        return
+    with _readonly_lock:
+        for db_path in db_paths:
+            _path_options[_realpath(db_path)] = options
+
+
+def _options_for(db_path: str) -> ConnectionOptions:
+    if not _path_options:
+        return _default_options
+    return _path_options.get(_realpath(db_path), _default_options)
+
+
+def register_readonly(
+    db_path: str,
+    immutable: bool = True,
+    mmap_size: int = 0,
+    cache_size: int | None = None,
+) -> None:
+    """
+    Serve reads of `db_path` from per-thread connections opened through a
+    `mode=ro` URI (plus `immutable=1`, which also skips all locking and
+    journal checks: only use it while nothing writes the file), with
+    `PRAGMA mmap_size` / `cache_size` applied. Writes are unaffected.
+    """
+    opts = ReadOnlyOptions(immutable, int(mmap_size), cache_size)
+    with _readonly_lock:
+        _readonly[os.path.realpath(db_path)] = opts
+
+
+def unregister_readonly(db_path: str) -> None:
+    with _readonly_lock:
+        _readonly.pop(os.path.realpath(db_path), None)
+
+
+def _file_identity(path: str) -> tuple[int, int, int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def _readonly_connection(db_path: str) -> sqlite3.Connection | None:
+    """This thread's reusable connection for a registered read-only path."""
+    if not _readonly:
+        return None
+    path = os.path.realpath(db_path)
+    opts = _readonly.get(path)
+    if opts is None:
+        return None
+    identity = _file_identity(path)
+    if identity is None:
+        return None
+
+    conns: dict[str, tuple[Any, ...]] = getattr(_local, "readonly", None) or {}
+    _local.readonly = conns
+    cached = conns.get(path)
+    # Reopen if the options changed or the file was replaced/modified.
+    if cached is not None and cached[1] == opts and cached[2] == identity:
+        return cached[0]
+    if cached is not None:
+        cached[0].close()
+
+    uri = f"file:{quote(path)}?mode=ro" + ("&immutable=1" if opts.immutable else "")
+    conn = sqlite3.connect(
+        uri, uri=True, cached_statements=_options_for(path).statement_cache
+    )
+    conn.row_factory = sqlite3.Row
+    if opts.mmap_size:
+        conn.execute(f"PRAGMA mmap_size = {int(opts.mmap_size)}")
+    if opts.cache_size is not None:
+        conn.execute(f"PRAGMA cache_size = {int(opts.cache_size)}")
+    conns[path] = (conn, opts, identity)
+    logger.debug("Opened read-only connection to %s (%s)", path, opts)
+    return conn
+
+
+def _pooled_connection(db_path: str) -> sqlite3.Connection:
+    """
+    This thread's connection to `db_path`, opened on first use and kept for
+    later calls. It is replaced when the options change or the file at
+    `db_path` is no longer the one it was opened on (deleted/recreated).
+    """
+    opts = _options_for(db_path)
+    pool: dict[str, tuple[Any, ...]] = getattr(_local, "pool", None) or {}
+    _local.pool = pool
+    cached = pool.get(db_path)
+    if cached is not None:
+        identity = _file_identity(db_path)
+        if cached[1] == opts and identity is not None and identity[:2] == cached[2]:
+            return cached[0]
+        cached[0].close()
+
+    conn = sqlite3.connect(
+        db_path,
+        timeout=opts.busy_timeout / 1000.0,
+        cached_statements=opts.statement_cache,
+    )
+    conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA busy_timeout = {int(opts.busy_timeout)}")
+    if opts.journal_mode is not None:
+        conn.execute(f"PRAGMA journal_mode = {opts.journal_mode}")
+    if opts.synchronous is not None:
+        conn.execute(f"PRAGMA synchronous = {opts.synchronous}")
+    if opts.cache_size is not None:
+        conn.execute(f"PRAGMA cache_size = {int(opts.cache_size)}")
+    if opts.temp_store is not None:
+        conn.execute(f"PRAGMA temp_store = {opts.temp_store}")
+    identity = _file_identity(db_path)
+    pool[db_path] = (conn, opts, identity[:2] if identity else None)
+    return conn
+
+
+def close_connections() -> None:
+    """Close the calling thread's pooled and read-only connections."""
+    for attr in ("pool", "readonly"):
+        conns = getattr(_local, attr, None) or {}
+        for cached in conns.values():
+            cached[0].close()
+        conns.clear()
+
+
 class DatabaseManager:
     """
     Generic SQLite helper for schema initialization,
     simple inserts, and custom queries.
+
+    Connections are pooled per thread and path (see `_pooled_connection`), so
+    creating managers and issuing statements does not reconnect each time.
     """
 
     def __init__(self, db_path: str):
         self.db_path = db_path
-        # ensure directory exists
+        # ensure directory exists (it may have been removed since last time)
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
 
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        """Connection for a read: reused if the path is registered read-only."""
+        with METRICS.timer("sql.query_ms"):
+            METRICS.incr("sql.statements")
+            conn = _readonly_connection(self.db_path)
+            if conn is not None:
+                yield conn
+                return
+            conn = _pooled_connection(self.db_path)
+            try:
+                yield conn
+            finally:
+                if conn.in_transaction:
+                    conn.commit()
+
+    @contextmanager
+    def _writer(self) -> Iterator[sqlite3.Connection]:
+        """Pooled connection for a write; commits on success, rolls back on error."""
+        with METRICS.timer("sql.query_ms"):
+            METRICS.incr("sql.statements")
+            conn = _pooled_connection(self.db_path)
+            with conn:
+                yield conn
+
     def initialize(self, sql_script: str) -> None:
         """Create or migrate the database schema."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._writer() as conn:
                 try:
                     conn.executescript(sql_script)
                 except Exception:
@@ -56,9 +286,8 @@ class DatabaseManager:
         sql = f"{verb} INTO {table} ({cols}) VALUES ({placeholders})"
 
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._writer() as conn:
                 conn.executemany(sql, rows)
-                conn.commit()
             logger.info("Inserted %d rows into %s", len(rows), table)
         except sqlite3.Error as e:
             logger.error("Failed to insert rows into %s: %s", table, e)
@@ -68,40 +297,56 @@ class DatabaseManager:
         """Return True if a row exists matching the given WHERE clause."""
         sql = f"SELECT 1 FROM {table} WHERE {where_clause} LIMIT 1"
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._reader() as conn:
                 cur = conn.execute(sql, params)
-                return cur.fetchone() is not None
+                found = cur.fetchone() is not None
+                cur.close()
+                return found
         except sqlite3.Error as e:
             logger.error("Existence check failed on %s: %s", self.db_path, e)
             return False
 
-    def query_one(self, sql: str, params: list[Any] = None) -> dict[str, Any] | None:
+    def query_one(
+        self, sql: str, params: list[Any] | None = None
+    ) -> dict[str, Any] | None:
         """Return a single row as a dict, or None if not found."""
         params = params or []
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._reader() as conn:
             cur = conn.execute(sql, params)
             row = cur.fetchone()
+            # Reset the statement now so no read lock outlives the call.
+            cur.close()
             return dict(row) if row else None
 
-    def query_all(self, sql: str, params: list[Any] = None) -> list[dict[str, Any]]:
+    def query_all(
+        self, sql: str, params: list[Any] | None = None
+    ) -> list[dict[str, Any]]:
         """Return all matching rows as a list of dicts."""
         params = params or []
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._reader() as conn:
             cur = conn.execute(sql, params)
             return [dict(r) for r in cur.fetchall()]
 
+    def query_rows(
+        self, sql: str, params: list[Any] | None = None
+    ) -> tuple[tuple[str, ...], list[tuple[Any, ...]]]:
+        """Return (column names, plain row tuples) without per-row dicts."""
+        params = params or []
+        with self._reader() as conn:
+            cur = conn.cursor()
+            cur.row_factory = None
+            cur.execute(sql, params)
+            rows = cur.fetchall()
+            return tuple(d[0] for d in cur.description or ()), rows
+
     def execute(self, sql: str, params: Sequence[Any] | None = None) -> None:
-        with sqlite3.connect(self.db_path) as conn:
+        with self._writer() as conn:
             conn.execute(sql, params or [])
-            conn.commit()
 
     def executemany(self, sql: str, seq_of_params: Sequence[Sequence[Any]]) -> None:
-        with sqlite3.connect(self.db_path) as conn:
+        with self._writer() as conn:
             try:
                 conn.executemany(sql, seq_of_params)
-                conn.commit()
             except Exception:
                 logger.exception("executemany failed on %s", self.db_path)
                 raise
@@ -3,33 +3,30 @@ from __future__ import annotations
 import io
 import logging
 import os
+from collections.abc import Hashable, Iterator
+from itertools import islice
 from pathlib import Path
 from typing import Any
 
 from ase import Atoms
-from ase.io import read
+from ase.io import iread, read
 
-from molid.pubchemproc.pubchem import process_file
-from molid.search.service import SearchConfig, SearchService
-from molid.utils.conversion import atoms_to_inchikey
-from molid.utils.settings import AppConfig, load_config
+from molid.client import get_client
+from molid.pubchemproc.pubchem import iter_sdf_records
+from molid.search.service import SearchService
+from molid.utils.conversion import atoms_to_inchikey, structure_fingerprint
 
 logger = logging.getLogger(__name__)
 
 
 def _create_search_service() -> SearchService:
     """
-    Instantiate a SearchService from Pydantic settings (env/defaults).
-    """
-    cfg: AppConfig = load_config()
-    master_db = cfg.master_db
-    cache_db = cfg.cache_db
-    sources = cfg.sources
-    cache_w = cfg.cache_writes
+    Return the SearchService of the process-wide MolID client.
 
-    _sanity_check(master_db, cache_db, sources)
-    search_cfg = SearchConfig(sources=sources, cache_writes=cache_w)
-    return SearchService(master_db=master_db, cache_db=cache_db, cfg=search_cfg)
+    The service is built from Pydantic settings (env/defaults) once and reused
+    until the settings change.
+    """
+    return get_client().service
 
 
 def search_identifier(input: dict[str, Any]) -> tuple[list[dict[str, Any]], str]:
@@ -58,7 +55,8 @@ def search_from_file(file_path: str) -> tuple[list[dict[str, Any]], str]:
     """
     Detect file extension from path and process accordingly:
     - .xyz, .extxyz: read via ASE, then search
-    - .sdf: extract InChIKey via process_file, then search
+    - .sdf, .sdf.gz: extract the first record's InChIKey, then search
+      (see `search_from_sdf` for every record)
     Returns (list of result dicts, source).
     """
     # TODO: Rework function. FIELDS_TO_EXTRACT is strange
@@ -75,15 +73,130 @@ def search_from_file(file_path: str) -> tuple[list[dict[str, Any]], str]:
         atoms = read(str(p), format="extxyz")
         return search_from_atoms(atoms)
 
-    if ext == ".sdf":
-        records = process_file(str(p))
-        if not records or "InChIKey" not in records[0]:
+    if ext == ".sdf" or p.name.lower().endswith(".sdf.gz"):
+        first = next(iter_sdf_records(str(p)), None)
+        if not first or "InChIKey" not in first:
             raise ValueError(f"No InChIKey found in SDF: {file_path}")
-        inchikey = records[0]["InChIKey"]
+        inchikey = first["InChIKey"]
         return search_identifier({"inchikey": inchikey})
     raise ValueError(f"Unsupported file extension: {ext}")
 
 
+def iter_search_trajectory(
+    file_path: str,
+    index: str = ":",
+    format: str | None = None,
+    chunk_size: int = 256,
+) -> Iterator[tuple[int, str | None, tuple[list[dict[str, Any]], str] | None]]:
+    """
+    Stream a multi-frame structure file (e.g. .xyz/.extxyz trajectories) and
+    yield (frame_number, inchikey, (records, source) or None) for every frame.
+
+    Frames are read lazily with `ase.io.iread`. Each frame is reduced to a
+    structure fingerprint (atomic numbers, isotopes and bond topology); the
+    InChIKey is computed once per distinct fingerprint and each distinct
+    InChIKey is searched once, in batches of up to `chunk_size` frames via
+    `SearchService.search_many`. Frames whose InChIKey cannot be computed
+    yield (frame_number, None, None).
+    """
+    p = Path(file_path)
+    if not p.exists():
+        raise FileNotFoundError(f"File not found: {file_path}")
+
+    service = _create_search_service()
+    keys: dict[Hashable, str | None] = {}
+    found: dict[str, tuple[list[dict[str, Any]], str] | None] = {}
+
+    frames = enumerate(iread(str(p), index=index, format=format))
+    while chunk := list(islice(frames, max(int(chunk_size), 1))):
+        chunk_keys: list[str | None] = []
+        for _, atoms in chunk:
+            fp = structure_fingerprint(atoms)
+            if fp not in keys:
+                try:
+                    keys[fp] = atoms_to_inchikey(atoms)
+                except ImportError as e:
+                    raise RuntimeError(str(e)) from e
+                except ValueError as e:
+                    logger.warning("InChIKey conversion failed: %s", e)
+                    keys[fp] = None
+            chunk_keys.append(keys[fp])
+
+        new = [k for k in dict.fromkeys(chunk_keys) if k and k not in found]
+        if new:
+            outcomes = service.search_many([{"inchikey": k} for k in new])
+            found.update(zip(new, outcomes))
+
+        for (n, _), key in zip(chunk, chunk_keys):
+            yield n, key, (found[key] if key else None)
+
+    logger.info(
+        "Trajectory %s: %d distinct structures, %d distinct InChIKeys",
+        file_path,
+        len(keys),
+        len(found),
+    )
+
+
+def search_from_trajectory(
+    file_path: str, index: str = ":", format: str | None = None
+) -> list[tuple[list[dict[str, Any]], str] | None]:
+    """
+    Search every frame of a trajectory file (see `iter_search_trajectory`).
+    Returns a list aligned with the frames: (records, source) or None.
+    """
+    return [
+        outcome
+        for _, _, outcome in iter_search_trajectory(file_path, index, format=format)
+    ]
+
+
+# Record fields usable as a query, in order of preference
+_SDF_QUERY_FIELDS = (("InChIKey", "inchikey"), ("CID", "cid"), ("InChI", "inchi"))
+
+
+def _sdf_query(record: dict[str, str]) -> dict[str, str] | None:
+    for column, id_type in _SDF_QUERY_FIELDS:
+        if record.get(column):
+            return {id_type: record[column]}
+    return None
+
+
+def iter_search_sdf(
+    file_path: str, chunk_size: int = 256
+) -> Iterator[tuple[int, dict[str, str], tuple[list[dict[str, Any]], str] | None]]:
+    """
+    Stream every record of an SDF file (plain or gzip-compressed) and yield
+    (record_number, sdf_fields, (records, source) or None).
+
+    Records are parsed lazily and resolved in chunks of `chunk_size` through
+    `SearchService.search_many` (by InChIKey, else CID, else InChI; records
+    without any of these yield None), so memory stays bounded by the chunk
+    size regardless of the file size.
+    """
+    p = Path(file_path)
+    if not p.exists():
+        raise FileNotFoundError(f"File not found: {file_path}")
+
+    service = _create_search_service()
+    records = enumerate(iter_sdf_records(str(p)))
+    while chunk := list(islice(records, max(int(chunk_size), 1))):
+        queries = [_sdf_query(rec) for _, rec in chunk]
+        # Duplicates within the chunk are looked up once
+        unique = {next(iter(q.items())): q for q in queries if q is not None}
+        outcomes = dict(zip(unique, service.search_many(list(unique.values()))))
+        for (n, rec), q in zip(chunk, queries):
+            yield n, rec, (outcomes[next(iter(q.items()))] if q else None)
+
+
+def search_from_sdf(file_path: str) -> list[tuple[list[dict[str, Any]], str] | None]:
+    """
+    Search every record of an SDF/SDF.gz file (see `iter_search_sdf`).
+    Returns a list aligned with the records: (records, source) or None.
+    """
+    return [outcome for _, _, outcome in iter_search_sdf(file_path)]
+
+
 def search_from_input(data: Any) -> tuple[list[dict[str, Any]], str]:
     """
     Universal entrypoint: accepts one of:
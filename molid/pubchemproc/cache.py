@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import logging
+import sqlite3
 from typing import Any
 
 from molid.db.cas_enrich import _downgrade_generic_cas
@@ -13,10 +14,15 @@ from molid.search.db_lookup import advanced_search
 from molid.utils.conversion import coerce_numeric_fields
 from molid.utils.formula import canonicalize_formula
 from molid.utils.settings import load_config
+from molid.utils.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
 CACHE_TABLE = "cached_molecules"
+NEGATIVE_TABLE = "negative_cache"
+
+# In-flight cache-miss fetches, keyed by (cache file, id_type, id_value)
+_fetch_flights = SingleFlight()
 
 cfg = load_config()
 cache_enabled = bool(cfg.cas_expand_cache)
@@ -76,9 +82,50 @@ def store_cached_data(
         logger.warning(
             "Failed to retrieve just-stored cache record for %s (%s)", id_type, id_value
         )
+    else:
+        clear_negative(cache_db_file, id_type, id_value)
     return cached
 
 
+def is_negative_cached(
+    cache_db_file: str, id_type: str, id_value: str, ttl_seconds: float
+) -> bool:
+    """Return True if (id_type, id_value) was recorded as a PubChem miss within the TTL."""
+    if not ttl_seconds or ttl_seconds <= 0:
+        return False
+    try:
+        row = DatabaseManager(cache_db_file).query_one(
+            f"SELECT 1 AS hit FROM {NEGATIVE_TABLE} "
+            "WHERE id_type = ? AND id_value = ? AND missed_at >= datetime('now', ?)",
+            [id_type.lower(), str(id_value), f"-{int(ttl_seconds)} seconds"],
+        )
+        return row is not None
+    except sqlite3.Error:
+        logger.debug("Negative cache lookup failed", exc_info=True)
+        return False
+
+
+def record_negative(cache_db_file: str, id_type: str, id_value: str) -> None:
+    """Remember that PubChem has no match for (id_type, id_value)."""
+    DatabaseManager(cache_db_file).execute(
+        f"INSERT OR REPLACE INTO {NEGATIVE_TABLE} (id_type, id_value, missed_at) "
+        "VALUES (?, ?, CURRENT_TIMESTAMP)",
+        [id_type.lower(), str(id_value)],
+    )
+    logger.info("Recorded PubChem miss for %s (%s)", id_type, id_value)
+
+
+def clear_negative(cache_db_file: str, id_type: str, id_value: str) -> None:
+    """Forget a recorded miss (e.g. once the identifier resolved)."""
+    try:
+        DatabaseManager(cache_db_file).execute(
+            f"DELETE FROM {NEGATIVE_TABLE} WHERE id_type = ? AND id_value = ?",
+            [id_type.lower(), str(id_value)],
+        )
+    except sqlite3.Error:
+        logger.debug("Negative cache cleanup failed", exc_info=True)
+
+
 def get_cached_or_fetch(
     cache_db_file: str,
     id_type: str,
@@ -86,9 +133,21 @@ def get_cached_or_fetch(
 ) -> tuple[list[dict[str, Any]], bool]:
     """
     Checks for a cached molecule; if not found, fetches data via the API
-    and stores it.
+    and stores it. Concurrent calls for the same identifier and cache file
+    wait on a single in-flight fetch and share its result.
     Returns (record, from_cache).
     """
+    key = (cache_db_file, (id_type or "").lower(), str(id_value))
+    return _fetch_flights.do(
+        key, _get_cached_or_fetch, cache_db_file, id_type, id_value
+    )
+
+
+def _get_cached_or_fetch(
+    cache_db_file: str,
+    id_type: str,
+    id_value: str,
+) -> tuple[list[dict[str, Any]], bool]:
     if id_type.lower() == "molecularformula":
         canon = canonicalize_formula(str(id_value))
         cached = advanced_search(cache_db_file, id_type, canon)
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import gzip
 import logging
-from collections.abc import Callable
+from collections.abc import Callable, Iterator, Mapping
 from pathlib import Path
-from typing import Any
+from typing import IO, Any
 
-from molid.db.schema import DEFAULT_PROPERTIES_MASTER
+from molid.db.schema import (
+    DEFAULT_PROPERTIES_MASTER,
+    SDF_TAG_ALIASES,
+    master_properties,
+)
 from molid.pubchemproc.file_handler import (
     FileUnpackError,
     GzipValidationError,
@@ -17,18 +22,35 @@ from molid.pubchemproc.file_handler import (
 logger = logging.getLogger(__name__)
 
 
-def process_file(
-    file_path: Path,
-) -> list[dict[str, str]]:
-    """Extract specified fields from an .sdf file, returning a list of dicts."""
-    data = []
-    with open(file_path, "r") as file:
+def _open_sdf(file_path: Path | str) -> IO[str]:
+    """Open an SDF file for reading, transparently gunzipping .gz content."""
+    with open(file_path, "rb") as fh:
+        magic = fh.read(2)
+    if magic == b"\x1f\x8b":
+        return gzip.open(file_path, "rt")
+    return open(file_path, "r")
+
+
+def iter_sdf_records(
+    file_path: Path | str,
+    properties: Mapping[str, str] = DEFAULT_PROPERTIES_MASTER,
+) -> Iterator[dict[str, str]]:
+    """
+    Lazily yield one {column: value} dict per SDF record (plain or gzipped),
+    reading the tags given by `properties` (column → SDF tag). Archives
+    written before a tag was renamed are read through its old name.
+    """
+    tag_to_column = {tag: col for col, tag in properties.items()}
+    for old, new in SDF_TAG_ALIASES.items():
+        if new in tag_to_column:
+            tag_to_column.setdefault(old, tag_to_column[new])
+    with _open_sdf(file_path) as file:
         compound_data = {}
         for line in file:
             line = line.strip()
             if line.startswith("> <"):
-                property_name = line[3:-1]
-                if property_name in DEFAULT_PROPERTIES_MASTER.values():
+                key = tag_to_column.get(line[3:-1])
+                if key is not None:
                     # Read all lines until a blank line (multi-line SDF field)
                     value_lines = []
                     for vline in file:
@@ -36,18 +58,23 @@ def process_file(
                         if vline == "":
                             break
                         value_lines.append(vline)
-                    value = "\n".join(value_lines).strip()
-                    key = [
-                        k
-                        for k, v in DEFAULT_PROPERTIES_MASTER.items()
-                        if v == property_name
-                    ][0]
-                    compound_data[key] = value
+                    compound_data[key] = "\n".join(value_lines).strip()
             elif line == "$$$$":
                 if compound_data:
-                    data.append(compound_data)
+                    yield compound_data
                 compound_data = {}
-    return data
+
+
+def process_file(
+    file_path: Path,
+    properties: Mapping[str, str] | None = None,
+) -> list[dict[str, str]]:
+    """
+    Extract specified fields from an .sdf file, returning a list of dicts.
+    `properties` maps column → SDF tag (default: the core master columns
+    plus the default extra properties).
+    """
+    return list(iter_sdf_records(file_path, properties or master_properties()))
 
 
 def unpack_and_process_file(
@@ -55,6 +82,7 @@ def unpack_and_process_file(
     download_folder: Path | str,
     processed_folder: Path | str,
     process_callback: Callable[[list[dict[str, Any]]], None],
+    properties: Mapping[str, str] | None = None,
 ) -> bool:
     """
     Unpack, process, and save a single file with tracking.
@@ -65,7 +93,7 @@ def unpack_and_process_file(
 
         sdf_file_path = unpack_gz_file(gz_path, processed_folder)
 
-        extracted_data = process_file(sdf_file_path)
+        extracted_data = process_file(sdf_file_path, properties)
         process_callback(extracted_data)
 
         cleanup_files(gz_path, sdf_file_path)
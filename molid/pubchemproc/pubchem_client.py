@@ -2,6 +2,8 @@
 from __future__ import annotations
 
 import os
+import threading
+import time
 from typing import Any
 from urllib.parse import quote
 
@@ -10,6 +12,7 @@ from requests.adapters import HTTPAdapter, Retry
 
 from molid.db.schema import NUMERIC_FIELDS
 from molid.utils.conversion import coerce_numeric_fields
+from molid.utils.metrics import METRICS
 
 # -------- Tunables (env-overridable, no hard dependency on settings.py) -----
 _CONNECT_TIMEOUT = float(os.getenv("MOLID_HTTP_CONNECT_TIMEOUT", "10"))
@@ -18,6 +21,8 @@ _TIMEOUT = (_CONNECT_TIMEOUT, _READ_TIMEOUT)
 
 _RETRIES = int(os.getenv("MOLID_HTTP_RETRIES", "4"))
 _BACKOFF = float(os.getenv("MOLID_HTTP_BACKOFF", "0.7"))
+# Keep-alive connections per host; should cover the concurrent lookup workers
+_POOL_SIZE = int(os.getenv("MOLID_HTTP_POOL_SIZE", "16"))
 
 _RETRY = Retry(
     total=_RETRIES,
@@ -31,6 +36,8 @@ _RETRY = Retry(
 )
 
 _session: requests.Session | None = None
+# Per-thread count of HTTP calls, read by callers to attribute calls to a lookup
+_calls = threading.local()
 
 
 def get_session() -> requests.Session:
@@ -38,12 +45,49 @@ def get_session() -> requests.Session:
     global _session
     if _session is None:
         s = requests.Session()
-        s.mount("https://", HTTPAdapter(max_retries=_RETRY))
-        s.mount("http://", HTTPAdapter(max_retries=_RETRY))
+        adapter = HTTPAdapter(
+            max_retries=_RETRY, pool_connections=_POOL_SIZE, pool_maxsize=_POOL_SIZE
+        )
+        s.mount("https://", adapter)
+        s.mount("http://", adapter)
         _session = s
     return _session
 
 
+def http_calls() -> int:
+    """Number of PubChem HTTP calls issued so far by the current thread."""
+    return getattr(_calls, "n", 0)
+
+
+def _request(method: str, url: str, **kwargs: Any) -> requests.Response:
+    """Issue one PubChem call on the shared session and record its metrics."""
+    _calls.n = http_calls() + 1
+    METRICS.incr("http.requests")
+    t0 = time.perf_counter()
+    try:
+        r = getattr(get_session(), method)(url, **kwargs)
+    except requests.RequestException:
+        METRICS.incr("http.errors")
+        raise
+    finally:
+        METRICS.observe("http.latency_ms", (time.perf_counter() - t0) * 1000.0)
+    METRICS.incr(f"http.status.{r.status_code}")
+    METRICS.incr("http.bytes", len(getattr(r, "content", None) or b""))
+    raw = getattr(r, "raw", None)
+    retries = getattr(getattr(raw, "retries", None), "history", None)
+    if retries:
+        METRICS.incr("http.retries", len(retries))
+    return r
+
+
+def _get(url: str, **kwargs: Any) -> requests.Response:
+    return _request("get", url, **kwargs)
+
+
+def _post(url: str, **kwargs: Any) -> requests.Response:
+    return _request("post", url, **kwargs)
+
+
 # ----------------------------- Namespace helpers ----------------------------
 
 
@@ -75,13 +119,12 @@ def resolve_to_cids(id_type: str, id_value: str) -> list[int]:
       - try POST form 'inchi=<string>'
     """
     key = (id_type or "").strip().lower()
-    s = get_session()
 
     # Fast path for molecular formula (unchanged)
     if key in ("molecularformula", "formula"):
         safe_value = quote(str(id_value).strip(), safe="")
         url = f"https://pubchem.ncbi.nlm.nih.gov/rest/pug/compound/fastformula/{safe_value}/cids/JSON"
-        r = s.get(url, timeout=_TIMEOUT)
+        r = _get(url, timeout=_TIMEOUT)
         if r.status_code == 404:
             return []
         r.raise_for_status()
@@ -115,7 +158,7 @@ def resolve_to_cids(id_type: str, id_value: str) -> list[int]:
             if not candidate:
                 continue
             url = f"https://pubchem.ncbi.nlm.nih.gov/rest/pug/compound/inchi/{quote(candidate, safe='')}/cids/JSON"
-            r = s.get(url, timeout=_TIMEOUT)
+            r = _get(url, timeout=_TIMEOUT)
             if r.status_code == 404:
                 # try next variant
                 continue
@@ -133,7 +176,7 @@ def resolve_to_cids(id_type: str, id_value: str) -> list[int]:
             if not candidate:
                 continue
             url = "https://pubchem.ncbi.nlm.nih.gov/rest/pug/compound/inchi/cids/JSON"
-            r = s.post(url, data={"inchi": candidate}, timeout=_TIMEOUT)
+            r = _post(url, data={"inchi": candidate}, timeout=_TIMEOUT)
             if r.status_code == 404:
                 continue
             if r.status_code == 400:
@@ -148,7 +191,7 @@ def resolve_to_cids(id_type: str, id_value: str) -> list[int]:
     # Default path (inchikey, smiles, name, cas, cid…)
     safe_value = quote(val, safe="")
     url = f"https://pubchem.ncbi.nlm.nih.gov/rest/pug/compound/{ns}/{safe_value}/cids/JSON"
-    r = s.get(url, timeout=_TIMEOUT)
+    r = _get(url, timeout=_TIMEOUT)
     if r.status_code == 404:
         return []
     r.raise_for_status()
@@ -158,8 +201,7 @@ def resolve_to_cids(id_type: str, id_value: str) -> list[int]:
 def get_properties(cid: int, properties: tuple[str, ...]) -> list[dict[str, Any]]:
     props_str = ",".join(properties)
     url = f"https://pubchem.ncbi.nlm.nih.gov/rest/pug/compound/cid/{cid}/property/{props_str}/JSON"
-    s = get_session()
-    r = s.get(url, timeout=_TIMEOUT)
+    r = _get(url, timeout=_TIMEOUT)
     r.raise_for_status()
     record = r.json().get("PropertyTable", {}).get("Properties", []) or []
     cleaned_records = [coerce_numeric_fields(item, NUMERIC_FIELDS) for item in record]
@@ -169,8 +211,7 @@ def get_properties(cid: int, properties: tuple[str, ...]) -> list[dict[str, Any]
 def get_pugview(cid: int, heading: str | None = None) -> dict[str, Any] | None:
     base = f"https://pubchem.ncbi.nlm.nih.gov/rest/pug_view/data/compound/{cid}/JSON"
     url = base if not heading else f"{base}/?heading={quote(heading)}"
-    s = get_session()
-    r = s.get(url, timeout=_TIMEOUT)
+    r = _get(url, timeout=_TIMEOUT)
     if heading:
         # tolerate 400/404 on heading-optimized calls
         if not r.ok:
@@ -186,9 +227,8 @@ def get_pugview(cid: int, heading: str | None = None) -> dict[str, Any] | None:
 def get_xrefs_rn(cid: int) -> list[str]:
     """Return CAS RNs; network problems return [] (non-fatal enrichment)."""
     url = f"https://pubchem.ncbi.nlm.nih.gov/rest/pug/compound/cid/{cid}/xrefs/RN/JSON"
-    s = get_session()
     try:
-        r = s.get(url, timeout=_TIMEOUT)
+        r = _get(url, timeout=_TIMEOUT)
         if not r.ok:
             return []
         info = r.json().get("InformationList", {}).get("Information", [])
@@ -207,9 +247,8 @@ def get_xrefs_rn(cid: int) -> list[str]:
 def get_synonyms(cid: int) -> list[str]:
     """Return PubChem synonyms (StringList). Empty on transient/404."""
     url = f"https://pubchem.ncbi.nlm.nih.gov/rest/pug/compound/cid/{cid}/synonyms/JSON"
-    s = get_session()
     try:
-        r = s.get(url, timeout=_TIMEOUT)
+        r = _get(url, timeout=_TIMEOUT)
         if not r.ok:
             return []
         info = r.json().get("InformationList", {}).get("Information", [])
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import time
+from collections import Counter, deque
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Literal, TextIO
+
+from molid.db.sqlite_manager import close_connections
+from molid.search.service import MoleculeNotFound, SearchService
+
+logger = logging.getLogger(__name__)
+
+BatchFormat = Literal["auto", "lines", "csv", "jsonl"]
+NOT_FOUND = "not found"
+
+
+@dataclass
+class BatchItem:
+    """Outcome of one batch query, in input order."""
+
+    query: Any
+    records: list[dict[str, Any]] = field(default_factory=list)
+    source: str | None = None
+    error: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        payload: dict[str, Any] = {
+            "query": self.query,
+            "source": self.source,
+            "results": self.records,
+        }
+        if self.error is not None:
+            payload["error"] = self.error
+        return payload
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), default=str)
+
+
+@dataclass
+class BatchSummary:
+    total: int = 0
+    resolved: int = 0
+    errors: int = 0
+    by_source: Counter = field(default_factory=Counter)
+    elapsed: float = 0.0
+
+    def add(self, item: BatchItem) -> None:
+        self.total += 1
+        if item.source is not None:
+            self.resolved += 1
+            self.by_source[item.source] += 1
+        elif item.error is not None and item.error != NOT_FOUND:
+            self.errors += 1
+
+    @property
+    def throughput(self) -> float:
+        return self.total / self.elapsed if self.elapsed > 0 else 0.0
+
+    def format(self) -> str:
+        tiers = ", ".join(f"{k}: {v}" for k, v in sorted(self.by_source.items()))
+        return (
+            f"{self.total} queries in {self.elapsed:.2f}s "
+            f"({self.throughput:.1f}/s); resolved {self.resolved}, "
+            f"unresolved {self.total - self.resolved - self.errors}, "
+            f"errors {self.errors}" + (f" [{tiers}]" if tiers else "")
+        )
+
+
+# ---------------------------------------------------------------------------
+# Input readers
+# ---------------------------------------------------------------------------
+
+
+def detect_format(path: str) -> BatchFormat:
+    """Guess the input format from a file name ('-' and unknown → lines)."""
+    name = path.lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    return "lines"
+
+
+def read_queries(
+    stream: TextIO,
+    fmt: BatchFormat,
+    id_type: str,
+    column: str | None = None,
+) -> Iterator[Any]:
+    """
+    Lazily turn an input stream into search queries.
+
+    - lines: one identifier per non-blank line, searched as `id_type`
+    - csv:   the `column` (default: first column) of each row, as `id_type`
+    - jsonl: one query per line, either a one-key object such as
+             {"smiles": "CCO"} or a bare JSON string searched as `id_type`
+
+    Malformed JSONL lines are passed through as-is and reported by
+    `run_batch` as errors, so one bad line does not abort the stream.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        col = column or (reader.fieldnames or [None])[0]
+        if col is None or col not in (reader.fieldnames or []):
+            raise ValueError(f"CSV column {col!r} not found in {reader.fieldnames}.")
+        for row in reader:
+            value = (row.get(col) or "").strip()
+            if value:
+                yield {id_type: value}
+        return
+
+    for raw in stream:
+        line = raw.strip()
+        if not line:
+            continue
+        if fmt == "jsonl":
+            try:
+                obj = json.loads(line)
+            except ValueError:
+                yield line
+                continue
+            yield {id_type: obj} if isinstance(obj, str) else obj
+        else:
+            yield {id_type: line}
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+
+def _chunks(items: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    it = iter(items)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+def _valid(query: Any) -> bool:
+    return isinstance(query, dict) and len(query) == 1
+
+
+def resolve_many(
+    service: SearchService, chunk: list[Any], fields: Sequence[str] | None = None
+) -> list[BatchItem]:
+    """Resolve one list of queries, reporting invalid/failed queries per item."""
+    items = [BatchItem(query=q) for q in chunk]
+    valid = [i for i, q in enumerate(chunk) if _valid(q)]
+    for item in items:
+        if not _valid(item.query):
+            item.error = "invalid query; expected a single {id_type: value} object"
+
+    try:
+        outcomes = service.search_many([chunk[i] for i in valid], fields)
+    except Exception as e:  # noqa: BLE001 - any failure falls back to per-query
+        # Isolate the failing query instead of losing the whole chunk.
+        logger.warning("Batch chunk failed (%s); retrying queries one by one", e)
+        outcomes = []
+        for i in valid:
+            try:
+                outcomes.append(service.search(chunk[i], fields))
+            except Exception as exc:  # noqa: BLE001 - reported on its item
+                outcomes.append(exc)
+
+    for i, outcome in zip(valid, outcomes):
+        item = items[i]
+        if outcome is None:
+            item.error = NOT_FOUND
+        elif isinstance(outcome, Exception):
+            item.error = (
+                NOT_FOUND if isinstance(outcome, MoleculeNotFound) else str(outcome)
+            )
+        else:
+            item.records, item.source = outcome
+    return items
+
+
+def _resolve_chunk(service: SearchService, chunk: list[Any]) -> list[BatchItem]:
+    """`resolve_many` on a batch worker, which then drops its SQLite connections."""
+    try:
+        return resolve_many(service, chunk)
+    finally:
+        close_connections()
+
+
+def run_batch(
+    service: SearchService,
+    queries: Iterable[Any],
+    workers: int = 4,
+    chunk_size: int = 256,
+) -> Iterator[BatchItem]:
+    """
+    Resolve `queries` in chunks of `chunk_size` via `search_many`, with up to
+    `workers` chunks in flight, yielding results in input order.
+
+    Input is consumed lazily and at most about `workers + 1` chunks are held in
+    memory, so arbitrarily long streams can be processed. Workers close their
+    pooled SQLite connections after each chunk, so none outlive the batch.
+    """
+    workers = max(int(workers), 1)
+    chunk_size = max(int(chunk_size), 1)
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="molid-batch"
+    ) as pool:
+        inflight: deque = deque()
+        for chunk in _chunks(queries, chunk_size):
+            inflight.append(pool.submit(_resolve_chunk, service, chunk))
+            while len(inflight) > workers:
+                yield from inflight.popleft().result()
+        while inflight:
+            yield from inflight.popleft().result()
+
+
+def stream_batch(
+    service: SearchService,
+    queries: Iterable[Any],
+    out: TextIO,
+    workers: int = 4,
+    chunk_size: int = 256,
+) -> BatchSummary:
+    """Write one JSON line per query to `out` (input order) and summarize."""
+    summary = BatchSummary()
+    t0 = time.perf_counter()
+    for item in run_batch(service, queries, workers=workers, chunk_size=chunk_size):
+        out.write(item.to_json() + "\n")
+        summary.add(item)
+    out.flush()
+    summary.elapsed = time.perf_counter() - t0
+    return summary
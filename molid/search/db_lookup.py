@@ -2,48 +2,208 @@ from __future__ import annotations
 
 import logging
 import os
+import threading
 import warnings
+from collections.abc import Iterable, Sequence
 from typing import Any
 
-from molid.db.schema import CACHE_COLUMNS
+from molid.db.compact_index import HASH_PROBES, compact_index_enabled, probe_value
+from molid.db.composition import Composition, composition_cids, composition_enabled
+from molid.db.name_index import NAME_INDEX_TABLES, match_expression, name_index_enabled
+from molid.db.name_keys import (
+    NAME_KEY_FIELDS,
+    NAME_KEYS_TABLE,
+    fold_name,
+    name_keys_enabled,
+)
+from molid.db.schema import (
+    CACHE_COLUMNS,
+    MASTER_EXTRA_PROPERTIES,
+    OFFLINE_SCHEMA,
+    _extract_columns,
+)
 from molid.db.sqlite_manager import DatabaseManager
+from molid.search.inchikey_index import load_inchikey_index
+from molid.search.records import Record, records_from_rows
 
 logger = logging.getLogger(__name__)
 
 CACHE_TABLE = "cached_molecules"
 OFFLINE_TABLE_MASTER = "compound_data"
 OFFLINE_TABLE_CAS = "cas_mapping"
+# Trigger-maintained best CAS per CID in the cache DB (see CACHE_SCHEMA)
+CACHE_TABLE_BEST_CAS = "best_cas"
+_BEST_CAS_JOIN = f"LEFT JOIN {CACHE_TABLE_BEST_CAS} b ON b.CID = m.CID"
+
+# Max bound parameters per IN (...) chunk; stays well under SQLite's limit.
+IN_CHUNK = 900
+
+# Mass columns searchable by window (indexed by MASS_INDEXES)
+MASS_COLUMNS = ("MonoisotopicMass", "ExactMass")
+
+Fields = Sequence[str] | None
+
+# Columns any tier can return; other names in `fields=` are rejected.
+_RECORD_FIELDS = (
+    *_extract_columns(OFFLINE_SCHEMA, OFFLINE_TABLE_MASTER),
+    *MASTER_EXTRA_PROPERTIES,
+    *CACHE_COLUMNS,
+    "CAS",
+    "MatchedCAS",
+)
+_KNOWN_FIELDS = frozenset(c.lower() for c in _RECORD_FIELDS)
+
+_columns_cache: dict[tuple[str, str], tuple[int, tuple[str, ...]]] = {}
+_columns_lock = threading.Lock()
+
+
+def resolve_fields(fields: Fields, available: Iterable[str]) -> list[str] | None:
+    """
+    Map requested field names (case-insensitive) onto `available` column
+    names, keeping the caller's order. None means "all columns".
+
+    Fields stored by another tier (e.g. MatchedCAS) are skipped, like NULL
+    values; names no tier knows raise ValueError.
+    """
+    if fields is None:
+        return None
+    if isinstance(fields, str):
+        fields = [fields]
+    lookup = {c.lower(): c for c in available}
+    out: list[str] = []
+    for f in fields:
+        col = lookup.get(str(f).lower())
+        if col is None:
+            if str(f).lower() not in _KNOWN_FIELDS:
+                known = sorted({*lookup.values(), *_RECORD_FIELDS})
+                raise ValueError(f"Unknown field {f!r}; expected any of {known}.")
+            continue
+        if col not in out:
+            out.append(col)
+    return out
+
+
+def project_records(
+    records: Iterable[dict[str, Any]], fields: Sequence[str]
+) -> list[dict[str, Any]]:
+    """Keep only `fields` (case-insensitive) of already materialized records."""
+    wanted = {str(f).lower() for f in fields}
+    return [{k: v for k, v in r.items() if k.lower() in wanted} for r in records]
+
+
+def _table_columns(db_file: str, table: str) -> tuple[str, ...]:
+    """Column names of `table`, cached until the file's mtime changes."""
+    mtime = os.stat(db_file).st_mtime_ns
+    key = (db_file, table)
+    with _columns_lock:
+        hit = _columns_cache.get(key)
+        if hit is not None and hit[0] == mtime:
+            return hit[1]
+    rows = DatabaseManager(db_file).query_all(f"PRAGMA table_info({table})")
+    cols = tuple(r["name"] for r in rows)
+    with _columns_lock:
+        _columns_cache[key] = (mtime, cols)
+    return cols
+
+
+def _master_select(db_file: str, fields: Fields, alias: str = "") -> str:
+    """SELECT list over compound_data for `fields` (all columns if None)."""
+    cols = resolve_fields(fields, _table_columns(db_file, OFFLINE_TABLE_MASTER))
+    if cols is None:
+        return f"{alias}*"
+    # Nothing this table stores was asked for: keep the row shape valid.
+    return ", ".join(f"{alias}{c}" for c in cols) or f"{alias}CID"
+
+
+def _cache_select(fields: Fields, matched_cas: bool = False) -> str:
+    """SELECT list over cached_molecules m / best_cas b (/ cas_mapping cm)."""
+    extra = ", cm.CAS AS MatchedCAS" if matched_cas else ""
+    cols = resolve_fields(fields, [*CACHE_COLUMNS, "CAS", "MatchedCAS"])
+    if cols is None:
+        return "m.*, b.CAS AS CAS" + extra
+    exprs = []
+    for c in cols:
+        if c == "CAS":
+            exprs.append("b.CAS AS CAS")
+        elif c == "MatchedCAS":
+            if matched_cas:
+                exprs.append("cm.CAS AS MatchedCAS")
+        else:
+            exprs.append(f"m.{c}")
+    return ", ".join(exprs) or "m.CID"
 
 
 def basic_offline_search(
-    offline_db_file: str, id_type: str, id_value: str
+    offline_db_file: str,
+    id_type: str,
+    id_value: str,
+    fields: Fields = None,
+    compact_records: bool = False,
 ) -> list[dict[str, Any]]:
     """
     Query SQLite database 'db_file' on table 'table' for rows matching id_type = id_value.
+    `fields` restricts the columns read and returned (default: all);
+    `compact_records` returns read-only `Record`s instead of dicts.
     """
     if not os.path.exists(offline_db_file):
         logger.debug("DB file %s does not exist", offline_db_file)
         return []
 
     if id_type == "cas":
-        # import pdb; pdb.set_trace()
-        return master_lookup_by_cas(offline_db_file, id_value)
+        return master_lookup_by_cas(offline_db_file, id_value, fields, compact_records)
 
     mgr = DatabaseManager(offline_db_file)
 
-    if id_type == "inchikey":
-        # Try full InChIKey match first
-        result = mgr.query_one(
-            f"SELECT * FROM {OFFLINE_TABLE_MASTER} WHERE InChIKey = ?", [id_value]
+    if id_type in NAME_KEY_FIELDS and name_keys_enabled(offline_db_file):
+        # Case- and whitespace-insensitive match via the normalized-name table
+        sql = (
+            f"SELECT {_master_select(offline_db_file, fields, 'm.')} "
+            f"FROM {NAME_KEYS_TABLE} n JOIN {OFFLINE_TABLE_MASTER} m ON m.CID = n.CID "
+            f"WHERE n.name_key = ? AND n.field = ? ORDER BY m.CID"
         )
+        params = [fold_name(id_value), NAME_KEY_FIELDS[id_type]]
+        # save_to_database keys every row it writes, so a miss is final: the
+        # name columns have no index to fall back on
+        return _fetch_all(mgr, sql, params, compact_records)
+
+    compact = compact_index_enabled(offline_db_file)
+    select = _master_select(offline_db_file, fields)
 
+    if id_type == "inchikey":
+        # Try full InChIKey match first; the array index, if built, settles
+        # misses outright and turns hits into a CID probe.
+        index = load_inchikey_index(offline_db_file)
+        cid = int(index.lookup([id_value])[0]) if index is not None else None
+        result = None
+        if cid is not None and cid >= 0:
+            result = _fetch_one(
+                mgr,
+                f"SELECT {select} FROM {OFFLINE_TABLE_MASTER} "
+                f"WHERE CID = ? AND InChIKey = ?",
+                [cid, id_value],
+                compact_records,
+            )
+        if result is None and (cid is None or cid >= 0):
+            # No index, or a hash collision: match the text in SQLite
+            where, params = _eq_clause("inchikey", "InChIKey", id_value, compact)
+            result = _fetch_one(
+                mgr,
+                f"SELECT {select} FROM {OFFLINE_TABLE_MASTER} WHERE {where}",
+                params,
+                compact_records,
+            )
         if result:
             return [result]
 
         # Fallback to InChIKey14 prefix match
-        result = mgr.query_one(
-            f"SELECT * FROM {OFFLINE_TABLE_MASTER} WHERE substr(InChIKey,1,14) = ?",
-            [id_value[:14]],
+        where, params = _eq_clause(
+            "inchikey14", "substr(InChIKey,1,14)", id_value[:14], compact
+        )
+        result = _fetch_one(
+            mgr,
+            f"SELECT {select} FROM {OFFLINE_TABLE_MASTER} WHERE {where}",
+            params,
+            compact_records,
         )
         if result:
             warnings.warn(
@@ -54,36 +214,83 @@ def basic_offline_search(
             )
             return [result]
 
-    sql = f"SELECT * FROM {OFFLINE_TABLE_MASTER} WHERE {id_type} = ?"
-    results = mgr.query_all(sql, [id_value])
-    if results:
-        return [
-            {k: v for k, v in record.items() if v is not None} for record in results
-        ]
+    rows: list[dict[str, Any]] = []
+    for column in _lookup_columns(offline_db_file, id_type):
+        where, params = _eq_clause(column, column, id_value, compact)
+        sql = f"SELECT {select} FROM {OFFLINE_TABLE_MASTER} WHERE {where}"
+        rows = _fetch_all(mgr, sql, params, compact_records)
+        if rows:
+            break
+    return rows
+
 
-    return []
+def _lookup_columns(offline_db_file: str, id_type: str) -> list[str]:
+    """
+    Master columns tried in turn for `id_type`. A plain SMILES may be either
+    flavor, so connectivity SMILES queries also try IsomericSMILES; masters
+    built before that column existed only have CanonicalSMILES.
+    """
+    if id_type not in ("canonicalsmiles", "isomericsmiles"):
+        return [id_type]
+    if "IsomericSMILES" not in _table_columns(offline_db_file, OFFLINE_TABLE_MASTER):
+        return ["canonicalsmiles"]
+    if id_type == "isomericsmiles":
+        return ["isomericsmiles"]
+    return ["canonicalsmiles", "isomericsmiles"]
+
+
+def _eq_clause(
+    id_type: str, expr: str, value: Any, compact: bool
+) -> tuple[str, list[Any]]:
+    """
+    WHERE clause matching `expr = value`. With a compact master index the
+    small INTEGER hash column is probed and the full text is still compared.
+    """
+    probe = HASH_PROBES.get(id_type.lower()) if compact else None
+    if probe is None:
+        return f"{expr} = ?", [value]
+    return f"{probe[0]} = ? AND {expr} = ?", [
+        probe_value(id_type.lower(), value),
+        value,
+    ]
 
 
-def master_lookup_by_cas(offline_db_file: str, cas: str) -> list[dict[str, Any]]:
+def master_lookup_by_cas(
+    offline_db_file: str,
+    cas: str,
+    fields: Fields = None,
+    compact_records: bool = False,
+) -> list[dict[str, Any]]:
     """Return rows from compound_data joined via cas_mapping for the given CAS."""
     if not os.path.exists(offline_db_file):
         logger.debug("Offline DB not found at %s", offline_db_file)
         return []
     db = DatabaseManager(offline_db_file)
     sql = (
-        f"SELECT cd.* FROM {OFFLINE_TABLE_CAS} cm "
+        f"SELECT {_master_select(offline_db_file, fields, 'cd.')} FROM {OFFLINE_TABLE_CAS} cm "
         f"JOIN {OFFLINE_TABLE_MASTER} cd ON cd.CID = cm.CID "
         f"WHERE cm.CAS = ? ORDER BY (cm.source='synonym') DESC, cm.confidence DESC"
     )
+    if compact_records:
+        return _fetch_all(db, sql, [cas], compact_records)
     rows = db.query_all(sql, [cas])
     return rows or []
 
 
-def advanced_search(db_file: str, id_type: str, id_value: str) -> list[dict[str, Any]]:
+def advanced_search(
+    db_file: str,
+    id_type: str,
+    id_value: str,
+    fields: Fields = None,
+    compact_records: bool = False,
+) -> list[dict[str, Any]]:
     """
-    Query SQLite cache DB. Special handling:
-      - CAS: resolve via cas_mapping (highest confidence, newest), LIMIT 1.
-      - CID: enrich row with best CAS from mapping; fallback to row.CAS.
+    Query SQLite cache DB. Every row carries its best CAS from `best_cas`;
+    `fields` restricts the columns read and returned (default: all) and
+    `compact_records` returns read-only `Record`s instead of dicts.
+    Special handling:
+      - CAS: resolve via cas_mapping (highest confidence, newest first) and
+        also report the matched CAS as MatchedCAS.
     """
     if not os.path.exists(db_file):
         logger.debug("DB file %s does not exist", db_file)
@@ -94,35 +301,22 @@ def advanced_search(db_file: str, id_type: str, id_value: str) -> list[dict[str,
     key = (id_type or "").lower()
     if key == "cas":
         sql = (
-            f"SELECT m.*, "
-            f"( SELECT cm2.CAS FROM cas_mapping cm2 "
-            f"  WHERE cm2.CID = m.CID "
-            f"  ORDER BY (cm2.source='synonym') DESC, cm2.confidence DESC, cm2.updated_at DESC "
-            f"  LIMIT 1"
-            f") AS CAS, "
-            f"cm.CAS AS MatchedCAS "
+            f"SELECT {_cache_select(fields, matched_cas=True)} "
             f"FROM cas_mapping cm "
             f"JOIN {CACHE_TABLE} m ON m.CID = cm.CID "
+            f"{_BEST_CAS_JOIN} "
             f"WHERE cm.CAS = ? "
             f"ORDER BY (cm.source='synonym') DESC, cm.confidence DESC, cm.updated_at DESC"
         )
-        rows = mgr.query_all(sql, [id_value])
         # no fallback to m.CAS anymore (we don't write it)
-        return [{k: v for k, v in r.items() if v is not None} for r in (rows or [])]
+        return _fetch_all(mgr, sql, [id_value], compact_records)
 
     if key == "cid":
-        # Return one row; CAS is the best mapping (or existing row CAS as fallback)
         sql = (
-            f"SELECT m.*, "
-            f"( SELECT cm.CAS FROM cas_mapping cm "
-            f"  WHERE cm.CID = m.CID "
-            f"  ORDER BY (cm.source='synonym') DESC, cm.confidence DESC, cm.updated_at DESC "
-            f"  LIMIT 1"
-            f") AS CAS "
-            f"FROM {CACHE_TABLE} m WHERE m.CID = ?"
+            f"SELECT {_cache_select(fields)} FROM {CACHE_TABLE} m {_BEST_CAS_JOIN} "
+            f"WHERE m.CID = ?"
         )
-        rows = mgr.query_all(sql, [id_value])
-        return [{k: v for k, v in r.items() if v is not None} for r in (rows or [])]
+        return _fetch_all(mgr, sql, [id_value], compact_records)
 
     # Default column-based lookup (SMILES alias handling preserved)
     columns = {c.lower(): c for c in CACHE_COLUMNS}
@@ -136,8 +330,522 @@ def advanced_search(db_file: str, id_type: str, id_value: str) -> list[dict[str,
             f"Unsupported search field '{id_type}' for table '{CACHE_TABLE}'"
         )
 
-    sql = f"SELECT m.*,( SELECT cm.CAS FROM cas_mapping cm WHERE cm.CID = m.CID ORDER BY (cm.source='synonym') DESC, cm.confidence DESC, cm.updated_at DESC LIMIT 1) AS CAS FROM cached_molecules m WHERE {column} = ?"
-    results = mgr.query_all(sql, [id_value])
-    if results:
-        return [{k: v for k, v in rec.items() if v is not None} for rec in results]
-    return []
+    sql = (
+        f"SELECT {_cache_select(fields)} FROM {CACHE_TABLE} m {_BEST_CAS_JOIN} "
+        f"WHERE m.{column} = ?"
+    )
+    return _fetch_all(mgr, sql, [id_value], compact_records)
+
+
+# ---------------------------------------------------------------------------
+# Name search (FTS5)
+# ---------------------------------------------------------------------------
+
+
+def name_search(
+    db_file: str,
+    table: str,
+    text: str,
+    limit: int = 20,
+    prefix: bool = True,
+    fields: Fields = None,
+    compact_records: bool = False,
+) -> list[dict[str, Any]]:
+    """
+    Rank rows of `table` (compound_data or cached_molecules) whose Title or
+    IUPACName contains every word of `text` by BM25, Title matches weighted
+    higher. With `prefix` the last word may be incomplete. Returns [] if the
+    DB has no name index.
+    """
+    match = match_expression(text, prefix)
+    if match is None or not os.path.exists(db_file):
+        return []
+    if not name_index_enabled(db_file, table):
+        logger.debug("No name index on %s in %s", table, db_file)
+        return []
+
+    fts = NAME_INDEX_TABLES[table]
+    if table == CACHE_TABLE:
+        select, joins = _cache_select(fields), _BEST_CAS_JOIN
+    else:
+        select, joins = _master_select(db_file, fields, "m."), ""
+    sql = (
+        f"SELECT {select} FROM {fts} "
+        f"JOIN {table} m ON m.CID = {fts}.rowid {joins} "
+        f"WHERE {fts} MATCH ? ORDER BY bm25({fts}, 10.0, 1.0) LIMIT ?"
+    )
+    return _fetch_all(
+        DatabaseManager(db_file), sql, [match, max(int(limit), 1)], compact_records
+    )
+
+
+def composition_search(
+    offline_db_file: str,
+    composition: Composition,
+    limit: int = 100,
+    fields: Fields = None,
+    compact_records: bool = False,
+) -> list[dict[str, Any]]:
+    """
+    Master rows whose MolecularFormula satisfies `composition`, e.g.
+    {"C": (6, 8), "N": 1, "Cl": 0}: exact counts or inclusive (min, max)
+    ranges (max None = unbounded), elements not named are unconstrained.
+    Ordered by CID, at most `limit` rows. Returns [] if the DB has no
+    element-count table (`molid db reindex`).
+    """
+    cids, params = composition_cids(composition)
+    if not os.path.exists(offline_db_file):
+        return []
+    if not composition_enabled(offline_db_file):
+        logger.debug("No element-count table in %s", offline_db_file)
+        return []
+    sql = (
+        f"SELECT {_master_select(offline_db_file, fields)} FROM {OFFLINE_TABLE_MASTER} "
+        f"WHERE CID IN ({cids}) ORDER BY CID LIMIT ?"
+    )
+    return _fetch_all(
+        DatabaseManager(offline_db_file),
+        sql,
+        [*params, max(int(limit), 1)],
+        compact_records,
+    )
+
+
+def mass_window(
+    mass: float, ppm: float | None = 5.0, da: float | None = None
+) -> tuple[float, float]:
+    """Inclusive (low, high) window around `mass`: ±`da` Dalton if given, else ±`ppm`."""
+    if da is not None:
+        tol = float(da)
+    elif ppm is not None:
+        tol = abs(float(mass)) * float(ppm) * 1e-6
+    else:
+        raise ValueError("Either ppm or da is required")
+    if tol < 0:
+        raise ValueError("Mass tolerance must not be negative")
+    return float(mass) - tol, float(mass) + tol
+
+
+def mass_search_many(
+    offline_db_file: str,
+    masses: Iterable[float],
+    ppm: float | None = 5.0,
+    da: float | None = None,
+    column: str = "MonoisotopicMass",
+    limit: int | None = None,
+    fields: Fields = None,
+    compact_records: bool = False,
+) -> dict[float, list[dict[str, Any]]]:
+    """
+    Master rows whose `column` (MonoisotopicMass or ExactMass) lies within
+    the ppm (or absolute `da`) window of each target mass.
+
+    The targets are joined as a VALUES table against the mass index, so
+    each chunk of targets costs one query of index range scans. Returns
+    {mass: records} closest first (at most `limit` per mass); misses are
+    omitted.
+    """
+    col = {c.lower(): c for c in MASS_COLUMNS}.get(str(column).lower())
+    if col is None:
+        raise ValueError(f"Mass column must be one of {', '.join(MASS_COLUMNS)}")
+    targets = _unique(float(m) for m in masses)
+    windows = [(i, m, *mass_window(m, ppm, da)) for i, m in enumerate(targets)]
+    if not windows or not os.path.exists(offline_db_file):
+        return {}
+
+    mgr = DatabaseManager(offline_db_file)
+    select = _master_select(offline_db_file, fields, "m.")
+    rows: list[dict[str, Any]] = []
+    for chunk in _chunked(windows, IN_CHUNK // 4):
+        sql = (
+            f"WITH t(_key, mass, lo, hi) AS "
+            f"(VALUES {','.join('(?,?,?,?)' for _ in chunk)}) "
+            f"SELECT t._key AS _key, {select} FROM t "
+            f"JOIN {OFFLINE_TABLE_MASTER} m ON m.{col} BETWEEN t.lo AND t.hi "
+            f"ORDER BY t._key, abs(m.{col} - t.mass), m.CID"
+        )
+        rows.extend(
+            _fetch_all(mgr, sql, [v for w in chunk for v in w], compact_records)
+        )
+    found = _group_rows(rows, "_key")
+    return {
+        targets[i]: [_strip_key(r) for r in recs[:limit]] for i, recs in found.items()
+    }
+
+
+def mass_search(
+    offline_db_file: str,
+    mass: float,
+    ppm: float | None = 5.0,
+    da: float | None = None,
+    column: str = "MonoisotopicMass",
+    limit: int | None = None,
+    fields: Fields = None,
+    compact_records: bool = False,
+) -> list[dict[str, Any]]:
+    """Single-mass form of `mass_search_many`."""
+    found = mass_search_many(
+        offline_db_file, [mass], ppm, da, column, limit, fields, compact_records
+    )
+    return next(iter(found.values()), [])
+
+
+# ---------------------------------------------------------------------------
+# Set-based (batched) lookups
+# ---------------------------------------------------------------------------
+
+
+def _fetch_one(
+    mgr: DatabaseManager, sql: str, params: list[Any], compact_records: bool
+) -> dict[str, Any] | Record | None:
+    if not compact_records:
+        return mgr.query_one(sql, params)
+    names, rows = mgr.query_rows(sql, params)
+    return records_from_rows(names, rows[:1])[0] if rows else None
+
+
+def _fetch_all(
+    mgr: DatabaseManager, sql: str, params: list[Any], compact_records: bool
+) -> list[dict[str, Any]]:
+    """Matching rows as dicts without NULL columns, or as compact Records."""
+    if compact_records:
+        return records_from_rows(*mgr.query_rows(sql, params))
+    return [
+        {k: v for k, v in r.items() if v is not None}
+        for r in mgr.query_all(sql, params)
+    ]
+
+
+def _get(row: dict[str, Any] | Record, name: str) -> Any:
+    return row.value(name) if isinstance(row, Record) else row.get(name)
+
+
+def _chunked(values: Sequence[Any], size: int = IN_CHUNK) -> Iterable[Sequence[Any]]:
+    for i in range(0, len(values), size):
+        yield values[i : i + size]
+
+
+def _query_in(
+    mgr: DatabaseManager,
+    sql_template: str,
+    values: Sequence[Any],
+    compact_records: bool = False,
+) -> list[dict[str, Any]]:
+    """
+    Run `sql_template` once per chunk of `values`, substituting the
+    `{placeholders}` marker with the matching number of `?`.
+    """
+    rows: list[dict[str, Any]] = []
+    for chunk in _chunked(values):
+        sql = sql_template.format(placeholders=",".join("?" for _ in chunk))
+        if compact_records:
+            rows.extend(records_from_rows(*mgr.query_rows(sql, chunk)))
+        else:
+            rows.extend(mgr.query_all(sql, chunk))
+    return rows
+
+
+def _query_in_probed(
+    mgr: DatabaseManager,
+    sql_template: str,
+    id_type: str,
+    expr: str,
+    values: Sequence[Any],
+    compact: bool,
+    key_field: str = "_key",
+    compact_records: bool = False,
+) -> list[dict[str, Any]]:
+    """
+    Chunked `expr IN (...)` lookup; `{match}` in `sql_template` is replaced by
+    the condition. With a compact master index the hash column is probed and
+    rows whose `key_field` (the selected `expr`) is not one of `values`
+    (hash collisions) are dropped.
+    """
+    probe = HASH_PROBES.get(id_type.lower()) if compact else None
+    if probe is None:
+        sql = sql_template.replace("{match}", f"{expr} IN ({{placeholders}})")
+        return _query_in(mgr, sql, values, compact_records)
+
+    sql = sql_template.replace("{match}", f"{probe[0]} IN ({{placeholders}})")
+    hashes = _unique(probe_value(id_type.lower(), v) for v in values)
+    rows = _query_in(mgr, sql, hashes, compact_records)
+    wanted = set(values)
+    return [r for r in rows if _get(r, key_field) in wanted]
+
+
+def _group_rows(
+    rows: list[dict[str, Any]],
+    key: str,
+    first_only: bool = False,
+    drop_none: bool = True,
+) -> dict[Any, list[dict[str, Any]]]:
+    out: dict[Any, list[dict[str, Any]]] = {}
+    for r in rows:
+        k = _get(r, key)
+        if first_only and k in out:
+            continue
+        if drop_none and not isinstance(r, Record):
+            r = {c: v for c, v in r.items() if v is not None}
+        rec = r
+        out.setdefault(k, []).append(rec)
+    return out
+
+
+def _unique(values: Iterable[Any]) -> list[Any]:
+    return list(dict.fromkeys(v for v in values if v is not None))
+
+
+def basic_offline_search_many(
+    offline_db_file: str,
+    id_type: str,
+    id_values: Iterable[Any],
+    fields: Fields = None,
+    compact_records: bool = False,
+) -> dict[Any, list[dict[str, Any]]]:
+    """
+    Batched counterpart of `basic_offline_search` for a single `id_type`.
+
+    Resolves all values with chunked `IN (...)` queries and returns
+    {id_value: records} for the values that matched; misses are omitted.
+    """
+    values = _unique(id_values)
+    if not values:
+        return {}
+    if not os.path.exists(offline_db_file):
+        logger.debug("DB file %s does not exist", offline_db_file)
+        return {}
+
+    mgr = DatabaseManager(offline_db_file)
+
+    if id_type == "cas":
+        sql = (
+            f"SELECT cm.CAS AS _key, {_master_select(offline_db_file, fields, 'cd.')} FROM {OFFLINE_TABLE_CAS} cm "
+            f"JOIN {OFFLINE_TABLE_MASTER} cd ON cd.CID = cm.CID "
+            f"WHERE cm.CAS IN ({{placeholders}}) "
+            f"ORDER BY (cm.source='synonym') DESC, cm.confidence DESC"
+        )
+        found = _group_rows(
+            _query_in(mgr, sql, values, compact_records), "_key", drop_none=False
+        )
+        return {k: [_strip_key(r) for r in recs] for k, recs in found.items()}
+
+    compact = compact_index_enabled(offline_db_file)
+    select = _master_select(offline_db_file, fields)
+
+    if id_type == "inchikey":
+        out: dict[Any, list[dict[str, Any]]] = {}
+        pending = values
+        index = load_inchikey_index(offline_db_file)
+        if index is not None:
+            # Misses are settled by the array index; hits are fetched by CID
+            hits = {v: int(c) for v, c in zip(values, index.lookup(values)) if c >= 0}
+            sql = (
+                f"SELECT InChIKey AS _key, {select} FROM {OFFLINE_TABLE_MASTER} "
+                f"WHERE CID IN ({{placeholders}})"
+            )
+            found = _group_rows(
+                _query_in(mgr, sql, _unique(hits.values()), compact_records),
+                "_key",
+                first_only=True,
+                drop_none=False,
+            )
+            out = {v: [_strip_key(r) for r in found[v]] for v in hits if v in found}
+            pending = [v for v in hits if v not in out]
+
+        if pending:
+            sql = f"SELECT InChIKey AS _key, {select} FROM {OFFLINE_TABLE_MASTER} WHERE {{match}}"
+            found = _group_rows(
+                _query_in_probed(
+                    mgr,
+                    sql,
+                    "inchikey",
+                    "InChIKey",
+                    pending,
+                    compact,
+                    compact_records=compact_records,
+                ),
+                "_key",
+                first_only=True,
+                drop_none=False,
+            )
+            out.update(
+                {v: [_strip_key(r) for r in found[v]] for v in pending if v in found}
+            )
+
+        # Fallback to InChIKey14 prefix match for the keys still unresolved
+        missing = [v for v in values if v not in out]
+        prefixes = _unique(str(v)[:14] for v in missing)
+        if prefixes:
+            sql = (
+                f"SELECT substr(InChIKey,1,14) AS _key, {select} FROM {OFFLINE_TABLE_MASTER} "
+                f"WHERE {{match}}"
+            )
+            rows = _query_in_probed(
+                mgr,
+                sql,
+                "inchikey14",
+                "substr(InChIKey,1,14)",
+                prefixes,
+                compact,
+                compact_records=compact_records,
+            )
+            by_prefix = _group_rows(rows, "_key", first_only=True, drop_none=False)
+            for v in missing:
+                recs = by_prefix.get(str(v)[:14])
+                if recs:
+                    out[v] = [_strip_key(r) for r in recs]
+            if any(v in out for v in missing):
+                warnings.warn(
+                    "basic_offline_search_many: full InChIKey lookup failed; "
+                    "falling back to InChIKey14 prefix match: this is a skeletal match – "
+                    "it ignores stereochemistry (and isotopic labels), so results may be ambiguous.",
+                    UserWarning,
+                )
+        return out
+
+    if id_type in NAME_KEY_FIELDS and name_keys_enabled(offline_db_file):
+        sql = (
+            f"SELECT n.name_key AS _key, {_master_select(offline_db_file, fields, 'm.')} "
+            f"FROM {NAME_KEYS_TABLE} n JOIN {OFFLINE_TABLE_MASTER} m ON m.CID = n.CID "
+            f"WHERE n.field = '{NAME_KEY_FIELDS[id_type]}' "
+            f"AND n.name_key IN ({{placeholders}}) ORDER BY m.CID"
+        )
+        keys = _unique(fold_name(v) for v in values)
+        found = _group_rows(_query_in(mgr, sql, keys, compact_records), "_key")
+        return {
+            v: [_strip_key(r) for r in found[fold_name(v)]]
+            for v in values
+            if fold_name(v) in found
+        }  # unkeyed names are misses, like in basic_offline_search
+
+    if id_type == "cid":
+        return _rekey(
+            _cid_lookup_many(
+                mgr,
+                OFFLINE_TABLE_MASTER,
+                select,
+                values,
+                compact_records=compact_records,
+            ),
+            values,
+        )
+
+    out: dict[Any, list[dict[str, Any]]] = {}
+    for column in _lookup_columns(offline_db_file, id_type):
+        sql = f"SELECT {column} AS _key, {select} FROM {OFFLINE_TABLE_MASTER} WHERE {{match}}"
+        found = _group_rows(
+            _query_in_probed(
+                mgr,
+                sql,
+                column,
+                column,
+                values,
+                compact,
+                compact_records=compact_records,
+            ),
+            "_key",
+        )
+        out.update({k: [_strip_key(r) for r in recs] for k, recs in found.items()})
+        values = [v for v in values if v not in found]
+        if not values:
+            break
+    return out
+
+
+def advanced_search_many(
+    db_file: str,
+    id_type: str,
+    id_values: Iterable[Any],
+    fields: Fields = None,
+    compact_records: bool = False,
+) -> dict[Any, list[dict[str, Any]]]:
+    """
+    Batched counterpart of `advanced_search` for a single `id_type`.
+
+    Returns {id_value: records} for the values that matched; misses are omitted.
+    """
+    values = _unique(id_values)
+    if not values:
+        return {}
+    if not os.path.exists(db_file):
+        logger.debug("DB file %s does not exist", db_file)
+        return {}
+
+    mgr = DatabaseManager(db_file)
+
+    key = (id_type or "").lower()
+    if key == "cas":
+        sql = (
+            f"SELECT cm.CAS AS _key, {_cache_select(fields, matched_cas=True)} "
+            f"FROM cas_mapping cm "
+            f"JOIN {CACHE_TABLE} m ON m.CID = cm.CID "
+            f"{_BEST_CAS_JOIN} "
+            f"WHERE cm.CAS IN ({{placeholders}}) "
+            f"ORDER BY (cm.source='synonym') DESC, cm.confidence DESC, cm.updated_at DESC"
+        )
+    elif key == "cid":
+        found = _cid_lookup_many(
+            mgr,
+            f"{CACHE_TABLE} m {_BEST_CAS_JOIN}",
+            _cache_select(fields),
+            values,
+            cid_column="m.CID",
+            compact_records=compact_records,
+        )
+        return _rekey(found, values)
+    else:
+        columns = {c.lower(): c for c in CACHE_COLUMNS}
+        if key == "smiles" and "canonicalsmiles" in columns:
+            column = "canonicalsmiles"
+        else:
+            column = columns.get(key)
+        if not column:
+            raise ValueError(
+                f"Unsupported search field '{id_type}' for table '{CACHE_TABLE}'"
+            )
+        sql = (
+            f"SELECT m.{column} AS _key, {_cache_select(fields)} "
+            f"FROM {CACHE_TABLE} m {_BEST_CAS_JOIN} "
+            f"WHERE m.{column} IN ({{placeholders}})"
+        )
+
+    found = _group_rows(_query_in(mgr, sql, values, compact_records), "_key")
+    return {k: [_strip_key(r) for r in recs] for k, recs in found.items()}
+
+
+def _cid_lookup_many(
+    mgr: DatabaseManager,
+    table: str,
+    projection: str,
+    values: list[Any],
+    cid_column: str = "CID",
+    compact_records: bool = False,
+) -> dict[Any, list[dict[str, Any]]]:
+    cids = _unique(_as_int(v) for v in values)
+    sql = (
+        f"SELECT {cid_column} AS _key, {projection} FROM {table} "
+        f"WHERE {cid_column} IN ({{placeholders}})"
+    )
+    found = _group_rows(_query_in(mgr, sql, cids, compact_records), "_key")
+    return {k: [_strip_key(r) for r in recs] for k, recs in found.items()}
+
+
+def _rekey(
+    found: dict[Any, list[dict[str, Any]]], values: list[Any]
+) -> dict[Any, list[dict[str, Any]]]:
+    """Key CID results by the caller's original values (e.g. "280" as well as 280)."""
+    return {v: found[_as_int(v)] for v in values if _as_int(v) in found}
+
+
+def _strip_key(rec: dict[str, Any] | Record) -> dict[str, Any] | Record:
+    # Records keep `_key` as a hidden column.
+    if not isinstance(rec, Record):
+        rec.pop("_key", None)
+    return rec
+
+
+def _as_int(value: Any) -> Any:
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        return value
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections.abc import Sequence
+from typing import Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MASTER_TABLE = "compound_data"
+
+_HASHES_FILE = "hashes.npy"
+_CIDS_FILE = "cids.npy"
+_META_FILE = "meta.json"
+
+_BUILD_BATCH = 500_000
+_KEY_BYTES = 32  # InChIKeys are 27 ASCII characters; padded to 4 words
+_SEED = np.uint64(0x9E3779B97F4A7C15)
+_PRIME = np.uint64(0xFF51AFD7ED558CCD)
+
+_index_cache: dict[str, tuple[int, InChIKeyIndex]] = {}
+_index_lock = threading.Lock()
+_stale_warned: set[tuple[str, int]] = set()
+
+
+def inchikey_index_dir(db_file: str) -> str:
+    """Directory holding the InChIKey array index of a master DB."""
+    return f"{db_file}.ikindex"
+
+
+def _db_identity(db_file: str) -> list[int]:
+    st = os.stat(db_file)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def key_hashes(keys: Sequence[Any]) -> np.ndarray:
+    """
+    Signed 64-bit hashes of InChIKeys, computed for the whole batch at once:
+    each key is read as four little-endian words and mixed multiply/xorshift
+    style. Only the index uses these; hits are confirmed against the DB.
+    """
+    try:
+        raw = np.asarray(keys, dtype=f"S{_KEY_BYTES}")
+    except (UnicodeEncodeError, TypeError, ValueError):
+        raw = np.array(
+            [str(k).encode("ascii", "replace")[:_KEY_BYTES] for k in keys],
+            dtype=f"S{_KEY_BYTES}",
+        )
+    words = np.ascontiguousarray(raw).reshape(-1).view("<u8").reshape(-1, 4)
+    h = np.full(len(words), _SEED, dtype=np.uint64)
+    for i in range(words.shape[1]):
+        h ^= words[:, i]
+        h *= _PRIME
+        h ^= h >> np.uint64(29)
+    return h.view(np.int64)
+
+
+def build_inchikey_index(db_file: str, directory: str | None = None) -> int:
+    """
+    Export the (hash, CID) pairs of every master InChIKey as two `.npy`
+    arrays sorted by hash, next to the DB (`<db>.ikindex/`). CID is the
+    rowid of compound_data, so it doubles as the row locator. The index is
+    ignored once the DB changes; rebuild it after updates. Returns the
+    number of keys indexed.
+    """
+    directory = directory or inchikey_index_dir(db_file)
+    os.makedirs(directory, exist_ok=True)
+    identity = _db_identity(db_file)
+
+    hashes, cids = [], []
+    with sqlite3.connect(db_file) as conn:
+        last_cid = -1
+        while True:
+            rows = conn.execute(
+                f"SELECT CID, InChIKey FROM {MASTER_TABLE} "
+                f"WHERE CID > ? AND InChIKey IS NOT NULL ORDER BY CID LIMIT ?",
+                [last_cid, _BUILD_BATCH],
+            ).fetchall()
+            if not rows:
+                break
+            batch_cids, keys = zip(*rows)
+            hashes.append(key_hashes(keys))
+            cids.append(np.asarray(batch_cids, dtype=np.int64))
+            last_cid = rows[-1][0]
+            logger.info("Hashed %d InChIKeys", sum(len(c) for c in cids))
+
+    all_hashes = np.concatenate(hashes) if hashes else np.zeros(0, np.int64)
+    all_cids = np.concatenate(cids) if cids else np.zeros(0, np.int64)
+    # Stable: equal keys keep CID order, so lookups resolve to the lowest CID
+    order = np.argsort(all_hashes, kind="stable")
+
+    for name, array in ((_HASHES_FILE, all_hashes), (_CIDS_FILE, all_cids)):
+        path = os.path.join(directory, name)
+        with open(path + ".tmp", "wb") as fh:
+            np.save(fh, array[order])
+        os.replace(path + ".tmp", path)
+    meta = {"count": len(order), "source": identity}
+    meta_path = os.path.join(directory, _META_FILE)
+    with open(meta_path + ".tmp", "w", encoding="utf-8") as fh:
+        json.dump(meta, fh)
+    os.replace(meta_path + ".tmp", meta_path)
+    return len(order)
+
+
+class InChIKeyIndex:
+    """
+    Read-only, memory-mapped InChIKey → CID index. Whole batches are
+    answered with one vectorized `searchsorted` over the sorted hashes.
+    """
+
+    def __init__(self, directory: str) -> None:
+        with open(os.path.join(directory, _META_FILE), encoding="utf-8") as fh:
+            self.meta = json.load(fh)
+        self.directory = directory
+        self.hashes = np.load(os.path.join(directory, _HASHES_FILE), mmap_mode="r")
+        self.cids = np.load(os.path.join(directory, _CIDS_FILE), mmap_mode="r")
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def lookup(self, keys: Sequence[Any]) -> np.ndarray:
+        """CID per key (int64), -1 where the key is not in the index."""
+        if not len(keys):
+            return np.zeros(0, dtype=np.int64)
+        if not len(self):
+            return np.full(len(keys), -1, dtype=np.int64)
+        h = key_hashes(keys)
+        # Probing in hash order keeps the binary searches cache-friendly
+        order = np.argsort(h)
+        pos = np.empty(len(h), dtype=np.intp)
+        pos[order] = np.searchsorted(self.hashes, h[order])
+        pos = np.minimum(pos, len(self) - 1)
+        return np.where(self.hashes[pos] == h, self.cids[pos], -1)
+
+
+def load_inchikey_index(db_file: str) -> InChIKeyIndex | None:
+    """
+    Array index of a master DB, or None if it was never built or the DB
+    has changed since (lookups then go to SQLite). Opened indexes are
+    shared per path until rebuilt.
+    """
+    directory = inchikey_index_dir(db_file)
+    try:
+        mtime = os.stat(os.path.join(directory, _META_FILE)).st_mtime_ns
+        identity = _db_identity(db_file)
+    except OSError:
+        return None
+    with _index_lock:
+        hit = _index_cache.get(directory)
+    if hit is None or hit[0] != mtime:
+        hit = (mtime, InChIKeyIndex(directory))
+        with _index_lock:
+            _index_cache[directory] = hit
+    index = hit[1]
+
+    if index.meta.get("source") != identity:
+        key = (directory, identity[0])
+        if key not in _stale_warned:
+            _stale_warned.add(key)
+            logger.warning(
+                "InChIKey index %s is older than %s; ignoring it until rebuilt "
+                "(`molid db inchikey-index`).",
+                directory,
+                db_file,
+            )
+        return None
+    return index
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from typing import Any
+
+
+class RecordLayout:
+    """
+    Column names shared by all records of one result set. Names starting
+    with an underscore (e.g. the `_key` used to group batch rows) are kept
+    for internal use but hidden from the mapping view.
+    """
+
+    __slots__ = ("index", "names", "visible")
+
+    def __init__(self, names: Sequence[str]) -> None:
+        self.names = tuple(names)
+        # A repeated name (e.g. m.*, b.CAS AS CAS) resolves to its last column.
+        self.index = {n: i for i, n in enumerate(self.names)}
+        self.visible = tuple(
+            (n, i) for n, i in self.index.items() if not n.startswith("_")
+        )
+
+
+class Record(Mapping[str, Any]):
+    """
+    Compact, read-only lookup result: a tuple of values plus a shared
+    layout, instead of one dict per row.
+
+    Behaves like the dict records (NULL columns are absent) and also allows
+    attribute access (`rec.CID`; NULL columns read as None). Use `to_dict()`
+    where a real dict is needed, e.g. for JSON.
+    """
+
+    __slots__ = ("_layout", "_values")
+
+    def __init__(self, layout: RecordLayout, values: Sequence[Any]) -> None:
+        self._layout = layout
+        self._values = tuple(values)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> Record:
+        return cls(RecordLayout(list(data)), list(data.values()))
+
+    def value(self, name: str) -> Any:
+        """Raw column value (hidden columns included), None if NULL or absent."""
+        i = self._layout.index.get(name)
+        return None if i is None else self._values[i]
+
+    def __getitem__(self, name: str) -> Any:
+        i = self._layout.index.get(name)
+        if i is None or name.startswith("_") or self._values[i] is None:
+            raise KeyError(name)
+        return self._values[i]
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            i = self._layout.index[name]
+        except KeyError:
+            raise AttributeError(name) from None
+        return self._values[i]
+
+    def __iter__(self) -> Iterator[str]:
+        values = self._values
+        return (n for n, i in self._layout.visible if values[i] is not None)
+
+    def __len__(self) -> int:
+        values = self._values
+        return sum(1 for _, i in self._layout.visible if values[i] is not None)
+
+    def __contains__(self, name: object) -> bool:
+        if not isinstance(name, str) or name.startswith("_"):
+            return False
+        return self.value(name) is not None
+
+    def to_dict(self) -> dict[str, Any]:
+        values = self._values
+        return {n: values[i] for n, i in self._layout.visible if values[i] is not None}
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (Record.from_dict, (self.to_dict(),))
+
+    def __repr__(self) -> str:
+        return f"Record({self.to_dict()!r})"
+
+
+def records_from_rows(
+    names: Sequence[str], rows: Iterable[Sequence[Any]]
+) -> list[Record]:
+    """Wrap raw result tuples that share the column `names`."""
+    layout = RecordLayout(names)
+    return [Record(layout, row) for row in rows]
+
+
+def to_dicts(records: Iterable[Mapping[str, Any]]) -> list[dict[str, Any]]:
+    """Dict form of a list of records (compact or not)."""
+    return [r.to_dict() if isinstance(r, Record) else dict(r) for r in records]
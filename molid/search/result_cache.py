@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable
+from typing import Any
+
+from molid.db.name_keys import NAME_KEY_FIELDS, fold_name
+
+# Record column → normalized id_type, used to find the keys a cache write touches
+_RECORD_KEY_FIELDS: dict[str, str] = {
+    "CID": "cid",
+    "InChIKey": "inchikey",
+    "InChI": "inchi",
+    "CanonicalSMILES": "canonicalsmiles",
+    "IsomericSMILES": "isomericsmiles",
+    "MolecularFormula": "molecularformula",
+    "Title": "title",
+    "IUPACName": "iupacname",
+    "CAS": "cas",
+    "MatchedCAS": "cas",
+}
+
+
+def key_value(id_type: str, id_value: Any) -> Any:
+    """
+    `id_value` as it appears in cache keys: CIDs are stripped and names are
+    case/space-folded like the master lookups, so variants share one entry.
+    """
+    if id_type == "cid":
+        return str(id_value).strip()
+    if id_type in NAME_KEY_FIELDS:
+        return fold_name(id_value) or id_value
+    return id_value
+
+
+class ResultCache:
+    """
+    Thread-safe in-process LRU cache for search results with an optional TTL.
+
+    Keys are normalized (id_type, id_value) pairs, optionally extended by a
+    field projection; invalidating a pair also drops its projections. The cache is bounded by the
+    total number of cached records (not entries), so a few formula queries with
+    thousands of matches cannot crowd out memory; results larger than the
+    whole budget are never cached.
+    """
+
+    def __init__(self, max_records: int, ttl: float | None = None) -> None:
+        if max_records <= 0:
+            raise ValueError("max_records must be positive.")
+        self.max_records = max_records
+        self.ttl = ttl if ttl and ttl > 0 else None
+        self._data: OrderedDict[Hashable, tuple[float, int, Any]] = OrderedDict()
+        # (id_type, id_value) → projected keys extending it
+        self._projections: dict[Hashable, set[Hashable]] = {}
+        self._weight = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        """Return the cached value for `key` (refreshing its recency) or None."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, _, value = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                self._drop(key)
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, weight: int = 1) -> None:
+        """Insert `value` under `key`, evicting least-recently-used entries."""
+        weight = max(int(weight), 1)
+        if weight > self.max_records:
+            return
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            self._data[key] = (time.monotonic(), weight, value)
+            self._weight += weight
+            if isinstance(key, tuple) and len(key) > 2:
+                self._projections.setdefault(key[:2], set()).add(key)
+            while self._weight > self.max_records:
+                oldest = next(iter(self._data))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            for k in [key, *self._projections.get(key, ())]:
+                if k in self._data:
+                    self._drop(k)
+                    self.invalidations += 1
+
+    def invalidate_records(self, records: Iterable[dict[str, Any]]) -> None:
+        """Drop every key that one of the given (just written) records answers."""
+        for rec in records or []:
+            for col, id_type in _RECORD_KEY_FIELDS.items():
+                value = rec.get(col)
+                if value is None:
+                    continue
+                self.invalidate((id_type, key_value(id_type, value)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._projections.clear()
+            self._weight = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "records": self._weight,
+                "max_records": self.max_records,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _drop(self, key: Hashable) -> None:
+        _, weight, _ = self._data.pop(key)
+        self._weight -= weight
+        if isinstance(key, tuple) and len(key) > 2:
+            related = self._projections.get(key[:2])
+            if related is not None:
+                related.discard(key)
+                if not related:
+                    del self._projections[key[:2]]
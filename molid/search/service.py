@@ -1,18 +1,52 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
-from collections.abc import Callable
+import threading
+import time
+import weakref
+from collections.abc import Callable, Hashable, Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 
+from molid.db.composition import Composition
 from molid.db.db_utils import create_cache_db
-from molid.pubchemproc.cache import get_cached_or_fetch, store_cached_data
+from molid.db.sqlite_manager import (
+    ConnectionOptions,
+    close_connections,
+    configure_connections,
+    register_readonly,
+)
+from molid.pubchemproc.cache import (
+    get_cached_or_fetch,
+    is_negative_cached,
+    record_negative,
+    store_cached_data,
+)
 from molid.pubchemproc.fetch import fetch_molecule_data
-from molid.search.db_lookup import advanced_search, basic_offline_search
+from molid.pubchemproc.pubchem_client import http_calls
+from molid.search.db_lookup import (
+    CACHE_TABLE,
+    OFFLINE_TABLE_MASTER,
+    advanced_search,
+    advanced_search_many,
+    basic_offline_search,
+    basic_offline_search_many,
+    composition_search,
+    mass_search_many,
+    name_search,
+    project_records,
+)
+from molid.search.records import Record
+from molid.search.result_cache import ResultCache, key_value
+from molid.search.similarity import fingerprint, load_fingerprint_index
 from molid.utils.formula import canonicalize_formula
 from molid.utils.identifiers import UnsupportedIdentifierForMode, normalize_query
+from molid.utils.metrics import COUNT_BUCKETS, METRICS
+from molid.utils.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +55,23 @@ def _has_readable_file(p: str | None) -> bool:
     return bool(p) and os.path.isfile(p) and os.access(p, os.R_OK)
 
 
+def _normalize_fields(fields: Sequence[str] | None) -> tuple[str, ...] | None:
+    """Validate a `fields=` projection argument (None selects all columns)."""
+    if fields is None:
+        return None
+    if isinstance(fields, str):
+        fields = [fields]
+    out = tuple(dict.fromkeys(str(f) for f in fields))
+    if not out:
+        raise ValueError("fields must name at least one column.")
+    return out
+
+
+def _copy_records(records: Iterable[Any]) -> list[Any]:
+    """Shallow per-record copies; compact `Record`s are read-only and shared."""
+    return [r if isinstance(r, Record) else dict(r) for r in records]
+
+
 def _is_writable_dir(path: str | None) -> bool:
     d = Path(os.path.dirname(path) or ".")
     try:
@@ -34,6 +85,10 @@ def _is_writable_dir(path: str | None) -> bool:
         return False
 
 
+# In-flight PubChem lookups, shared by all services in the process
+_api_flights = SingleFlight()
+
+
 # ---------------------------------------------------------------------------
 # Custom exceptions
 # ---------------------------------------------------------------------------
@@ -58,6 +113,24 @@ class SearchConfig:
 
     sources: list[str]
     cache_writes: bool = True
+    # In-process result cache: max cached records (0 disables) and TTL in seconds
+    result_cache_size: int = 0
+    result_cache_ttl: float | None = None
+    # Seconds a PubChem miss is remembered in the cache DB (0 disables)
+    negative_cache_ttl: float = 86400.0
+    # Max concurrent PubChem lookups issued by the asyncio API
+    api_concurrency: int = 8
+    # Serve the master DB read-only (mode=ro&immutable=1, reused connections)
+    master_readonly: bool = False
+    master_mmap_size: int = 256 * 1024 * 1024
+    master_cache_size: int = -65536
+    # PRAGMAs for the pooled SQLite connections (None keeps the SQLite default)
+    sqlite_journal_mode: str | None = None
+    sqlite_synchronous: str | None = None
+    sqlite_cache_size: int | None = None
+    sqlite_temp_store: str | None = None
+    sqlite_busy_timeout: int = 5000
+    sqlite_statement_cache: int = 256
 
 
 # ---------------------------------------------------------------------------
@@ -76,6 +149,26 @@ class SearchService:
         self.master_db = master_db
         self.cache_db = cache_db
         self.cfg = cfg
+        self._cache_writable: bool | None = None
+        self._api_executor: ThreadPoolExecutor | None = None
+        self._api_pool_lock = threading.Lock()
+        self.result_cache: ResultCache | None = (
+            ResultCache(cfg.result_cache_size, cfg.result_cache_ttl)
+            if cfg.result_cache_size and cfg.result_cache_size > 0
+            else None
+        )
+
+        configure_connections(
+            ConnectionOptions(
+                journal_mode=cfg.sqlite_journal_mode,
+                synchronous=cfg.sqlite_synchronous,
+                cache_size=cfg.sqlite_cache_size,
+                temp_store=cfg.sqlite_temp_store,
+                busy_timeout=cfg.sqlite_busy_timeout,
+                statement_cache=cfg.sqlite_statement_cache,
+            ),
+            [master_db, cache_db],
+        )
 
         # If write-through caching is enabled and api may be used, ensure cache schema exists.
         src = [s.lower() for s in (self.cfg.sources or [])]
@@ -86,20 +179,48 @@ class SearchService:
         # Fail fast if requested sources require local files.
         self._ensure_required_files()
 
-        self._dispatch: dict[
-            str, Callable[[dict[str, Any]], tuple[list[dict[str, Any]], str]]
-        ] = {
+        if cfg.master_readonly and "master" in src:
+            register_readonly(
+                self.master_db,
+                immutable=True,
+                mmap_size=cfg.master_mmap_size,
+                cache_size=cfg.master_cache_size,
+            )
+
+        # Tier callables take (query, fields=None, compact_records=False)
+        self._dispatch: dict[str, Callable[..., tuple[list[dict[str, Any]], str]]] = {
             "master": self._search_master,
             "cache": self._search_cache,
             "api": self._search_api,
         }
+        # Tiers that can resolve a whole batch with set-based SQL
+        self._batch_dispatch: dict[
+            str,
+            Callable[..., dict[int, tuple[list[dict[str, Any]], str]]],
+        ] = {
+            "master": self._search_master_many,
+            "cache": self._search_cache_many,
+        }
 
     # ---------------------------------------------------------------------
     # Public API
     # ---------------------------------------------------------------------
 
-    def search(self, query: dict[str, Any]) -> tuple[list[dict[str, Any]], str]:
-        """Resolve query by walking configured sources in order."""
+    def search(
+        self,
+        query: dict[str, Any],
+        fields: Sequence[str] | None = None,
+        compact_records: bool = False,
+    ) -> tuple[list[dict[str, Any]], str]:
+        """
+        Resolve query by walking configured sources in order.
+
+        `fields` limits the returned columns (e.g. ["CID", "InChIKey"]); the
+        local tiers then only read those columns from SQLite.
+        `compact_records` returns read-only `Record`s (tuple-backed, with
+        mapping and attribute access, `to_dict()`) instead of dicts.
+        """
+        fields = _normalize_fields(fields)
         logger.debug("Search request via sources=%s: %s", self.cfg.sources, query)
 
         # Validate input: exactly one key
@@ -109,60 +230,584 @@ class SearchService:
             raise ValueError(f"Expected exactly 1 search parameter, got {len(query)}.")
 
         query_lc = {k.lower(): v for k, v in query.items()}
-        sources = [s.lower() for s in (self.cfg.sources or [])]
-        if not sources:
-            raise ValueError(
-                "No sources configured. Set AppConfig.sources to e.g. ['cache','api']."
-            )
+        sources = self._sources()
+
+        METRICS.incr("search.requests")
+        with METRICS.timer("search.latency_ms"):
+            key = self._result_key(query_lc, fields, compact_records)
+            cached = self._cache_get(key)
+            if cached is not None:
+                METRICS.incr("search.resolved")
+                return cached
+
+            for tier in sources:
+                if not self._tier_available(tier):
+                    continue
+                outcome = self._run_tier(tier, query_lc, fields, compact_records)
+                if outcome is None:
+                    continue
+                records, source = outcome
+                logger.info("Resolved via %s with %d results", tier, len(records))
+                self._cache_put(key, outcome)
+                METRICS.incr("search.resolved")
+                return records, source
 
-        for tier in sources:
-            # 1) Quick availability/permission gates (same as before)
-            if tier == "master" and not _has_readable_file(self.master_db):
-                logger.debug("Skip master: master DB missing/unreadable")
-                continue
-            if tier == "cache" and not _has_readable_file(self.cache_db):
-                logger.debug("Skip cache: cache DB missing/unreadable")
-                continue
-            if tier == "api":
-                if self.cfg.cache_writes and not _is_writable_dir(self.cache_db):
-                    logger.debug(
-                        "api cache writes disabled (cache dir not writable); proceeding without writes"
-                    )
+        # Nothing matched
+        METRICS.incr("search.unresolved")
+        raise MoleculeNotFound("All configured sources exhausted with no result.")
 
-            # 2) Execute tier
-            try:
-                logger.debug("Tier %s: dispatch with %s", tier, query_lc)
-                records, source = self._dispatch[tier](query_lc)
-            except UnsupportedIdentifierForMode as e:
-                logger.debug("Skip %s: %s", tier, e)
+    def search_many(
+        self,
+        queries: Iterable[dict[str, Any]],
+        fields: Sequence[str] | None = None,
+        compact_records: bool = False,
+    ) -> list[tuple[list[dict[str, Any]], str] | None]:
+        """
+        Resolve many queries at once, walking the configured sources in order.
+
+        Local tiers (master, cache) resolve each group of identifiers sharing a
+        normalized id_type with set-based SQL; only the queries a tier leaves
+        unresolved are passed on to the next tier. The API tier is still
+        queried one identifier at a time.
+
+        Returns a list aligned with `queries`: (records, source) for each
+        resolved query, or None when all sources were exhausted. `fields` and
+        `compact_records` shape the records as in `search`.
+        """
+        fields = _normalize_fields(fields)
+        t0 = time.perf_counter()
+        results, pending, keys = self._start_many(queries, fields, compact_records)
+
+        for tier in self._sources():
+            if not pending:
+                break
+            if not self._tier_available(tier, len(pending)):
                 continue
-            except (MoleculeNotFound, DatabaseNotFound) as e:
-                logger.info("Tier %s yielded no result: %s; falling through", tier, e)
-                continue
-            except FileNotFoundError:
-                logger.debug("Tier %s resource missing; falling through", tier)
-                continue
-            except PermissionError:
-                logger.debug("Tier %s permission error; falling through", tier)
-                continue
-            except Exception:
-                logger.exception("Tier %s failed hard; aborting", tier)
-                raise
 
-            if not records:
-                logger.debug("Tier %s returned 0 results; trying next tier", tier)
+            batch = self._batch_dispatch.get(tier)
+            if batch is not None:
+                resolved = self._run_batch(
+                    tier, batch, pending, fields, compact_records
+                )
+            else:
+                resolved = {}
+                for i, query_lc in pending.items():
+                    outcome = self._run_tier(tier, query_lc, fields, compact_records)
+                    if outcome is not None:
+                        resolved[i] = outcome
+
+            self._settle_many(tier, resolved, results, pending, keys)
+
+        self._finish_many(results, t0)
+        return results
+
+    # ------------------------------------------------------------------
+    # Asyncio API
+    # ------------------------------------------------------------------
+
+    async def asearch(
+        self,
+        query: dict[str, Any],
+        fields: Sequence[str] | None = None,
+        compact_records: bool = False,
+    ) -> tuple[list[dict[str, Any]], str]:
+        """
+        Coroutine version of `search`.
+
+        Local tiers run in the event loop's default executor; the API tier runs
+        on a dedicated pool of `cfg.api_concurrency` threads, so any number of
+        concurrent lookups can be awaited while PubChem sees bounded concurrency.
+        """
+        results = await self.asearch_many([query], fields, compact_records)
+        if results[0] is None:
+            raise MoleculeNotFound("All configured sources exhausted with no result.")
+        return results[0]
+
+    async def asearch_many(
+        self,
+        queries: Iterable[dict[str, Any]],
+        fields: Sequence[str] | None = None,
+        compact_records: bool = False,
+    ) -> list[tuple[list[dict[str, Any]], str] | None]:
+        """Coroutine version of `search_many` (see `asearch` for threading)."""
+        fields = _normalize_fields(fields)
+        loop = asyncio.get_running_loop()
+        t0 = time.perf_counter()
+        results, pending, keys = self._start_many(queries, fields, compact_records)
+
+        for tier in self._sources():
+            if not pending:
+                break
+            if not await loop.run_in_executor(
+                None, self._tier_available, tier, len(pending)
+            ):
                 continue
 
-            logger.info("Resolved via %s with %d results", tier, len(records))
-            return records, source
+            batch = self._batch_dispatch.get(tier)
+            if batch is not None:
+                resolved = await loop.run_in_executor(
+                    None,
+                    self._run_batch,
+                    tier,
+                    batch,
+                    dict(pending),
+                    fields,
+                    compact_records,
+                )
+            else:
+                executor = self._api_pool() if tier == "api" else None
+                indices = list(pending)
+                outcomes = await asyncio.gather(
+                    *(
+                        loop.run_in_executor(
+                            executor,
+                            self._run_tier,
+                            tier,
+                            pending[i],
+                            fields,
+                            compact_records,
+                        )
+                        for i in indices
+                    )
+                )
+                resolved = {
+                    i: outcome
+                    for i, outcome in zip(indices, outcomes)
+                    if outcome is not None
+                }
+
+            self._settle_many(tier, resolved, results, pending, keys)
+
+        self._finish_many(results, t0)
+        return results
+
+    def search_names(
+        self,
+        text: str,
+        limit: int = 20,
+        prefix: bool = True,
+        fields: Sequence[str] | None = None,
+        compact_records: bool = False,
+    ) -> tuple[list[dict[str, Any]], str]:
+        """
+        Full-text search of compound names (Title, IUPACName) in the local
+        tiers, in configured order: every word of `text` must match, the last
+        one as a prefix unless `prefix=False`. Returns the best `limit` rows
+        of the first tier with matches; PubChem is not consulted.
+        """
+        fields = _normalize_fields(fields)
+        tables = {
+            "master": (self.master_db, OFFLINE_TABLE_MASTER),
+            "cache": (self.cache_db, CACHE_TABLE),
+        }
+        METRICS.incr("names.requests")
+        with METRICS.timer("names.latency_ms"):
+            for tier in self._sources():
+                if tier not in tables or not self._tier_available(tier):
+                    continue
+                db_file, table = tables[tier]
+                records = name_search(
+                    db_file, table, text, limit, prefix, fields, compact_records
+                )
+                METRICS.incr(f"names.{tier}.{'hit' if records else 'miss'}")
+                if records:
+                    return records, tier
+        raise MoleculeNotFound(f"No compound names matched {text!r}.")
+
+    def search_composition(
+        self,
+        composition: Composition,
+        limit: int = 100,
+        fields: Sequence[str] | None = None,
+        compact_records: bool = False,
+    ) -> tuple[list[dict[str, Any]], str]:
+        """
+        Compounds of the master DB by element counts, e.g.
+        {"C": (6, 8), "N": 1, "F": 0, "Cl": 0, "Br": 0, "I": 0} for C6–C8,
+        any H, exactly one N and no halogens. Counts are exact ints or
+        inclusive (min, max) ranges with max None for unbounded. Answered
+        from the element-count index; cache and PubChem are not consulted.
+        """
+        fields = _normalize_fields(fields)
+        METRICS.incr("composition.requests")
+        with METRICS.timer("composition.latency_ms"):
+            records = []
+            if "master" in self._sources() and self._tier_available("master"):
+                records = composition_search(
+                    self.master_db, composition, limit, fields, compact_records
+                )
+                METRICS.incr(f"composition.master.{'hit' if records else 'miss'}")
+        if not records:
+            raise MoleculeNotFound(f"No compounds matched composition {composition!r}.")
+        return records, "master"
+
+    def search_mass(
+        self,
+        masses: Iterable[float],
+        ppm: float | None = 5.0,
+        da: float | None = None,
+        column: str = "MonoisotopicMass",
+        limit: int | None = None,
+        fields: Sequence[str] | None = None,
+        compact_records: bool = False,
+    ) -> dict[float, list[dict[str, Any]]]:
+        """
+        Master candidates for each target mass within ±`ppm` (or ±`da`
+        Dalton) on MonoisotopicMass (or ExactMass), closest first and at
+        most `limit` per mass. Thousands of targets are resolved in a few
+        indexed queries; returns {mass: records}, masses without candidates
+        omitted. Cache and PubChem are not consulted.
+        """
+        fields = _normalize_fields(fields)
+        masses = list(masses)
+        METRICS.incr("mass.requests", len(masses))
+        with METRICS.timer("mass.latency_ms"):
+            found: dict[float, list[dict[str, Any]]] = {}
+            if "master" in self._sources() and self._tier_available("master"):
+                found = mass_search_many(
+                    self.master_db,
+                    masses,
+                    ppm,
+                    da,
+                    column,
+                    limit,
+                    fields,
+                    compact_records,
+                )
+        METRICS.incr("mass.master.hit", len(found))
+        METRICS.incr("mass.master.miss", len(set(map(float, masses))) - len(found))
+        return found
+
+    def search_similar(
+        self,
+        smiles: str,
+        k: int = 10,
+        threshold: float = 0.0,
+        fields: Sequence[str] | None = None,
+        compact_records: bool = False,
+    ) -> tuple[list[dict[str, Any]], str]:
+        """
+        Nearest neighbours of a structure in the master DB: the `k` compounds
+        whose FP2 fingerprints are most Tanimoto-similar to `smiles` (at
+        least `threshold`), best first, each with a "Similarity" score.
+        Needs OpenBabel and the fingerprint store (`molid db fingerprints`).
+        """
+        fields = _normalize_fields(fields)
+        METRICS.incr("similar.requests")
+        with METRICS.timer("similar.latency_ms"):
+            hits: list[tuple[int, float]] = []
+            if "master" in self._sources() and self._tier_available("master"):
+                index = load_fingerprint_index(self.master_db)
+                if index is None:
+                    raise MoleculeNotFound(
+                        "No up-to-date fingerprint store for the master DB; "
+                        "build it with `molid db fingerprints`."
+                    )
+                query = fingerprint(smiles)
+                if query is None:
+                    raise ValueError(f"Cannot parse SMILES {smiles!r}")
+                hits = index.search(query, k, threshold)
+            found = basic_offline_search_many(
+                self.master_db, "cid", [cid for cid, _ in hits], fields
+            )
+            records = [
+                {**found[cid][0], "Similarity": round(score, 4)}
+                for cid, score in hits
+                if cid in found
+            ]
+            METRICS.incr(f"similar.master.{'hit' if records else 'miss'}")
+        if not records:
+            raise MoleculeNotFound(f"No similar compounds found for {smiles!r}.")
+        if compact_records:
+            records = [Record.from_dict(r) for r in records]
+        return records, "master"
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Snapshot of lookup statistics: the process-wide metrics (per-tier
+        hit/miss/skip counters and latencies, SQL, HTTP), the in-process result
+        cache and the coalescing of concurrent PubChem lookups.
+        """
+        return {
+            "metrics": METRICS.snapshot(),
+            "result_cache": (
+                self.result_cache.stats() if self.result_cache is not None else None
+            ),
+            "api_single_flight": {
+                "leaders": _api_flights.leaders,
+                "coalesced": _api_flights.coalesced,
+                "in_flight": _api_flights.in_flight(),
+            },
+        }
 
-        # Nothing matched
-        raise MoleculeNotFound("All configured sources exhausted with no result.")
+    def close(self) -> None:
+        """Release the API worker threads and this thread's SQLite connections."""
+        with self._api_pool_lock:
+            if self._api_executor is not None:
+                self._api_executor.shutdown(wait=False)
+                self._api_executor = None
+        close_connections()
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
 
+    def _sources(self) -> list[str]:
+        sources = [s.lower() for s in (self.cfg.sources or [])]
+        if not sources:
+            raise ValueError(
+                "No sources configured. Set AppConfig.sources to e.g. ['cache','api']."
+            )
+        return sources
+
+    def _start_many(
+        self,
+        queries: Iterable[dict[str, Any]],
+        fields: tuple[str, ...] | None = None,
+        compact_records: bool = False,
+    ) -> tuple[
+        list[tuple[list[dict[str, Any]], str] | None],
+        dict[int, dict[str, Any]],
+        dict[int, Hashable | None],
+    ]:
+        """Validate a batch and split it into cached results and pending queries."""
+        queries = list(queries)
+        for query in queries:
+            if not isinstance(query, dict):
+                raise TypeError("each query must be a dict of one key/value.")
+            if len(query) != 1:
+                raise ValueError(
+                    f"Expected exactly 1 search parameter, got {len(query)}."
+                )
+        logger.debug(
+            "Batch search of %d queries via sources=%s", len(queries), self._sources()
+        )
+
+        METRICS.incr("search.requests", len(queries))
+        results: list[tuple[list[dict[str, Any]], str] | None] = [None] * len(queries)
+        pending: dict[int, dict[str, Any]] = {}
+        keys: dict[int, Hashable | None] = {}
+        for i, q in enumerate(queries):
+            query_lc = {k.lower(): v for k, v in q.items()}
+            keys[i] = self._result_key(query_lc, fields, compact_records)
+            cached = self._cache_get(keys[i])
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending[i] = query_lc
+        return results, pending, keys
+
+    def _settle_many(
+        self,
+        tier: str,
+        resolved: dict[int, tuple[list[dict[str, Any]], str]],
+        results: list[tuple[list[dict[str, Any]], str] | None],
+        pending: dict[int, dict[str, Any]],
+        keys: dict[int, Hashable | None],
+    ) -> None:
+        """Record one tier's batch outcome and drop resolved queries from pending."""
+        logger.info(
+            "Tier %s resolved %d of %d pending queries",
+            tier,
+            len(resolved),
+            len(pending),
+        )
+        for i, outcome in resolved.items():
+            results[i] = outcome
+            self._cache_put(keys[i], outcome)
+            del pending[i]
+
+    def _finish_many(
+        self, results: list[tuple[list[dict[str, Any]], str] | None], t0: float
+    ) -> None:
+        unresolved = sum(1 for r in results if r is None)
+        METRICS.incr("search.resolved", len(results) - unresolved)
+        METRICS.incr("search.unresolved", unresolved)
+        METRICS.observe("search.batch_ms", (time.perf_counter() - t0) * 1000.0)
+
+    def _api_pool(self) -> ThreadPoolExecutor:
+        with self._api_pool_lock:
+            if self._api_executor is None:
+                self._api_executor = ThreadPoolExecutor(
+                    max_workers=max(int(self.cfg.api_concurrency), 1),
+                    thread_name_prefix="molid-api",
+                )
+                # Services dropped without close() still release their workers
+                weakref.finalize(self, self._api_executor.shutdown, wait=False)
+            return self._api_executor
+
+    def _tier_available(self, tier: str, n: int = 1) -> bool:
+        """Quick availability/permission gates before dispatching to a tier."""
+        if tier == "master" and not _has_readable_file(self.master_db):
+            logger.debug("Skip master: master DB missing/unreadable")
+            METRICS.incr("tier.master.skip", n)
+            return False
+        if tier == "cache" and not _has_readable_file(self.cache_db):
+            logger.debug("Skip cache: cache DB missing/unreadable")
+            METRICS.incr("tier.cache.skip", n)
+            return False
+        if tier == "api":
+            if self.cfg.cache_writes and not self._cache_dir_writable():
+                logger.debug(
+                    "api cache writes disabled (cache dir not writable); proceeding without writes"
+                )
+        return True
+
+    def _result_key(
+        self,
+        query_lc: dict[str, Any],
+        fields: tuple[str, ...] | None = None,
+        compact_records: bool = False,
+    ) -> Hashable | None:
+        """
+        Normalized (id_type, id_value) key for the in-process result cache,
+        extended by the record shape (projected field names, compact records)
+        when it is not the default.
+        """
+        if self.result_cache is None:
+            return None
+        try:
+            id_type, id_value = normalize_query(query_lc, "advanced")
+        except UnsupportedIdentifierForMode:
+            id_type, id_value = next(iter(query_lc.items()))
+        if id_type == "molecularformula":
+            id_value = canonicalize_formula(str(id_value))
+        else:
+            id_value = key_value(id_type, id_value)
+        key: tuple[Any, ...] = (id_type, id_value)
+        if fields is not None or compact_records:
+            projection = tuple(sorted({f.lower() for f in fields or ()}))
+            key += ((projection, compact_records),)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def _cache_get(
+        self, key: Hashable | None
+    ) -> tuple[list[dict[str, Any]], str] | None:
+        if self.result_cache is None or key is None:
+            return None
+        hit = self.result_cache.get(key)
+        if hit is None:
+            return None
+        METRICS.incr("search.result_cache_hits")
+        records, source = hit
+        # Callers own their copies; the cached dicts must stay untouched
+        return _copy_records(records), source
+
+    def _cache_put(
+        self, key: Hashable | None, outcome: tuple[list[dict[str, Any]], str]
+    ) -> None:
+        if self.result_cache is None or key is None:
+            return
+        records, source = outcome
+        self.result_cache.put(
+            key, (_copy_records(records), source), weight=len(records)
+        )
+
+    def _invalidate_written(
+        self, id_type: str, id_value: Any, records: list[dict[str, Any]]
+    ) -> None:
+        """Drop result-cache entries affected by a write to the cache DB."""
+        if self.result_cache is None:
+            return
+        self.result_cache.invalidate((id_type, key_value(id_type, id_value)))
+        self.result_cache.invalidate_records(records)
+
+    def _record_miss(self, id_type: str, id_value: Any) -> None:
+        """Persist an API miss in the negative cache (best effort)."""
+        if not (self.cfg.cache_writes and self.cfg.negative_cache_ttl > 0):
+            return
+        try:
+            record_negative(self.cache_db, id_type, id_value)
+        except Exception:
+            logger.debug("record_negative failed", exc_info=True)
+
+    def _cache_dir_writable(self) -> bool:
+        """Probe once whether the cache directory accepts writes."""
+        if self._cache_writable is None:
+            self._cache_writable = _is_writable_dir(self.cache_db)
+        return self._cache_writable
+
+    def _run_tier(
+        self,
+        tier: str,
+        query_lc: dict[str, Any],
+        fields: tuple[str, ...] | None = None,
+        compact_records: bool = False,
+    ) -> tuple[list[dict[str, Any]], str] | None:
+        """Execute one tier; None means "fall through to the next tier"."""
+        outcome = "error"
+        t0 = time.perf_counter()
+        try:
+            logger.debug("Tier %s: dispatch with %s", tier, query_lc)
+            call = self._dispatch[tier]
+            if fields is None and not compact_records:
+                records, source = call(query_lc)
+            else:
+                records, source = call(query_lc, fields, compact_records)
+            outcome = "hit" if records else "miss"
+        except UnsupportedIdentifierForMode as e:
+            logger.debug("Skip %s: %s", tier, e)
+            outcome = "skip"
+            return None
+        except (MoleculeNotFound, DatabaseNotFound) as e:
+            logger.info("Tier %s yielded no result: %s; falling through", tier, e)
+            outcome = "miss"
+            return None
+        except FileNotFoundError:
+            logger.debug("Tier %s resource missing; falling through", tier)
+            return None
+        except PermissionError:
+            logger.debug("Tier %s permission error; falling through", tier)
+            return None
+        except Exception:
+            logger.exception("Tier %s failed hard; aborting", tier)
+            raise
+        finally:
+            METRICS.incr(f"tier.{tier}.{outcome}")
+            METRICS.observe(
+                f"tier.{tier}.latency_ms", (time.perf_counter() - t0) * 1000.0
+            )
+
+        if not records:
+            logger.debug("Tier %s returned 0 results; trying next tier", tier)
+            return None
+        return records, source
+
+    def _run_batch(
+        self,
+        tier: str,
+        batch: Callable[..., dict[int, tuple[list[dict[str, Any]], str]]],
+        pending: dict[int, dict[str, Any]],
+        fields: tuple[str, ...] | None = None,
+        compact_records: bool = False,
+    ) -> dict[int, tuple[list[dict[str, Any]], str]]:
+        """Execute one set-based tier over all pending queries."""
+        with METRICS.timer(f"tier.{tier}.batch_ms"):
+            resolved = batch(pending, fields, compact_records)
+        METRICS.incr(f"tier.{tier}.hit", len(resolved))
+        METRICS.incr(f"tier.{tier}.miss", len(pending) - len(resolved))
+        return resolved
+
+    def _group_pending(
+        self, pending: dict[int, dict[str, Any]], mode: Literal["basic", "advanced"]
+    ) -> dict[str, dict[int, Any]]:
+        """Normalize pending queries and group them as {id_type: {index: id_value}}."""
+        groups: dict[str, dict[int, Any]] = {}
+        for i, query_lc in pending.items():
+            try:
+                id_type, id_value = normalize_query(query_lc, mode)
+            except UnsupportedIdentifierForMode as e:
+                logger.debug("Skip %s query %d: %s", mode, i, e)
+                continue
+            if id_type == "molecularformula":
+                id_value = canonicalize_formula(str(id_value))
+            groups.setdefault(id_type, {})[i] = id_value
+        return groups
+
     def _ensure_required_files(self) -> None:
         """Verify local artifacts exist for requested sources."""
         src = [s.lower() for s in (self.cfg.sources or [])]
@@ -179,20 +824,34 @@ class SearchService:
     # Mode‑specific implementations
     # ------------------------------------------------------------------
 
-    def _search_master(self, input: dict[str, Any]) -> tuple[list[dict[str, Any]], str]:
+    def _search_master(
+        self,
+        input: dict[str, Any],
+        fields: Sequence[str] | None = None,
+        compact_records: bool = False,
+    ) -> tuple[list[dict[str, Any]], str]:
         id_type, id_value = normalize_query(input, "basic")
         if id_type == "molecularformula":
             id_value = canonicalize_formula(str(id_value))
-        record = basic_offline_search(self.master_db, id_type, id_value)
+        record = basic_offline_search(
+            self.master_db, id_type, id_value, fields, compact_records
+        )
         if not record:
             raise MoleculeNotFound(f"{input!s} not found in master DB.")
         return record, "master"
 
-    def _search_cache(self, input: dict[str, Any]) -> tuple[list[dict[str, Any]], str]:
+    def _search_cache(
+        self,
+        input: dict[str, Any],
+        fields: Sequence[str] | None = None,
+        compact_records: bool = False,
+    ) -> tuple[list[dict[str, Any]], str]:
         id_type, id_value = normalize_query(input, "advanced")
         if id_type == "molecularformula":
             id_value = canonicalize_formula(str(id_value))
-        results = advanced_search(self.cache_db, id_type, id_value)
+        results = advanced_search(
+            self.cache_db, id_type, id_value, fields, compact_records
+        )
         if not results:
             raise MoleculeNotFound(
                 "No compounds matched identifier: "
@@ -200,26 +859,102 @@ class SearchService:
             )
         return results, "cache"
 
-    def _search_api(self, input: dict[str, Any]) -> tuple[list[dict[str, Any]], str]:
+    def _search_master_many(
+        self,
+        pending: dict[int, dict[str, Any]],
+        fields: Sequence[str] | None = None,
+        compact_records: bool = False,
+    ) -> dict[int, tuple[list[dict[str, Any]], str]]:
+        resolved: dict[int, tuple[list[dict[str, Any]], str]] = {}
+        for id_type, by_index in self._group_pending(pending, "basic").items():
+            found = basic_offline_search_many(
+                self.master_db, id_type, by_index.values(), fields, compact_records
+            )
+            for i, id_value in by_index.items():
+                if found.get(id_value):
+                    resolved[i] = (found[id_value], "master")
+        return resolved
+
+    def _search_cache_many(
+        self,
+        pending: dict[int, dict[str, Any]],
+        fields: Sequence[str] | None = None,
+        compact_records: bool = False,
+    ) -> dict[int, tuple[list[dict[str, Any]], str]]:
+        resolved: dict[int, tuple[list[dict[str, Any]], str]] = {}
+        for id_type, by_index in self._group_pending(pending, "advanced").items():
+            found = advanced_search_many(
+                self.cache_db, id_type, by_index.values(), fields, compact_records
+            )
+            for i, id_value in by_index.items():
+                if found.get(id_value):
+                    resolved[i] = (found[id_value], "cache")
+        return resolved
+
+    def _search_api(
+        self,
+        input: dict[str, Any],
+        fields: Sequence[str] | None = None,
+        compact_records: bool = False,
+    ) -> tuple[list[dict[str, Any]], str]:
         id_type, id_value = normalize_query(input, "advanced")
         if id_type == "molecularformula":
             id_value = canonicalize_formula(str(id_value))
 
+        # Concurrent callers asking for the same identifier share one fetch.
+        key = (self.cache_db, bool(self.cfg.cache_writes), id_type, str(id_value))
+        calls_before = http_calls()
+        try:
+            records, source = _api_flights.do(key, self._fetch_api, id_type, id_value)
+        finally:
+            METRICS.observe(
+                "api.http_calls_per_lookup", http_calls() - calls_before, COUNT_BUCKETS
+            )
+        # Coalesced callers share the leader's records: hand each its own
+        # dicts. PubChem replies carry every property; project after the fact.
+        if fields is not None:
+            records = project_records(records, fields)
+        else:
+            records = _copy_records(records)
+        if compact_records:
+            records = [Record.from_dict(r) for r in records]
+        return records, source
+
+    def _fetch_api(
+        self, id_type: str, id_value: Any
+    ) -> tuple[list[dict[str, Any]], str]:
+        # Known misses are answered from the negative cache without asking PubChem.
+        cache_readable = _has_readable_file(self.cache_db)
+        if cache_readable and is_negative_cached(
+            self.cache_db, id_type, id_value, self.cfg.negative_cache_ttl
+        ):
+            METRICS.incr("api.negative_cache_hits")
+            raise MoleculeNotFound(
+                f"{id_type}={id_value!r} is a recorded PubChem miss (negative cache)."
+            )
+
         # If user put "cache" before "api", we might already have it;
         # but if they skipped "cache" we can still honor read-through when desired.
-        if self.cfg.cache_writes and _has_readable_file(self.cache_db):
+        if self.cfg.cache_writes and cache_readable:
             rec, from_cache = get_cached_or_fetch(self.cache_db, id_type, id_value)
             if rec:
+                if not from_cache:
+                    self._invalidate_written(id_type, id_value, rec)
                 return rec, ("cache" if from_cache else "API")
+            # get_cached_or_fetch already asked PubChem; don't ask again.
+            self._record_miss(id_type, id_value)
+            raise MoleculeNotFound(f"No PubChem results for {id_type}={id_value!r}.")
 
         data = fetch_molecule_data(id_type, id_value)
         if not data:
+            self._record_miss(id_type, id_value)
             raise MoleculeNotFound(f"No PubChem results for {id_type}={id_value!r}.")
 
         if self.cfg.cache_writes:
             try:
                 create_cache_db(self.cache_db)
                 stored = store_cached_data(self.cache_db, id_type, id_value, data)
+                self._invalidate_written(id_type, id_value, stored or data)
                 return (stored or data), "API"
             except Exception:
                 logger.debug(
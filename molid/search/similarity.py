@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import numpy as np
+
+from molid.utils.conversion import _require_openbabel
+
+logger = logging.getLogger(__name__)
+
+MASTER_TABLE = "compound_data"
+FP_TYPE = "FP2"  # OpenBabel path-based fingerprint, 1024 bits
+FP_BITS = 1024
+FP_WORDS = FP_BITS // 64
+
+_BITS_FILE = "fingerprints.u64"
+_CIDS_FILE = "cids.i64"
+_COUNTS_FILE = "counts.u16"
+_META_FILE = "meta.json"
+
+_BUILD_BATCH = 50_000
+# Rows scored per task; a block of 64k x 128 bytes stays cache-friendly
+_SCAN_ROWS = 65_536
+
+_POPCOUNT_LUT = np.array([i.bit_count() for i in range(256)], dtype=np.uint8)
+
+_ob_local = threading.local()
+_index_cache: dict[str, tuple[int, FingerprintIndex]] = {}
+_index_lock = threading.Lock()
+_stale_warned: set[tuple[str, int]] = set()
+
+
+def fingerprint_dir(db_file: str) -> str:
+    """Directory holding the fingerprint store of a master DB."""
+    return f"{db_file}.fp"
+
+
+def _db_identity(db_file: str) -> list[int]:
+    st = os.stat(db_file)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _popcount(words: np.ndarray) -> np.ndarray:
+    """Set bits per row of a uint64 word array (summed over the last axis)."""
+    if hasattr(np, "bitwise_count"):  # numpy >= 2.0
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int32)
+    return _POPCOUNT_LUT[words.view(np.uint8)].sum(axis=-1, dtype=np.int32)
+
+
+def fingerprint(smiles: str) -> np.ndarray | None:
+    """
+    FP2 fingerprint of a SMILES string as FP_WORDS uint64 words, or None if
+    OpenBabel cannot parse it. Requires the optional OpenBabel dependency.
+    """
+    state = getattr(_ob_local, "state", None)
+    if state is None:
+        ob = _require_openbabel()
+        conv = ob.OBConversion()
+        conv.SetInFormat("smi")
+        state = (ob, conv, ob.OBFingerprint.FindFingerprint(FP_TYPE))
+        _ob_local.state = state
+    ob, conv, fpr = state
+
+    mol = ob.OBMol()
+    with contextlib.redirect_stderr(io.StringIO()):
+        if not smiles or not conv.ReadString(mol, str(smiles)):
+            return None
+        vec = ob.vectorUnsignedInt()
+        fpr.GetFingerprint(mol, vec)
+    words = np.zeros(FP_BITS // 32, dtype=np.uint32)
+    raw = np.fromiter(vec, dtype=np.uint32)[: len(words)]
+    words[: len(raw)] = raw
+    return words.view(np.uint64)
+
+
+def write_fingerprints(
+    directory: str,
+    rows: Iterable[tuple[int, np.ndarray]],
+    source: list[int] | None = None,
+) -> int:
+    """
+    Write (CID, fingerprint) rows as a fingerprint store: a raw uint64 bit
+    matrix plus CID and popcount arrays, memory-mapped when searched.
+    Files are written under temporary names and swapped in at the end, so
+    a store being searched is never seen half-written. `source` is the
+    (mtime_ns, size) of the DB the rows came from. Returns the row count.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = {
+        name: os.path.join(directory, name)
+        for name in (_BITS_FILE, _CIDS_FILE, _COUNTS_FILE)
+    }
+    n = 0
+    with (
+        open(paths[_BITS_FILE] + ".tmp", "wb") as bits,
+        open(paths[_CIDS_FILE] + ".tmp", "wb") as cids,
+        open(paths[_COUNTS_FILE] + ".tmp", "wb") as counts,
+    ):
+        for cid, fp in rows:
+            fp = np.ascontiguousarray(fp, dtype=np.uint64).reshape(FP_WORDS)
+            bits.write(fp.tobytes())
+            cids.write(np.int64(cid).tobytes())
+            counts.write(np.uint16(_popcount(fp)).tobytes())
+            n += 1
+
+    for path in paths.values():
+        os.replace(path + ".tmp", path)
+    meta = {"fp_type": FP_TYPE, "bits": FP_BITS, "count": n, "source": source}
+    meta_path = os.path.join(directory, _META_FILE)
+    with open(meta_path + ".tmp", "w", encoding="utf-8") as fh:
+        json.dump(meta, fh)
+    os.replace(meta_path + ".tmp", meta_path)
+    return n
+
+
+def _master_fingerprints(db_file: str) -> Iterable[tuple[int, np.ndarray]]:
+    with sqlite3.connect(db_file) as conn:
+        last_cid = -1
+        done = 0
+        while True:
+            rows = conn.execute(
+                f"SELECT CID, CanonicalSMILES FROM {MASTER_TABLE} "
+                f"WHERE CID > ? AND CanonicalSMILES IS NOT NULL ORDER BY CID LIMIT ?",
+                [last_cid, _BUILD_BATCH],
+            ).fetchall()
+            if not rows:
+                break
+            for cid, smiles in rows:
+                fp = fingerprint(smiles)
+                if fp is not None:
+                    yield cid, fp
+            last_cid = rows[-1][0]
+            done += len(rows)
+            logger.info("Fingerprinted %d compounds", done)
+
+
+def build_fingerprints(db_file: str, directory: str | None = None) -> int:
+    """
+    Fingerprint the CanonicalSMILES of every master compound into the store
+    next to the DB (`<db>.fp/`). The store is ignored once the DB changes;
+    rebuild it after updates. Returns the number of compounds fingerprinted.
+    """
+    _require_openbabel()
+    return write_fingerprints(
+        directory or fingerprint_dir(db_file),
+        _master_fingerprints(db_file),
+        _db_identity(db_file),
+    )
+
+
+class FingerprintIndex:
+    """
+    Read-only, memory-mapped fingerprint store with Tanimoto top-k search.
+    Scoring is vectorized per block of rows and the blocks are spread over a
+    thread pool (NumPy releases the GIL), so a search uses all cores.
+    """
+
+    def __init__(self, directory: str) -> None:
+        with open(os.path.join(directory, _META_FILE), encoding="utf-8") as fh:
+            self.meta = json.load(fh)
+        if self.meta.get("bits") != FP_BITS:
+            raise ValueError(f"Unsupported fingerprint store in {directory}")
+        self.directory = directory
+        n = int(self.meta["count"])
+        self.bits = self._map(_BITS_FILE, np.uint64, (n, FP_WORDS))
+        self.cids = self._map(_CIDS_FILE, np.int64, (n,))
+        self.counts = self._map(_COUNTS_FILE, np.uint16, (n,))
+
+    def _map(self, name: str, dtype: Any, shape: tuple[int, ...]) -> np.ndarray:
+        if shape[0] == 0:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(
+            os.path.join(self.directory, name), dtype=dtype, mode="r", shape=shape
+        )
+
+    def __len__(self) -> int:
+        return len(self.cids)
+
+    def _scan(
+        self, start: int, query: np.ndarray, qcount: int, k: int, threshold: float
+    ) -> tuple[np.ndarray, np.ndarray]:
+        block = self.bits[start : start + _SCAN_ROWS]
+        common = _popcount(block & query)
+        union = self.counts[start : start + _SCAN_ROWS].astype(np.int32) + qcount
+        sims = common / (union - common)
+        # Compounds sharing no bit are never neighbours, whatever the threshold
+        keep = np.flatnonzero((sims >= threshold) & (common > 0))
+        if len(keep) > k:
+            keep = keep[np.argpartition(-sims[keep], k - 1)[:k]]
+        return keep + start, sims[keep]
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 10,
+        threshold: float = 0.0,
+        workers: int | None = None,
+    ) -> list[tuple[int, float]]:
+        """
+        The `k` most similar compounds to the `query` fingerprint with a
+        Tanimoto score of at least `threshold` (and above zero), as
+        (CID, score) best first.
+        """
+        query = np.ascontiguousarray(query, dtype=np.uint64).reshape(FP_WORDS)
+        qcount = int(_popcount(query))
+        k = max(int(k), 1)
+        if not len(self) or not qcount:
+            return []
+
+        starts = range(0, len(self), _SCAN_ROWS)
+        workers = min(workers or os.cpu_count() or 1, len(starts))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                parts = list(
+                    pool.map(
+                        lambda s: self._scan(s, query, qcount, k, threshold), starts
+                    )
+                )
+        else:
+            parts = [self._scan(s, query, qcount, k, threshold) for s in starts]
+
+        rows = np.concatenate([p[0] for p in parts])
+        sims = np.concatenate([p[1] for p in parts])
+        # Best score first; equal scores by ascending CID
+        order = np.lexsort((self.cids[rows], -sims))[:k]
+        return [(int(self.cids[rows[i]]), float(sims[i])) for i in order]
+
+
+def load_fingerprint_index(db_file: str) -> FingerprintIndex | None:
+    """
+    Fingerprint store of a master DB, or None if it was never built or the
+    DB has changed since (its CIDs and rows would no longer match). Opened
+    stores are shared per path until rebuilt.
+    """
+    directory = fingerprint_dir(db_file)
+    try:
+        mtime = os.stat(os.path.join(directory, _META_FILE)).st_mtime_ns
+        identity = _db_identity(db_file)
+    except OSError:
+        return None
+    with _index_lock:
+        hit = _index_cache.get(directory)
+    if hit is None or hit[0] != mtime:
+        hit = (mtime, FingerprintIndex(directory))
+        with _index_lock:
+            _index_cache[directory] = hit
+    index = hit[1]
+
+    if index.meta.get("source") != identity:
+        key = (directory, identity[0])
+        if key not in _stale_warned:
+            _stale_warned.add(key)
+            logger.warning(
+                "Fingerprint store %s is older than %s; ignoring it until rebuilt "
+                "(`molid db fingerprints`).",
+                directory,
+                db_file,
+            )
+        return None
+    return index
@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any
+
+from molid.search.batch import resolve_many
+from molid.search.service import MoleculeNotFound, SearchService
+from molid.utils.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["MolIDServer", "serve"]
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Largest accepted request body and number of queries per batch request
+MAX_BODY_BYTES = 16 * 1024 * 1024
+MAX_BATCH = 10_000
+
+_BUSY_BODY = b'{"error": "Server busy; retry shortly."}'
+_BUSY_RESPONSE = (
+    b"HTTP/1.1 503 Service Unavailable\r\n"
+    b"Content-Type: application/json\r\n"
+    b"Content-Length: " + str(len(_BUSY_BODY)).encode() + b"\r\n"
+    b"Retry-After: 1\r\n"
+    b"Connection: close\r\n\r\n" + _BUSY_BODY
+)
+
+
+class _RequestError(Exception):
+    def __init__(self, status: HTTPStatus, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """JSON routes: GET /health, GET /metrics, POST /search, POST /search/batch."""
+
+    # HTTP/1.1 keeps connections alive between requests; every response
+    # carries a Content-Length so clients can reuse the socket.
+    protocol_version = "HTTP/1.1"
+    server: MolIDServer
+
+    def setup(self) -> None:
+        # Reads within a request may stall up to request_timeout; waiting for
+        # the next request on a kept-alive connection only up to idle_timeout.
+        self.timeout = self.server.request_timeout
+        self._served = 0
+        super().setup()
+
+    def handle_one_request(self) -> None:
+        if self._served and not self._await_next_request():
+            self.close_connection = True
+            return
+        self._served += 1
+        super().handle_one_request()
+
+    def _await_next_request(self) -> bool:
+        """True once the next request starts arriving within idle_timeout."""
+        self.connection.settimeout(self.server.idle_timeout)
+        try:
+            ready = bool(self.rfile.peek(1))
+        except OSError:  # idle too long, or reset by the client
+            ready = False
+        self.connection.settimeout(self.server.request_timeout)
+        return ready
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def do_GET(self) -> None:
+        self._dispatch(
+            {
+                "/health": self._health,
+                "/metrics": self._metrics,
+            }
+        )
+
+    def do_POST(self) -> None:
+        self._dispatch(
+            {
+                "/search": self._search,
+                "/search/batch": self._search_batch,
+            }
+        )
+
+    # ------------------------------------------------------------------
+    # Routes
+    # ------------------------------------------------------------------
+
+    def _health(self) -> tuple[HTTPStatus, Any]:
+        svc = self.server.service()
+        return HTTPStatus.OK, {
+            "status": "ok",
+            "sources": svc.cfg.sources,
+            "master_db": svc.master_db,
+            "cache_db": svc.cache_db,
+        }
+
+    def _metrics(self) -> tuple[HTTPStatus, Any]:
+        return HTTPStatus.OK, self.server.service().stats()
+
+    def _search(self) -> tuple[HTTPStatus, Any]:
+        body = self._read_json()
+        query = body.get("query", body) if isinstance(body, dict) else body
+        fields = body.get("fields") if isinstance(body, dict) else None
+        try:
+            records, source = self.server.service().search(query, fields)
+        except MoleculeNotFound as e:
+            return HTTPStatus.NOT_FOUND, {"query": query, "error": str(e)}
+        except (TypeError, ValueError) as e:
+            raise _RequestError(HTTPStatus.BAD_REQUEST, str(e)) from e
+        return HTTPStatus.OK, {"query": query, "source": source, "results": records}
+
+    def _search_batch(self) -> tuple[HTTPStatus, Any]:
+        body = self._read_json()
+        queries = body.get("queries") if isinstance(body, dict) else body
+        fields = body.get("fields") if isinstance(body, dict) else None
+        if not isinstance(queries, list):
+            raise _RequestError(
+                HTTPStatus.BAD_REQUEST, 'Expected a JSON list or {"queries": [...]}.'
+            )
+        if len(queries) > self.server.max_batch:
+            raise _RequestError(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                f"At most {self.server.max_batch} queries per request.",
+            )
+        items = resolve_many(self.server.service(), queries, fields)
+        return HTTPStatus.OK, {"results": [it.to_dict() for it in items]}
+
+    # ------------------------------------------------------------------
+    # Plumbing
+    # ------------------------------------------------------------------
+
+    def _dispatch(
+        self, routes: dict[str, Callable[[], tuple[HTTPStatus, Any]]]
+    ) -> None:
+        t0 = time.perf_counter()
+        path = self.path.split("?", 1)[0].rstrip("/") or "/"
+        route = routes.get(path)
+        try:
+            if route is None:
+                if self.headers.get("Content-Length", "0") != "0":
+                    self.close_connection = True  # body left unread
+                raise _RequestError(HTTPStatus.NOT_FOUND, f"No route {path!r}.")
+            status, payload = route()
+        except _RequestError as e:
+            status, payload = e.status, {"error": str(e)}
+        except Exception as e:
+            logger.exception("Request %s %s failed", self.command, path)
+            status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+        self._send_json(status, payload)
+        METRICS.incr("server.requests")
+        METRICS.incr(f"server.status.{int(status)}")
+        METRICS.observe("server.latency_ms", (time.perf_counter() - t0) * 1000.0)
+
+    def _read_json(self) -> Any:
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise _RequestError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length.")
+        if length > self.server.max_body:
+            # The unread body would corrupt the next request on this socket.
+            self.close_connection = True
+            raise _RequestError(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large."
+            )
+        raw = self.rfile.read(length) if length else b""
+        try:
+            return json.loads(raw or b"null")
+        except ValueError as e:
+            raise _RequestError(HTTPStatus.BAD_REQUEST, f"Invalid JSON: {e}") from e
+
+    def _send_json(self, status: HTTPStatus, payload: Any) -> None:
+        body = json.dumps(payload, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MolIDServer(HTTPServer):
+    """
+    HTTP/JSON front end for a long-lived SearchService.
+
+    Connections are served by a fixed pool of `workers` threads (rather than a
+    thread per connection), so the SQLite files and PubChem see bounded
+    concurrency no matter how many clients connect. A keep-alive connection
+    holds its worker until it goes idle for `idle_timeout` seconds; reads
+    within a request may take up to `request_timeout`. At most `max_queued`
+    connections wait for a worker, further ones get an immediate 503.
+    """
+
+    allow_reuse_address = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        service: Callable[[], SearchService],
+        workers: int = 8,
+        idle_timeout: float = 2.0,
+        request_timeout: float = 15.0,
+        max_queued: int = 64,
+        max_body: int = MAX_BODY_BYTES,
+        max_batch: int = MAX_BATCH,
+    ) -> None:
+        super().__init__(address, _Handler)
+        self.service = service
+        self.idle_timeout = idle_timeout
+        self.request_timeout = request_timeout
+        self.max_body = max_body
+        self.max_batch = max_batch
+        workers = max(int(workers), 1)
+        # One slot per connection being served or waiting for a worker
+        self._slots = threading.BoundedSemaphore(workers + max(int(max_queued), 0))
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="molid-serve"
+        )
+
+    def process_request(self, request: Any, client_address: Any) -> None:
+        if not self._slots.acquire(blocking=False):
+            METRICS.incr("server.rejected")
+            self._reject(request)
+            return
+        try:
+            self._pool.submit(self._process, request, client_address)
+        except RuntimeError:  # shutting down
+            self._slots.release()
+            self.shutdown_request(request)
+
+    def _process(self, request: Any, client_address: Any) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:  # noqa: BLE001 - as socketserver does: log it, keep serving
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def _reject(self, request: Any) -> None:
+        """Answer 503 from the accept loop without reading the request."""
+        try:
+            request.settimeout(1.0)
+            request.sendall(_BUSY_RESPONSE)
+        except OSError:
+            pass
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def serve(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    workers: int = 8,
+    idle_timeout: float = 2.0,
+    request_timeout: float = 15.0,
+    max_queued: int = 64,
+) -> None:
+    """Serve lookups with the process-wide MolID client until interrupted."""
+    from molid.client import get_client
+
+    client = get_client()
+    _ = client.service  # build (and validate) the service before accepting requests
+    server = MolIDServer(
+        (host, port),
+        lambda: client.service,
+        workers,
+        idle_timeout=idle_timeout,
+        request_timeout=request_timeout,
+        max_queued=max_queued,
+    )
+    logger.info("MolID server listening on http://%s:%d", *server.server_address[:2])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        client.reset()
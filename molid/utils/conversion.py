@@ -2,15 +2,19 @@ from __future__ import annotations
 
 import contextlib
 import io
+from collections.abc import Hashable
 from io import StringIO
 from typing import Any
 
 from ase import Atoms
 from ase.data import atomic_masses
 from ase.io import write
+from ase.neighborlist import natural_cutoffs, neighbor_list
 
 # threshold for detecting isotopic masses (amu)
 MASS_TOLERANCE = 0.1
+# covalent-radius multiplier used to perceive bonds for structure fingerprints
+BOND_CUTOFF_MULT = 1.2
 
 
 def _require_openbabel():
@@ -61,6 +65,18 @@ def atoms_to_inchikey(atoms: Atoms) -> str:
     and tagging any isotopic atoms so the resulting InChIKey includes
     isotopic information.
     """
+    isotopes = _isotope_labels(atoms)
+
+    # write to XYZ format
+    buf = StringIO()
+    write(buf, atoms, format="xyz")
+    xyz_content = buf.getvalue()
+    # convert, passing isotope flags if any
+    return convert_xyz_to_inchikey(xyz_content, isotopes=isotopes or None)
+
+
+def _isotope_labels(atoms: Atoms) -> dict[int, int]:
+    """Map 1-based atom index → mass number for atoms with non-standard masses."""
     masses = atoms.get_masses()
     numbers = atoms.get_atomic_numbers()
     isotopes: dict[int, int] = {}
@@ -68,13 +84,23 @@ def atoms_to_inchikey(atoms: Atoms) -> str:
         std_mass = atomic_masses[Z]
         if abs(mass - std_mass) > MASS_TOLERANCE:
             isotopes[i + 1] = int(round(mass))
+    return isotopes
 
-    # write to XYZ format
-    buf = StringIO()
-    write(buf, atoms, format="xyz")
-    xyz_content = buf.getvalue()
-    # convert, passing isotope flags if any
-    return convert_xyz_to_inchikey(xyz_content, isotopes=isotopes or None)
+
+def structure_fingerprint(atoms: Atoms) -> Hashable:
+    """
+    Cheap identity of a structure: atomic numbers, isotope labels and the bond
+    graph perceived from covalent radii. Frames of a trajectory that only
+    differ by small displacements share a fingerprint, so the (expensive)
+    InChIKey conversion can be done once per fingerprint.
+    """
+    i, j = neighbor_list("ij", atoms, natural_cutoffs(atoms, mult=BOND_CUTOFF_MULT))
+    bonds = tuple(sorted({(a, b) for a, b in zip(i.tolist(), j.tolist()) if a < b}))
+    return (
+        tuple(atoms.get_atomic_numbers().tolist()),
+        tuple(sorted(_isotope_labels(atoms).items())),
+        bonds,
+    )
 
 
 def convert_to_inchikey(identifier: str, id_type: str) -> str:
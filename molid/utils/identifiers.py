@@ -24,7 +24,7 @@ _BASIC_ALLOWED = (
     "isomericsmiles",
     "cas",
 )
-_ADV_ALLOWED = _BASIC_ALLOWED + ("isomericsmiles",)
+_ADV_ALLOWED = _BASIC_ALLOWED
 
 
 def normalize_query(
@@ -42,10 +42,6 @@ def normalize_query(
 
     if k == "smiles":
         return "canonicalsmiles", v
-    if k == "isomericsmiles":
-        # master DB doesn't have IsomericSMILES; map to CanonicalSMILES for basic
-        return ("canonicalsmiles" if mode == "basic" else "isomericsmiles"), v
-
     if k in ("formula", "molecularformula"):
         if k == "formula" and not any(ch.isupper() for ch in v):
             raise ValueError("Given formula has no upper character.")
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import threading
+import time
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+# Upper bucket bounds for latencies (milliseconds) and for small counts
+LATENCY_BUCKETS_MS: tuple[float, ...] = (
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    25,
+    50,
+    100,
+    250,
+    500,
+    1000,
+    2500,
+    5000,
+    10000,
+    30000,
+)
+COUNT_BUCKETS: tuple[float, ...] = (0, 1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 50)
+
+
+class Histogram:
+    """Fixed-bucket histogram (last bucket counts values above the largest bound)."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS_MS) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def observe(self, value: float) -> None:
+        idx = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                idx = i
+                break
+        self.counts[idx] += 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float | None:
+        """Bucket-resolution estimate of the q-quantile (upper bound of its bucket)."""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target and n:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "mean": (self.total / self.count) if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": list(self.buckets),
+            "counts": list(self.counts),
+        }
+
+    @classmethod
+    def from_snapshot(cls, snap: dict[str, Any]) -> Histogram:
+        h = cls(snap.get("buckets") or LATENCY_BUCKETS_MS)
+        counts = list(snap.get("counts") or [])
+        if len(counts) == len(h.counts):
+            h.counts = [int(c) for c in counts]
+        h.count = int(snap.get("count") or 0)
+        h.total = float(snap.get("sum") or 0.0)
+        if h.count:
+            h.min = float(snap["min"])
+            h.max = float(snap["max"])
+        return h
+
+    def merge(self, other: Histogram) -> None:
+        if other.buckets != self.buckets:
+            raise ValueError("Cannot merge histograms with different buckets.")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+
+class Metrics:
+    """Thread-safe registry of named counters and histograms."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = {}
+        self._histograms: dict[str, Histogram] = {}
+
+    def incr(self, name: str, n: float = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def observe(
+        self, name: str, value: float, buckets: Sequence[float] = LATENCY_BUCKETS_MS
+    ) -> None:
+        with self._lock:
+            h = self._histograms.get(name)
+            if h is None:
+                h = self._histograms[name] = Histogram(buckets)
+            h.observe(value)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Observe the wall-clock duration of the block in milliseconds."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - t0) * 1000.0)
+
+    def counter(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "counters": dict(sorted(self._counters.items())),
+                "histograms": {
+                    k: h.snapshot() for k, h in sorted(self._histograms.items())
+                },
+            }
+
+    def merge(self, snap: dict[str, Any]) -> None:
+        """Add a snapshot (e.g. loaded from disk) into this registry."""
+        with self._lock:
+            for k, v in (snap.get("counters") or {}).items():
+                self._counters[k] = self._counters.get(k, 0) + v
+            for k, hs in (snap.get("histograms") or {}).items():
+                other = Histogram.from_snapshot(hs)
+                mine = self._histograms.get(k)
+                if mine is None:
+                    self._histograms[k] = other
+                elif mine.buckets == other.buckets:
+                    mine.merge(other)
+
+    def drain(self) -> dict[str, Any]:
+        """Return a snapshot and clear the registry in one step."""
+        with self._lock:
+            snap = {
+                "counters": dict(sorted(self._counters.items())),
+                "histograms": {
+                    k: h.snapshot() for k, h in sorted(self._histograms.items())
+                },
+            }
+            self._counters.clear()
+            self._histograms.clear()
+            return snap
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+# Process-wide registry used by SearchService, DatabaseManager and pubchem_client
+METRICS = Metrics()
+
+
+def load_stats(path: str | Path) -> dict[str, Any]:
+    """Read a persisted metrics snapshot (empty snapshot if missing/corrupt)."""
+    try:
+        return json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return {"counters": {}, "histograms": {}}
+
+
+def persist_stats(path: str | Path, metrics: Metrics = METRICS) -> dict[str, Any]:
+    """
+    Move the in-process metrics into the snapshot file at `path` (best effort,
+    last writer wins under concurrent processes) and return the merged snapshot.
+    """
+    merged = Metrics()
+    merged.merge(load_stats(path))
+    merged.merge(metrics.drain())
+    snap = merged.snapshot()
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_suffix(p.suffix + f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(snap))
+    os.replace(tmp, p)
+    return snap
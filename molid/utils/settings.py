@@ -7,6 +7,8 @@ from appdirs import user_cache_dir, user_data_dir
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from molid.db.schema import DEFAULT_MASTER_EXTRA
+
 # Allow tests or callers to specify a custom env file location
 ENV_FILE = Path(os.getenv("MOLID_ENV_FILE", str(Path.home() / ".molid.env")))
 
@@ -43,6 +45,14 @@ class AppConfig(BaseSettings):
     max_files: int | None = Field(
         None, description="Default maximum number of SDF files to process (None = all)"
     )
+    master_properties: list[str] = Field(
+        default_factory=lambda: list(DEFAULT_MASTER_EXTRA),
+        description=(
+            "Optional PubChem properties ingested into the master DB besides the "
+            "core columns, e.g. HBondDonorCount or HeavyAtomCount "
+            "(see MASTER_EXTRA_PROPERTIES)."
+        ),
+    )
     model_config = SettingsConfigDict(
         env_prefix="MOLID_",
         env_file=str(ENV_FILE),
@@ -61,6 +71,74 @@ class AppConfig(BaseSettings):
             "Set to 0 to disable caching, even if expansion is enabled."
         ),
     )
+    result_cache_size: int = Field(
+        0,
+        description=(
+            "Max number of records kept in the in-process LRU result cache in front "
+            "of the source walk. Set to 0 to disable."
+        ),
+    )
+    result_cache_ttl: float | None = Field(
+        None,
+        description="Seconds before an in-process cached result expires (None = never).",
+    )
+    negative_cache_ttl: float = Field(
+        86400.0,
+        description=(
+            "Seconds a PubChem miss is remembered in the cache DB so repeated "
+            "unresolvable queries skip the API. Set to 0 to disable."
+        ),
+    )
+    api_concurrency: int = Field(
+        8,
+        description="Max concurrent PubChem lookups issued by the asyncio search API.",
+    )
+    master_readonly: bool = Field(
+        False,
+        description=(
+            "Open the master DB read-only and immutable (no locking or journal "
+            "checks) with per-thread connection reuse. Only enable it while no "
+            "process updates the master DB."
+        ),
+    )
+    master_mmap_size: int = Field(
+        256 * 1024 * 1024,
+        description="Bytes of the master DB memory-mapped in read-only mode.",
+    )
+    master_cache_size: int = Field(
+        -65536,
+        description=(
+            "SQLite page cache for the read-only master (PRAGMA cache_size; "
+            "negative values are KiB)."
+        ),
+    )
+    sqlite_journal_mode: str | None = Field(
+        None,
+        description=(
+            "PRAGMA journal_mode for pooled SQLite connections (e.g. WAL); "
+            "unset keeps the mode stored in each file."
+        ),
+    )
+    sqlite_synchronous: str | None = Field(
+        None, description="PRAGMA synchronous (OFF, NORMAL, FULL, EXTRA)."
+    )
+    sqlite_cache_size: int | None = Field(
+        None,
+        description="PRAGMA cache_size for pooled connections (negative = KiB).",
+    )
+    sqlite_temp_store: str | None = Field(
+        None, description="PRAGMA temp_store (DEFAULT, FILE, MEMORY)."
+    )
+    sqlite_busy_timeout: int = Field(
+        5000, description="Milliseconds to wait on a locked SQLite database."
+    )
+    sqlite_statement_cache: int = Field(
+        256, description="Prepared statements cached per pooled connection."
+    )
+    stats_file: str = Field(
+        str(Path(user_data_dir("molid")) / "stats.json"),
+        description="Where CLI lookups accumulate the metrics shown by `molid stats`.",
+    )
 
 
 def load_config() -> AppConfig:
@@ -1,5 +1,8 @@
 import pytest
 
+from molid.db.db_utils import create_cache_db, create_offline_db, save_to_database
+from molid.db.sqlite_manager import DatabaseManager
+
 
 @pytest.fixture(autouse=True)
 def isolated_molid_env(tmp_path, monkeypatch):
@@ -8,3 +11,35 @@ def isolated_molid_env(tmp_path, monkeypatch):
     not ~/.molid.env. This prevents pytest from polluting your real config.
     """
     monkeypatch.setenv("MOLID_ENV_FILE", str(tmp_path / "molid_test.env"))
+    monkeypatch.setenv("MOLID_STATS_FILE", str(tmp_path / "molid_stats.json"))
+
+
+@pytest.fixture
+def seeded_dbs(tmp_path):
+    """A small master DB (acetone, acetaldehyde) and cache DB (CO2 + CAS)."""
+    master = str(tmp_path / "master.db")
+    cache = str(tmp_path / "cache.db")
+    create_offline_db(master)
+    create_cache_db(cache)
+    # Through the ingest path, so the derived lookup tables are filled too
+    columns = ["CID", "Title", "MolecularFormula", "CanonicalSMILES", "InChIKey"]
+    save_to_database(
+        master,
+        [
+            dict(zip(columns, row))
+            for row in [
+                (100, "Acetone", "C3H6O", "CC(=O)C", "CSCPPACGZOOCGX-UHFFFAOYSA-N"),
+                (101, "Acetaldehyde", "C2H4O", "CC=O", "IKHGUXGNUITLKF-UHFFFAOYSA-N"),
+            ]
+        ],
+        columns,
+    )
+    DatabaseManager(cache).executemany(
+        "INSERT INTO cached_molecules(CID,Title,MolecularFormula,CanonicalSMILES,InChIKey) VALUES (?,?,?,?,?)",
+        [(280, "CO2", "CO2", "C(=O)=O", "CURLTUGMZLYLDI-UHFFFAOYSA-N")],
+    )
+    DatabaseManager(cache).executemany(
+        "INSERT INTO cas_mapping(CAS,CID,source,confidence) VALUES (?,?,?,?)",
+        [("124-38-9", 280, "xref", 2)],
+    )
+    return master, cache
@@ -0,0 +1,61 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import molid.search.service as svc_mod
+from molid.search.service import MoleculeNotFound, SearchConfig, SearchService
+
+
+def _api_service(monkeypatch, tmp_path, api, concurrency=2):
+    monkeypatch.setattr(svc_mod, "_is_writable_dir", lambda p: True)
+    monkeypatch.setattr(SearchService, "_search_api", api)
+    return SearchService(
+        master_db=str(tmp_path / "m.db"),
+        cache_db=str(tmp_path / "c.db"),
+        cfg=SearchConfig(
+            sources=["api"], cache_writes=False, api_concurrency=concurrency
+        ),
+    )
+
+
+def test_asearch_many_bounds_api_concurrency(monkeypatch, tmp_path):
+    lock = threading.Lock()
+    active = [0]
+    peak = [0]
+
+    def api(self, q):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.01)
+        with lock:
+            active[0] -= 1
+        if q["cid"] == 3:
+            raise MoleculeNotFound("nope")
+        return [{"CID": q["cid"]}], "API"
+
+    svc = _api_service(monkeypatch, tmp_path, api, concurrency=2)
+    queries = [{"cid": i} for i in range(10)]
+    results = asyncio.run(svc.asearch_many(queries))
+    svc.close()
+
+    assert peak[0] <= 2
+    assert results[3] is None
+    assert [r[0][0]["CID"] for i, r in enumerate(results) if i != 3] == [
+        i for i in range(10) if i != 3
+    ]
+
+
+def test_asearch_matches_search(seeded_dbs):
+    master, cache = seeded_dbs
+    svc = SearchService(
+        master_db=master,
+        cache_db=cache,
+        cfg=SearchConfig(sources=["master", "cache"], cache_writes=False),
+    )
+    q = {"cas": "124-38-9"}
+    assert asyncio.run(svc.asearch(q)) == svc.search(q)
+    with pytest.raises(MoleculeNotFound):
+        asyncio.run(svc.asearch({"inchikey": "ZZZZZZZZZZZZZZ-UHFFFAOYSA-N"}))
@@ -0,0 +1,92 @@
+import io
+import json
+
+from click.testing import CliRunner
+
+from molid.cli import cli
+from molid.search.batch import read_queries, run_batch
+from molid.search.service import SearchConfig, SearchService
+
+
+def test_read_queries_formats():
+    lines = io.StringIO("CC(=O)C\n\n  CC=O \n")
+    assert list(read_queries(lines, "lines", "smiles")) == [
+        {"smiles": "CC(=O)C"},
+        {"smiles": "CC=O"},
+    ]
+
+    rows = io.StringIO("name,cid\nacetone,100\nblank,\n")
+    assert list(read_queries(rows, "csv", "cid", column="cid")) == [{"cid": "100"}]
+
+    jsonl = io.StringIO('{"cas": "124-38-9"}\n"CC=O"\nnot json\n')
+    assert list(read_queries(jsonl, "jsonl", "smiles")) == [
+        {"cas": "124-38-9"},
+        {"smiles": "CC=O"},
+        "not json",
+    ]
+
+
+def test_run_batch_keeps_input_order(seeded_dbs):
+    master, cache = seeded_dbs
+    svc = SearchService(master, cache, SearchConfig(sources=["master", "cache"]))
+    queries = [{"cid": 101}, {"cid": 999}, "bad", {"cas": "124-38-9"}, {"cid": 100}]
+
+    items = list(run_batch(svc, queries, workers=3, chunk_size=2))
+
+    assert [it.query for it in items] == queries
+    assert [it.source for it in items] == ["master", None, None, "cache", "master"]
+    assert items[1].error == "not found"
+    assert items[2].error.startswith("invalid query")
+    assert items[4].records[0]["Title"] == "Acetone"
+
+
+def test_run_batch_workers_close_their_connections(seeded_dbs, monkeypatch):
+    import threading
+
+    import molid.search.batch as batch_mod
+
+    closed = []
+    monkeypatch.setattr(
+        batch_mod,
+        "close_connections",
+        lambda: closed.append(threading.current_thread().name),
+    )
+    master, cache = seeded_dbs
+    svc = SearchService(master, cache, SearchConfig(sources=["master", "cache"]))
+    list(run_batch(svc, [{"cid": 100}] * 5, workers=2, chunk_size=2))
+    assert len(closed) == 3
+    assert all(name.startswith("molid-batch") for name in closed)
+
+
+def test_cli_batch_streams_jsonl(tmp_path, seeded_dbs):
+    master, cache = seeded_dbs
+    src = tmp_path / "ids.csv"
+    src.write_text("id\n100\n12345\n101\n")
+    env = {
+        "MOLID_MASTER_DB": master,
+        "MOLID_CACHE_DB": cache,
+        "MOLID_SOURCES": json.dumps(["master"]),
+        "MOLID_CACHE_WRITES": "false",
+    }
+
+    res = CliRunner().invoke(
+        cli,
+        ["search", "--batch", str(src), "--id-type", "cid", "--workers", "2"],
+        env=env,
+    )
+
+    assert res.exit_code == 0, res.output + res.stderr
+    out = [json.loads(line) for line in res.stdout.splitlines()]
+    assert [o["query"] for o in out] == [
+        {"cid": "100"},
+        {"cid": "12345"},
+        {"cid": "101"},
+    ]
+    assert [o["source"] for o in out] == ["master", None, "master"]
+    assert "resolved 2" in res.stderr and "master: 2" in res.stderr
+
+
+def test_cli_search_requires_identifier_or_batch():
+    res = CliRunner().invoke(cli, ["search"])
+    assert res.exit_code != 0
+    assert "IDENTIFIER or --batch" in res.output
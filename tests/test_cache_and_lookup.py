@@ -1,8 +1,18 @@
+import pytest
+
 import molid.pubchemproc.pubchem_client as pc
-from molid.db.db_utils import create_cache_db, create_offline_db
+from molid.db.db_utils import create_cache_db, create_offline_db, save_to_database
+from molid.db.name_index import enable_name_index, fts5_available
+from molid.db.name_keys import build_name_keys
 from molid.db.sqlite_manager import DatabaseManager
 from molid.pubchemproc.cache import get_cached_or_fetch
-from molid.search.db_lookup import advanced_search, master_lookup_by_cas
+from molid.search.db_lookup import (
+    advanced_search,
+    basic_offline_search,
+    basic_offline_search_many,
+    master_lookup_by_cas,
+    name_search,
+)
 
 
 def test_read_then_write_through(tmp_path, monkeypatch):
@@ -142,3 +152,193 @@ def test_cache_advanced_search_cas_join(tmp_path):
     assert rows and rows[0]["CID"] == 200
     # Ensure derived CAS is present in projection
     assert rows[0]["CAS"] == "124-38-9"
+
+
+def test_negative_cache_roundtrip(tmp_path):
+    from molid.pubchemproc.cache import (
+        clear_negative,
+        is_negative_cached,
+        record_negative,
+    )
+
+    db = str(tmp_path / "neg.db")
+    create_cache_db(db)
+    assert not is_negative_cached(db, "name", "benzine", 3600)
+    record_negative(db, "name", "benzine")
+    assert is_negative_cached(db, "name", "benzine", 3600)
+    assert not is_negative_cached(db, "name", "benzine", 0)  # disabled
+    # Expired entries no longer count as misses
+    DatabaseManager(db).execute(
+        "UPDATE negative_cache SET missed_at = datetime('now', '-2 hours')"
+    )
+    assert not is_negative_cached(db, "name", "benzine", 3600)
+    clear_negative(db, "name", "benzine")
+    assert not DatabaseManager(db).query_all("SELECT * FROM negative_cache")
+
+
+def test_best_cas_follows_cas_mapping_writes(tmp_path):
+    db = str(tmp_path / "cache.db")
+    create_cache_db(db)
+    mgr = DatabaseManager(db)
+    mgr.execute(
+        "INSERT INTO cached_molecules (CID, Title, MolecularFormula) VALUES (280, 'CO2', 'CO2')"
+    )
+    mgr.executemany(
+        "INSERT INTO cas_mapping (CAS, CID, source, confidence) VALUES (?,?,?,?)",
+        [("111-11-1", 280, "xref", 1), ("124-38-9", 280, "xref", 2)],
+    )
+
+    def best():
+        return advanced_search(db, "cid", 280)[0]["CAS"]
+
+    assert best() == "124-38-9"
+    mgr.execute("UPDATE cas_mapping SET confidence = 0 WHERE CAS = '124-38-9'")
+    assert best() == "111-11-1"
+    mgr.execute("DELETE FROM cas_mapping WHERE CAS = '111-11-1'")
+    assert best() == "124-38-9"
+
+    rows = advanced_search(db, "cas", "124-38-9")
+    assert rows[0]["CAS"] == rows[0]["MatchedCAS"] == "124-38-9"
+    assert advanced_search(db, "molecularformula", "CO2")[0]["CAS"] == "124-38-9"
+
+    # Cache DBs from before best_cas are backfilled on schema init
+    mgr.execute("DELETE FROM best_cas")
+    create_cache_db(db)
+    assert mgr.query_all("SELECT CID, CAS FROM best_cas") == [
+        {"CID": 280, "CAS": "124-38-9"}
+    ]
+
+    # ... once: later inits do not rank cas_mapping again
+    from molid.db.sqlite_manager import _pooled_connection
+
+    statements = []
+    _pooled_connection(db).set_trace_callback(statements.append)
+    try:
+        create_cache_db(db)
+    finally:
+        _pooled_connection(db).set_trace_callback(None)
+    assert statements and not any("INSERT INTO best_cas" in q for q in statements)
+
+
+def test_name_search_tracks_writes_and_backfills(seeded_dbs):
+    if not fts5_available():
+        pytest.skip("SQLite without FTS5")
+    master, cache = seeded_dbs
+    hits = name_search(master, "compound_data", "acet")
+    assert sorted(r["CID"] for r in hits) == [100, 101]
+    assert [r["CID"] for r in name_search(master, "compound_data", "ACETONE")] == [100]
+    assert name_search(master, "compound_data", "acet", prefix=False) == []
+
+    mgr = DatabaseManager(master)
+    mgr.execute("UPDATE compound_data SET Title = 'Propanone' WHERE CID = 100")
+    assert name_search(master, "compound_data", "acetone") == []
+    assert name_search(master, "compound_data", "propan", fields=["CID"]) == [
+        {"CID": 100}
+    ]
+    mgr.execute("DELETE FROM compound_data WHERE CID = 100")
+    assert name_search(master, "compound_data", "propanone") == []
+
+    rows = name_search(cache, "cached_molecules", "co2")
+    assert rows[0]["CID"] == 280 and rows[0]["CAS"] == "124-38-9"
+
+    # A populated DB without the index gets it rebuilt from existing rows.
+    mgr.execute("DROP TABLE compound_data_names")
+    for op in ("insert", "update", "delete"):
+        mgr.execute(f"DROP TRIGGER trg_compound_data_names_{op}")
+    assert name_search(master, "compound_data", "acetaldehyde") == []
+    assert enable_name_index(master, "compound_data")
+    assert name_search(master, "compound_data", "acetaldehyde")[0]["CID"] == 101
+
+
+def test_title_lookup_is_case_and_space_insensitive(seeded_dbs):
+    master, _ = seeded_dbs
+    assert basic_offline_search(master, "title", "  ACETONE ")[0]["CID"] == 100
+
+    # Masters from before the key table resolve by exact title until reindexed
+    DatabaseManager(master).execute("DROP TABLE compound_names")
+    assert basic_offline_search(master, "title", "Acetone")[0]["CID"] == 100
+    assert basic_offline_search(master, "title", "  ACETONE ") == []
+
+    assert build_name_keys(master) == 2
+    assert basic_offline_search(master, "title", "  ACETONE ")[0]["CID"] == 100
+    found = basic_offline_search_many(master, "title", ["acetone", "ACETALDEHYDE"])
+    assert {k: [r["CID"] for r in v] for k, v in found.items()} == {
+        "acetone": [100],
+        "ACETALDEHYDE": [101],
+    }
+
+    # Ingest keeps the keys in step with renamed titles
+    save_to_database(master, [{"CID": 100, "Title": "Propanone"}], ["CID", "Title"])
+    assert basic_offline_search(master, "title", "acetone") == []
+    assert basic_offline_search(master, "title", "PROPANONE")[0]["CID"] == 100
+
+    # A key miss is final: no unindexed scan of the name columns
+    from molid.db.sqlite_manager import _pooled_connection
+
+    statements = []
+    _pooled_connection(master).set_trace_callback(statements.append)
+    try:
+        assert basic_offline_search(master, "title", "Unobtainium") == []
+        assert basic_offline_search_many(master, "title", ["Unobtainium"]) == {}
+    finally:
+        _pooled_connection(master).set_trace_callback(None)
+    assert statements and not any("compound_data WHERE" in q for q in statements)
+
+
+def test_master_ingests_both_smiles_flavors(tmp_path):
+    import sqlite3
+
+    from molid.db.schema import OFFLINE_SCHEMA
+    from molid.pubchemproc.pubchem import iter_sdf_records
+
+    def sdf(tags):
+        body = "\n".join(f"> <{k}>\n{v}\n" for k, v in tags.items())
+        return f"mol\n\n  0  0  0  0  0  0            999 V2000\nM  END\n{body}\n$$$$\n"
+
+    path = tmp_path / "lib.sdf"
+    path.write_text(
+        sdf(
+            {
+                "PUBCHEM_COMPOUND_CID": "5793",
+                "PUBCHEM_CONNECTIVITY_SMILES": "C(C1C(C(C(C(O1)O)O)O)O)O",
+                "PUBCHEM_SMILES": "C([C@@H]1[C@H]([C@@H]([C@H](C(O1)O)O)O)O)O",
+            }
+        )
+        # Archives from before the tag rename
+        + sdf(
+            {
+                "PUBCHEM_COMPOUND_CID": "5950",
+                "PUBCHEM_OPENEYE_CAN_SMILES": "CC(C(=O)O)N",
+                "PUBCHEM_OPENEYE_ISO_SMILES": "C[C@@H](C(=O)O)N",
+            }
+        )
+    )
+    records = list(iter_sdf_records(path))
+    assert records[1] == {
+        "CID": "5950",
+        "CanonicalSMILES": "CC(C(=O)O)N",
+        "IsomericSMILES": "C[C@@H](C(=O)O)N",
+    }
+
+    # A master created before IsomericSMILES existed is migrated in place
+    db = str(tmp_path / "master.db")
+    with sqlite3.connect(db) as conn:
+        conn.executescript(OFFLINE_SCHEMA.replace("IsomericSMILES      TEXT,", ""))
+    create_offline_db(db)
+    for rec in records:
+        save_to_database(db, [rec], list(rec))
+
+    iso = basic_offline_search(db, "isomericsmiles", "C[C@@H](C(=O)O)N")
+    assert iso[0]["CID"] == 5950
+    # Plain SMILES queries match either flavor
+    assert basic_offline_search(db, "canonicalsmiles", "CC(C(=O)O)N")[0]["CID"] == 5950
+    found = basic_offline_search_many(
+        db,
+        "canonicalsmiles",
+        ["C([C@@H]1[C@H]([C@@H]([C@H](C(O1)O)O)O)O)O", "CC(C(=O)O)N", "C"],
+        fields=["CID"],
+    )
+    assert {k: v[0]["CID"] for k, v in found.items()} == {
+        "C([C@@H]1[C@H]([C@@H]([C@H](C(O1)O)O)O)O)O": 5793,
+        "CC(C(=O)O)N": 5950,
+    }
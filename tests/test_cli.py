@@ -76,8 +76,13 @@ def test_search_master_not_found(tmp_path, runner):
 
 
 def test_config_set_and_show(monkeypatch, tmp_path):
-    # Redirect HOME so ~/.molid.env goes under tmp
+    # Redirect HOME and the (import-time) env file so ~/.molid.env goes under tmp
+    from molid.utils import settings
+
+    env_file = tmp_path / ".molid.env"
     monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setattr(settings, "ENV_FILE", env_file)
+    monkeypatch.setitem(settings.AppConfig.model_config, "env_file", str(env_file))
     r = CliRunner()
 
     # set-master / set-cache
@@ -94,9 +99,16 @@ def test_config_set_and_show(monkeypatch, tmp_path):
     out4 = r.invoke(cli, ["config", "set-cache-writes", "true"])
     assert out4.exit_code == 0
 
+    # set-master-properties (case-insensitive, unknown names rejected)
+    out6 = r.invoke(cli, ["config", "set-master-properties", "xlogp", "HeavyAtomCount"])
+    assert out6.exit_code == 0 and "XLogP, HeavyAtomCount" in out6.output
+    assert r.invoke(cli, ["config", "set-master-properties", "Color"]).exit_code != 0
+
     # show
     out5 = r.invoke(cli, ["config", "show"])
     assert out5.exit_code == 0
     s = out5.output
     assert '"master_db"' in s and '"cache_db"' in s
     assert '"sources"' in s and '"cache_writes"' in s
+    assert '"master_properties": [\n    "XLogP",\n    "HeavyAtomCount"' in s
+    assert "MOLID_MASTER_PROPERTIES" in env_file.read_text()
@@ -0,0 +1,119 @@
+import json
+
+import molid.search.service as svc_mod
+from molid import pipeline
+from molid.client import MolIDClient
+from molid.db.db_utils import create_cache_db
+
+
+def _env(monkeypatch, tmp_path, sources=("cache",)):
+    cache = tmp_path / "cache.db"
+    create_cache_db(str(cache))
+    monkeypatch.setenv("MOLID_CACHE_DB", str(cache))
+    monkeypatch.setenv("MOLID_SOURCES", json.dumps(list(sources)))
+    monkeypatch.setenv("MOLID_CACHE_WRITES", "false")
+
+
+def test_client_reuses_service_until_settings_change(monkeypatch, tmp_path):
+    _env(monkeypatch, tmp_path)
+    client = MolIDClient()
+    first = client.service
+    assert client.service is first
+    assert client.config.sources == ["cache"]
+
+    # Changing an env var invalidates the snapshot
+    monkeypatch.setenv("MOLID_SOURCES", json.dumps(["cache", "api"]))
+    second = client.service
+    assert second is not first
+    assert second.cfg.sources == ["cache", "api"]
+
+    client.reset()
+    assert client.service is not second
+
+
+def test_rebuild_leaves_previous_service_usable(monkeypatch, tmp_path):
+    _env(monkeypatch, tmp_path)
+    client = MolIDClient()
+    first = client.service
+    pool = first._api_pool()  # as held by an in-flight search on another thread
+
+    monkeypatch.setenv("MOLID_SOURCES", json.dumps(["cache", "api"]))
+    assert client.service is not first
+    assert first._api_pool() is pool
+    assert pool.submit(lambda: 42).result() == 42
+
+
+def test_replaced_service_is_released_with_its_last_reference(monkeypatch, tmp_path):
+    import gc
+    import weakref
+
+    _env(monkeypatch, tmp_path)
+    client = MolIDClient()
+    first = client.service
+    pool = first._api_pool()
+    ref = weakref.ref(first)
+
+    monkeypatch.setenv("MOLID_SOURCES", json.dumps(["cache", "api"]))
+    assert client.service is not first
+    # Still held by the caller: alive and usable
+    assert pool.submit(lambda: 1).result() == 1
+
+    del first
+    gc.collect()
+    assert ref() is None
+    assert pool._shutdown
+
+
+def test_client_rebuilds_when_env_file_changes(monkeypatch, tmp_path):
+    from molid.utils import settings
+
+    _env(monkeypatch, tmp_path)
+    env_file = tmp_path / "molid.env"
+    monkeypatch.setattr(settings, "ENV_FILE", env_file)
+    client = MolIDClient()
+    first = client.service
+    env_file.write_text("MOLID_MAX_FILES=3\n")
+    assert client.service is not first
+
+
+def test_pipeline_uses_shared_client(monkeypatch, tmp_path):
+    _env(monkeypatch, tmp_path)
+    assert pipeline._create_search_service() is pipeline._create_search_service()
+
+
+def test_writable_probe_runs_once(monkeypatch, tmp_path):
+    calls = []
+
+    def probe(path):
+        calls.append(path)
+        return True
+
+    monkeypatch.setattr(svc_mod, "_is_writable_dir", probe)
+    monkeypatch.setattr(
+        svc_mod.SearchService, "_search_api", lambda self, q: ([{"CID": 1}], "API")
+    )
+    svc = svc_mod.SearchService(
+        master_db=str(tmp_path / "m.db"),
+        cache_db=str(tmp_path / "c.db"),
+        cfg=svc_mod.SearchConfig(sources=["api"], cache_writes=True),
+    )
+    svc.search({"cid": 1})
+    svc.search({"cid": 2})
+    assert len(calls) == 1
+
+
+def test_search_config_carries_every_lookup_setting(monkeypatch, tmp_path):
+    import dataclasses
+
+    from molid.client import search_config_from_app
+    from molid.utils.settings import load_config
+
+    _env(monkeypatch, tmp_path)
+    monkeypatch.setenv("MOLID_SQLITE_BUSY_TIMEOUT", "1234")
+    cfg = load_config()
+    search_cfg = search_config_from_app(cfg, ["master"])
+    assert search_cfg.sources == ["master"]
+    for f in dataclasses.fields(search_cfg):
+        if f.name != "sources":
+            assert getattr(search_cfg, f.name) == getattr(cfg, f.name), f.name
+    assert search_config_from_app(cfg).sources == ["cache"]
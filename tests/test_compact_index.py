@@ -0,0 +1,147 @@
+import sqlite3
+
+import pytest
+
+from molid.db.compact_index import compact_index_enabled, enable_compact_index, hash64
+from molid.db.db_utils import create_offline_db, save_to_database
+from molid.search.db_lookup import basic_offline_search, basic_offline_search_many
+
+ROWS = [
+    {
+        "CID": 100,
+        "Title": "Acetone",
+        "InChIKey": "CSCPPACGZOOCGX-UHFFFAOYSA-N",
+        "InChI": "InChI=1S/C3H6O/c1-3(2)4/h1-2H3",
+        "CanonicalSMILES": "CC(=O)C",
+    },
+    {
+        "CID": 101,
+        "Title": "Acetaldehyde",
+        "InChIKey": "IKHGUXGNUITLKF-UHFFFAOYSA-N",
+        "InChI": "InChI=1S/C2H4O/c1-2-3/h2H,1H3",
+        "CanonicalSMILES": "CC=O",
+    },
+]
+
+
+@pytest.fixture
+def master(tmp_path):
+    db = str(tmp_path / "master.db")
+    create_offline_db(db)
+    save_to_database(db, ROWS, list(ROWS[0]))
+    return db
+
+
+def _indexes(db):
+    with sqlite3.connect(db) as conn:
+        return {
+            r[0]
+            for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")
+        }
+
+
+def test_hash64_is_stable_signed_int64():
+    h = hash64("CSCPPACGZOOCGX-UHFFFAOYSA-N")
+    assert h == hash64("CSCPPACGZOOCGX-UHFFFAOYSA-N")
+    assert -(2**63) <= h < 2**63
+    assert hash64(None) is None
+
+
+def test_compact_index_lookups(master):
+    assert not compact_index_enabled(master)
+    enable_compact_index(master)
+    assert compact_index_enabled(master)
+
+    idx = _indexes(master)
+    assert "idx_compound_inchikeyhash" in idx and "idx_inchikey" not in idx
+    # Re-running the schema must not bring the TEXT indexes back
+    create_offline_db(master)
+    assert "idx_compound_inchi" not in _indexes(master)
+
+    assert (
+        basic_offline_search(master, "inchikey", ROWS[0]["InChIKey"])[0]["CID"] == 100
+    )
+    assert basic_offline_search(master, "inchi", ROWS[1]["InChI"])[0]["CID"] == 101
+    assert basic_offline_search(master, "canonicalsmiles", "CC=O")[0]["CID"] == 101
+    with pytest.warns(UserWarning):
+        hit = basic_offline_search(master, "inchikey", "CSCPPACGZOOCGX-XXXXXXXXXX-N")
+    assert hit[0]["CID"] == 100
+
+    many = basic_offline_search_many(master, "canonicalsmiles", ["CC(=O)C", "CCO"])
+    assert list(many) == ["CC(=O)C"]
+
+    with sqlite3.connect(master) as conn:
+        plan = " ".join(
+            str(r)
+            for r in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM compound_data "
+                "WHERE InChIHash = ? AND InChI = ?",
+                [1, "x"],
+            )
+        )
+    assert "idx_compound_inchihash" in plan
+
+
+def test_new_rows_are_hashed_and_text_is_verified(master):
+    enable_compact_index(master)
+    save_to_database(
+        master,
+        [{"CID": 102, "Title": "Ethanol", "CanonicalSMILES": "CCO", "InChIKey": "X"}],
+        ["CID", "Title", "CanonicalSMILES", "InChIKey"],
+    )
+    assert basic_offline_search(master, "canonicalsmiles", "CCO")[0]["CID"] == 102
+
+    # Force a hash collision: the probe hits, the text comparison rejects it
+    with sqlite3.connect(master) as conn:
+        conn.execute(
+            "UPDATE compound_data SET SMILESHash = ? WHERE CID = 100", [hash64("CCO")]
+        )
+    assert [
+        r["CID"] for r in basic_offline_search(master, "canonicalsmiles", "CCO")
+    ] == [102]
+    many = basic_offline_search_many(master, "canonicalsmiles", ["CCO"])
+    assert [r["CID"] for r in many["CCO"]] == [102]
+
+
+def test_isomeric_smiles_is_hashed_on_compact_masters(master):
+    assert "idx_compound_isomericsmiles" in _indexes(master)
+    enable_compact_index(master)
+    assert "idx_compound_isomericsmiles" not in _indexes(master)
+    save_to_database(
+        master,
+        [{"CID": 103, "CanonicalSMILES": "CC(O)N", "IsomericSMILES": "C[C@H](O)N"}],
+        ["CID", "CanonicalSMILES", "IsomericSMILES"],
+    )
+    assert basic_offline_search(master, "isomericsmiles", "C[C@H](O)N")[0]["CID"] == 103
+    many = basic_offline_search_many(master, "canonicalsmiles", ["C[C@H](O)N"])
+    assert [r["CID"] for r in many["C[C@H](O)N"]] == [103]
+
+    with sqlite3.connect(master) as conn:
+        plan = " ".join(
+            str(r)
+            for r in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM compound_data "
+                "WHERE IsomericSMILESHash = ? AND IsomericSMILES = ?",
+                [1, "x"],
+            )
+        )
+    assert "idx_compound_isomericsmileshash" in plan
+
+
+def test_create_offline_db_upgrades_compact_master(master):
+    enable_compact_index(master)
+    # A compact master from before IsomericSMILES had a hash column
+    with sqlite3.connect(master) as conn:
+        conn.execute("DROP INDEX idx_compound_isomericsmileshash")
+        conn.execute("ALTER TABLE compound_data DROP COLUMN IsomericSMILESHash")
+        conn.execute("UPDATE compound_data SET IsomericSMILES = 'C[C@@H]=O'")
+    create_offline_db(master)
+
+    idx = _indexes(master)
+    assert "idx_compound_isomericsmileshash" in idx
+    assert "idx_compound_isomericsmiles" not in idx
+    with sqlite3.connect(master) as conn:
+        hashes = {
+            r[0] for r in conn.execute("SELECT IsomericSMILESHash FROM compound_data")
+        }
+    assert hashes == {hash64("C[C@@H]=O")}
@@ -1,5 +1,8 @@
+import shutil
 import sqlite3
 
+import pytest
+
 from molid.db import db_utils
 from molid.db.sqlite_manager import DatabaseManager
 
@@ -64,3 +67,96 @@ def test_insert_many_no_rows(tmp_path, caplog):
     mgr = DatabaseManager(str(tmp_path / "x.db"))
     # Should do nothing and not error
     mgr.insert_many("nonexistent", ["a"], [], ignore_conflicts=True)
+
+
+def test_readonly_registration_reuses_connection_and_reopens(tmp_path):
+    from molid.db.sqlite_manager import (
+        _readonly_connection,
+        register_readonly,
+        unregister_readonly,
+    )
+
+    db = tmp_path / "ro.db"
+    with sqlite3.connect(db) as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.execute("INSERT INTO t VALUES (1)")
+
+    register_readonly(str(db), cache_size=-1024)
+    try:
+        mgr = DatabaseManager(str(db))
+        assert mgr.query_one("SELECT x FROM t")["x"] == 1
+        conn = _readonly_connection(str(db))
+        assert conn is _readonly_connection(str(db))
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("INSERT INTO t VALUES (2)")
+
+        # Writes go through a normal connection; readers then reopen.
+        mgr.execute("INSERT INTO t VALUES (2)")
+        assert [r["x"] for r in mgr.query_all("SELECT x FROM t ORDER BY x")] == [1, 2]
+        assert _readonly_connection(str(db)) is not conn
+    finally:
+        unregister_readonly(str(db))
+    assert _readonly_connection(str(db)) is None
+
+
+def test_pooled_connections_reused_and_reopened(tmp_path):
+    from molid.db.sqlite_manager import (
+        ConnectionOptions,
+        _pooled_connection,
+        configure_connections,
+    )
+
+    db = tmp_path / "pool.db"
+    mgr = DatabaseManager(str(db))
+    mgr.execute("CREATE TABLE t (x INTEGER)")
+    mgr.executemany("INSERT INTO t VALUES (?)", [[1], [2]])
+    conn = _pooled_connection(str(db))
+    assert conn is _pooled_connection(str(db))
+    assert mgr.query_one("SELECT COUNT(*) AS n FROM t")["n"] == 2
+
+    # A failed write is rolled back and the connection stays usable.
+    with pytest.raises(sqlite3.OperationalError):
+        mgr.executemany("INSERT INTO missing VALUES (?)", [[3]])
+    assert not conn.in_transaction
+
+    # Replacing the file (new inode) gets a fresh connection.
+    db.unlink()
+    db_utils.create_cache_db(str(db))
+    assert _pooled_connection(str(db)) is not conn
+    assert mgr.exists("cached_molecules", "CID = ?", [1]) is False
+
+    configure_connections(ConnectionOptions(journal_mode="wal", temp_store="MEMORY"))
+    try:
+        assert mgr.query_one("PRAGMA journal_mode")["journal_mode"] == "wal"
+        assert mgr.query_one("PRAGMA temp_store")["temp_store"] == 2
+    finally:
+        configure_connections(ConnectionOptions())
+
+    with pytest.raises(ValueError):
+        ConnectionOptions(synchronous="sometimes")
+
+
+def test_connection_options_are_kept_per_path(tmp_path):
+    from molid.db.sqlite_manager import ConnectionOptions, configure_connections
+
+    a, b = (
+        DatabaseManager(str(tmp_path / "a.db")),
+        DatabaseManager(str(tmp_path / "b.db")),
+    )
+    configure_connections(ConnectionOptions(temp_store="MEMORY"), [a.db_path])
+    configure_connections(ConnectionOptions(temp_store="FILE"), [b.db_path])
+    assert a.query_one("PRAGMA temp_store")["temp_store"] == 2
+    assert b.query_one("PRAGMA temp_store")["temp_store"] == 1
+
+    # Reconfiguring a path replaces its pooled connection at the next checkout
+    configure_connections(ConnectionOptions(temp_store="FILE"), [a.db_path])
+    assert a.query_one("PRAGMA temp_store")["temp_store"] == 1
+
+
+def test_manager_recreates_removed_directory(tmp_path):
+    folder = tmp_path / "cache"
+    DatabaseManager(str(folder / "one.db")).execute("CREATE TABLE t (x)")
+    shutil.rmtree(folder)
+    mgr = DatabaseManager(str(folder / "two.db"))
+    mgr.execute("CREATE TABLE t (x)")
+    assert mgr.exists("t", "1 = 1", []) is False
@@ -15,9 +15,10 @@ def test_normalize_isomeric_kept_in_advanced():
     assert k == "isomericsmiles"
 
 
-def test_normalize_isomeric_downgraded_in_basic():
+def test_normalize_isomeric_kept_in_basic():
+    # The master DB stores IsomericSMILES too, so basic lookups keep the flavor
     k, v = normalize_query({"IsomericSMILES": "C(=O)=O"}, "basic")
-    assert k == "canonicalsmiles"
+    assert k == "isomericsmiles"
 
 
 def test_normalize_molecularformula_validation():
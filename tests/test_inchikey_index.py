@@ -0,0 +1,64 @@
+import pytest
+
+import molid.search.inchikey_index as iki
+from molid.db.db_utils import create_offline_db, save_to_database
+from molid.search.db_lookup import basic_offline_search, basic_offline_search_many
+from molid.search.inchikey_index import (
+    build_inchikey_index,
+    key_hashes,
+    load_inchikey_index,
+)
+
+ROWS = [
+    {"CID": 180, "Title": "Acetone", "InChIKey": "CSCPPACGZOOCGX-UHFFFAOYSA-N"},
+    {"CID": 177, "Title": "Acetaldehyde", "InChIKey": "IKHGUXGNUITLKF-UHFFFAOYSA-N"},
+    {"CID": 280, "Title": "Carbon dioxide", "InChIKey": "CURLTUGMZLYLDI-UHFFFAOYSA-N"},
+]
+
+
+@pytest.fixture
+def master(tmp_path):
+    db = str(tmp_path / "master.db")
+    create_offline_db(db)
+    save_to_database(db, ROWS, list(ROWS[0]))
+    return db
+
+
+def test_batch_lookup_and_staleness(master):
+    assert load_inchikey_index(master) is None
+    assert build_inchikey_index(master) == 3
+    index = load_inchikey_index(master)
+    keys = [r["InChIKey"] for r in ROWS] + ["XLYOFNOQVPJJNP-UHFFFAOYSA-N", "ünïcode"]
+    assert index.lookup(keys).tolist() == [180, 177, 280, -1, -1]
+    assert len(set(key_hashes(keys).tolist())) == len(keys)
+
+    # Any write to the master makes the index stale until rebuilt
+    save_to_database(master, [{"CID": 962, "Title": "Water"}], ["CID", "Title"])
+    assert load_inchikey_index(master) is None
+    build_inchikey_index(master)
+    assert load_inchikey_index(master) is not None
+
+
+def test_lookups_use_array_index(master, monkeypatch):
+    build_inchikey_index(master)
+    calls = []
+    lookup = iki.InChIKeyIndex.lookup
+    monkeypatch.setattr(
+        iki.InChIKeyIndex, "lookup", lambda self, k: calls.append(k) or lookup(self, k)
+    )
+
+    rec = basic_offline_search(master, "inchikey", "CURLTUGMZLYLDI-UHFFFAOYSA-N")
+    assert rec[0]["CID"] == 280
+    found = basic_offline_search_many(
+        master,
+        "inchikey",
+        ["IKHGUXGNUITLKF-UHFFFAOYSA-N", "XLYOFNOQVPJJNP-UHFFFAOYSA-N"],
+        fields=["CID"],
+    )
+    assert found == {"IKHGUXGNUITLKF-UHFFFAOYSA-N": [{"CID": 177}]}
+    assert len(calls) == 2
+
+    # Keys the index does not know still get the skeletal (first-block) fallback
+    with pytest.warns(UserWarning):
+        rec = basic_offline_search(master, "inchikey", "CSCPPACGZOOCGX-XXXXXXXXXX-N")
+    assert rec[0]["CID"] == 180
@@ -0,0 +1,99 @@
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from molid.cli import cli
+from molid.search.service import MoleculeNotFound, SearchConfig, SearchService
+from molid.utils.metrics import METRICS, Histogram, Metrics, load_stats, persist_stats
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    METRICS.reset()
+    yield
+    METRICS.reset()
+
+
+def test_histogram_quantiles_and_merge():
+    h = Histogram((1, 10, 100))
+    for v in (0.5, 5, 5, 50, 500):
+        h.observe(v)
+    assert h.counts == [1, 2, 1, 1]
+    assert h.quantile(0.5) == 10
+    assert h.quantile(1.0) == 500
+
+    other = Histogram.from_snapshot(h.snapshot())
+    h.merge(other)
+    assert h.count == 10
+    assert h.counts == [2, 4, 2, 2]
+
+
+def test_persist_stats_accumulates_and_drains(tmp_path):
+    path = tmp_path / "stats.json"
+    m = Metrics()
+    m.incr("search.requests", 2)
+    m.observe("search.latency_ms", 3.0)
+    persist_stats(path, m)
+    assert m.snapshot() == {"counters": {}, "histograms": {}}
+
+    m.incr("search.requests")
+    snap = persist_stats(path, m)
+    assert snap["counters"]["search.requests"] == 3
+    assert load_stats(path)["histograms"]["search.latency_ms"]["count"] == 1
+
+
+def test_service_records_tier_outcomes(seeded_dbs):
+    master, cache = seeded_dbs
+    svc = SearchService(master, cache, SearchConfig(sources=["master", "cache"]))
+
+    svc.search({"cid": 100})
+    svc.search({"cas": "124-38-9"})
+    with pytest.raises(MoleculeNotFound):
+        svc.search({"cid": 999999})
+    with pytest.raises(MoleculeNotFound):
+        svc.search({"name": "acetone"})
+    svc.search_many([{"cid": 101}, {"cid": 424242}])
+
+    counters = svc.stats()["metrics"]["counters"]
+    assert counters["search.requests"] == 6
+    assert counters["search.resolved"] == 3
+    assert counters["search.unresolved"] == 3
+    assert counters["tier.master.hit"] == 2
+    assert counters["tier.master.miss"] == 3
+    # "name" is not a column either tier can search
+    assert counters["tier.master.skip"] == 1
+    assert counters["tier.cache.skip"] == 1
+    assert counters["tier.cache.hit"] == 1
+    assert counters["tier.cache.miss"] == 2
+    assert counters["sql.statements"] > 0
+
+    hists = svc.stats()["metrics"]["histograms"]
+    assert hists["tier.master.latency_ms"]["count"] == 4
+    assert hists["tier.cache.batch_ms"]["count"] == 1
+
+
+def test_cli_stats_reports_and_resets(tmp_path, seeded_dbs):
+    master, cache = seeded_dbs
+    runner = CliRunner()
+    env = {
+        "MOLID_MASTER_DB": master,
+        "MOLID_CACHE_DB": cache,
+        "MOLID_SOURCES": json.dumps(["master"]),
+        "MOLID_CACHE_WRITES": "false",
+    }
+    res = runner.invoke(cli, ["search", "100", "--id-type", "cid"], env=env)
+    assert res.exit_code == 0, res.output
+
+    res = runner.invoke(cli, ["stats", "--json"])
+    assert res.exit_code == 0, res.output
+    snap = json.loads(res.output)
+    assert snap["counters"]["tier.master.hit"] == 1
+
+    res = runner.invoke(cli, ["stats"])
+    assert res.exit_code == 0, res.output
+    assert "Searches: 1" in res.output
+
+    res = runner.invoke(cli, ["stats", "--reset"])
+    assert res.exit_code == 0
+    assert not (tmp_path / "molid_stats.json").exists()
@@ -1,8 +1,12 @@
 from pathlib import Path
 
+import pytest
+
 from molid.db import offline_db_cli as odc
 from molid.db.db_utils import create_offline_db
+from molid.db.schema import master_properties
 from molid.db.sqlite_manager import DatabaseManager
+from molid.pubchemproc.pubchem import process_file
 
 
 def test_update_database_happy_path(monkeypatch, tmp_path):
@@ -36,8 +40,9 @@ def test_update_database_happy_path(monkeypatch, tmp_path):
 
     # unpack/process: directly call the callback with tiny record(s)
     def fake_unpack_and_process(
-        file_name, download_folder, processed_folder, process_callback
+        file_name, download_folder, processed_folder, process_callback, properties
     ):
+        assert properties["XLogP"] == "PUBCHEM_XLOGP3"
         # emulate SDF extraction: write a minimal record into DB via callback
         data = [
             {
@@ -52,6 +57,8 @@ def test_update_database_happy_path(monkeypatch, tmp_path):
                 "MolecularWeight": 30.07,
                 "MonoisotopicMass": 30.04695,
                 "CAS": None,
+                "XLogP": "1.8",
+                "Charge": "0",
             }
         ]
         process_callback(data)
@@ -76,3 +83,73 @@ def test_update_database_happy_path(monkeypatch, tmp_path):
     # and compound_data contains the inserted record
     cd = m.query_one("SELECT * FROM compound_data WHERE CID=123", [])
     assert cd and cd["InChIKey"] == "OTMSDBZUPAUEDD-UHFFFAOYSA-N"
+    assert cd["XLogP"] == 1.8 and cd["Charge"] == 0
+
+
+def test_process_file_reads_configured_properties(tmp_path):
+    tags = {
+        "PUBCHEM_COMPOUND_CID": "2244",
+        "PUBCHEM_XLOGP3_AA": "1.2",  # older name of PUBCHEM_XLOGP3
+        "PUBCHEM_CACTVS_TPSA": "63.6",
+        "PUBCHEM_HEAVY_ATOM_COUNT": "13",
+    }
+    body = "\n".join(f"> <{k}>\n{v}\n" for k, v in tags.items())
+    path = tmp_path / "one.sdf"
+    path.write_text(
+        f"mol\n\n  0  0  0  0  0  0            999 V2000\nM  END\n{body}\n$$$$\n"
+    )
+
+    assert process_file(path) == [{"CID": "2244", "XLogP": "1.2", "TPSA": "63.6"}]
+    props = master_properties(["heavyatomcount"])
+    assert process_file(path, props) == [{"CID": "2244", "HeavyAtomCount": "13"}]
+    with pytest.raises(ValueError):
+        master_properties(["Color"])
+
+    db = str(tmp_path / "master.db")
+    create_offline_db(db, ["HeavyAtomCount"])
+    cols = {
+        r["name"]
+        for r in DatabaseManager(db).query_all("PRAGMA table_info(compound_data)")
+    }
+    assert "HeavyAtomCount" in cols and "XLogP" not in cols
+
+
+def test_ingest_keeps_properties_missing_from_first_record(monkeypatch, tmp_path):
+    records = [
+        {"PUBCHEM_COMPOUND_CID": "1", "PUBCHEM_CACTVS_COMPLEXITY": "10"},
+        {
+            "PUBCHEM_COMPOUND_CID": "2",
+            "PUBCHEM_XLOGP3": "-0.1",
+            "PUBCHEM_CACTVS_TPSA": "20.2",
+        },
+    ]
+    path = tmp_path / "two.sdf"
+    path.write_text(
+        "".join(
+            "mol\n\n  0  0  0  0  0  0            999 V2000\nM  END\n"
+            + "\n".join(f"> <{k}>\n{v}\n" for k, v in tags.items())
+            + "\n$$$$\n"
+            for tags in records
+        )
+    )
+
+    def fake_unpack_and_process(
+        file_name, download_folder, processed_folder, process_callback, properties
+    ):
+        process_callback(process_file(path, properties))
+        return True
+
+    monkeypatch.setattr(odc, "unpack_and_process_file", fake_unpack_and_process)
+    db = str(tmp_path / "master.db")
+    create_offline_db(db)
+    assert odc._ingest(
+        db, "two.sdf.gz", str(tmp_path), str(tmp_path), master_properties()
+    )
+
+    rows = DatabaseManager(db).query_all(
+        "SELECT CID, XLogP, TPSA, Complexity FROM compound_data ORDER BY CID", []
+    )
+    assert [dict(r) for r in rows] == [
+        {"CID": 1, "XLogP": None, "TPSA": None, "Complexity": 10.0},
+        {"CID": 2, "XLogP": -0.1, "TPSA": 20.2, "Complexity": None},
+    ]
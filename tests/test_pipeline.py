@@ -254,3 +254,109 @@ def test_sdf_path_calls_search_with_inchikey(tmp_path, monkeypatch):
     assert res and src == "api"
     # Ensure we extracted IK and searched by it
     assert called["q"] == {"inchikey": "ABCDEFGHIJKLMN-ABCDEFHIJSA-N"}
+
+
+def test_structure_fingerprint_ignores_jitter_not_topology():
+    from molid.utils.conversion import structure_fingerprint
+
+    a = molecule("CH3COCH3")
+    b = a.copy()
+    b.positions += 0.02
+    b.positions[0] += (0.03, -0.02, 0.01)
+    assert structure_fingerprint(a) == structure_fingerprint(b)
+
+    broken = a.copy()
+    broken.positions[-1] += (5.0, 5.0, 5.0)  # pull one H off
+    assert structure_fingerprint(a) != structure_fingerprint(broken)
+
+    heavy = a.copy()
+    heavy.set_masses([2.014 if z == 1 else None for z in heavy.numbers])
+    assert structure_fingerprint(a) != structure_fingerprint(heavy)
+
+
+def test_search_from_trajectory_dedupes_frames(tmp_path, monkeypatch, seeded_dbs):
+    from ase.io import write
+
+    from molid.search.service import SearchConfig, SearchService
+
+    master, cache = seeded_dbs
+    svc = SearchService(master, cache, SearchConfig(sources=["master"]))
+    monkeypatch.setattr(pipeline, "_create_search_service", lambda: svc)
+
+    keys = {
+        "C3H6O": "CSCPPACGZOOCGX-UHFFFAOYSA-N",
+        "C2H4O": "IKHGUXGNUITLKF-UHFFFAOYSA-N",
+        "H2O": "XLYOFNOQVPJJNP-UHFFFAOYSA-N",
+    }
+    conversions = []
+
+    def fake_inchikey(atoms):
+        conversions.append(atoms.get_chemical_formula(mode="hill"))
+        return keys[conversions[-1]]
+
+    monkeypatch.setattr(pipeline, "atoms_to_inchikey", fake_inchikey)
+
+    frames = []
+    for i in range(30):
+        for name in ("CH3COCH3", "CH3CHO", "H2O"):
+            atoms = molecule(name)
+            atoms.positions += 0.001 * i
+            frames.append(atoms)
+    traj = tmp_path / "traj.extxyz"
+    write(str(traj), frames, format="extxyz")
+
+    calls = []
+    real_many = svc.search_many
+    monkeypatch.setattr(svc, "search_many", lambda q: calls.append(q) or real_many(q))
+
+    results = pipeline.search_from_trajectory(str(traj))
+
+    assert len(results) == 90
+    assert sorted(conversions) == ["C2H4O", "C3H6O", "H2O"]
+    assert sum(len(q) for q in calls) == 3
+    assert results[0][0][0]["Title"] == "Acetone"
+    assert results[88][0][0]["Title"] == "Acetaldehyde"
+    assert results[89] is None  # water is not in the master DB
+
+
+def _sdf_record(tags):
+    body = "\n".join(f"> <{k}>\n{v}\n" for k, v in tags.items())
+    return f"mol\n\n  0  0  0  0  0  0            999 V2000\nM  END\n{body}\n$$$$\n"
+
+
+def test_search_from_sdf_streams_every_gz_record(tmp_path, monkeypatch, seeded_dbs):
+    import gzip
+
+    from molid.pubchemproc.pubchem import iter_sdf_records
+    from molid.search.service import SearchConfig, SearchService
+
+    master, cache = seeded_dbs
+    svc = SearchService(master, cache, SearchConfig(sources=["master"]))
+    monkeypatch.setattr(pipeline, "_create_search_service", lambda: svc)
+    calls = []
+    real_many = svc.search_many
+    monkeypatch.setattr(svc, "search_many", lambda q: calls.append(q) or real_many(q))
+
+    acetone = {"PUBCHEM_IUPAC_INCHIKEY": "CSCPPACGZOOCGX-UHFFFAOYSA-N"}
+    records = [
+        acetone,
+        {"PUBCHEM_COMPOUND_CID": "101", "PUBCHEM_MOLECULAR_FORMULA": "C2H4O"},
+        {"PUBCHEM_IUPAC_INCHIKEY": "XLYOFNOQVPJJNP-UHFFFAOYSA-N"},
+        {"PUBCHEM_MOLECULAR_FORMULA": "H2O"},
+        acetone,
+    ]
+    path = tmp_path / "lib.sdf.gz"
+    with gzip.open(path, "wt") as fh:
+        fh.write("".join(_sdf_record(r) for r in records))
+
+    parsed = list(iter_sdf_records(path))
+    assert parsed[1] == {"CID": "101", "MolecularFormula": "C2H4O"}
+
+    out = list(pipeline.iter_search_sdf(str(path), chunk_size=3))
+    assert [n for n, _, _ in out] == [0, 1, 2, 3, 4]
+    titles = [o[0][0]["Title"] if o else None for _, _, o in out]
+    assert titles == ["Acetone", "Acetaldehyde", None, None, "Acetone"]
+    assert [len(q) for q in calls] == [3, 1]
+
+    res, src = search_from_file(str(path))
+    assert src == "master" and res[0]["CID"] == 100
@@ -0,0 +1,99 @@
+import molid.search.service as svc_mod
+from molid.search.result_cache import ResultCache
+from molid.search.service import SearchConfig, SearchService
+
+
+def test_lru_eviction_by_record_budget():
+    rc = ResultCache(max_records=3)
+    rc.put(("cid", "1"), "a", weight=1)
+    rc.put(("cid", "2"), "b", weight=2)
+    assert rc.get(("cid", "1")) == "a"  # refresh recency of 1
+    rc.put(("cid", "3"), "c", weight=1)  # evicts 2 (least recently used)
+    assert rc.get(("cid", "2")) is None
+    assert rc.get(("cid", "3")) == "c"
+    rc.put(("cid", "4"), "too big", weight=10)  # larger than the budget: skipped
+    assert rc.get(("cid", "4")) is None
+    stats = rc.stats()
+    assert stats["evictions"] == 1 and stats["records"] <= 3
+
+
+def test_ttl_expiry(monkeypatch):
+    import molid.search.result_cache as rc_mod
+
+    now = [100.0]
+    monkeypatch.setattr(rc_mod.time, "monotonic", lambda: now[0])
+    rc = ResultCache(max_records=10, ttl=5)
+    rc.put(("inchikey", "X"), "v")
+    now[0] += 4
+    assert rc.get(("inchikey", "X")) == "v"
+    now[0] += 2
+    assert rc.get(("inchikey", "X")) is None
+
+
+def _service(monkeypatch, tmp_path, api):
+    monkeypatch.setattr(svc_mod, "_is_writable_dir", lambda p: True)
+    monkeypatch.setattr(SearchService, "_search_api", api)
+    return SearchService(
+        master_db=str(tmp_path / "m.db"),
+        cache_db=str(tmp_path / "c.db"),
+        cfg=SearchConfig(sources=["api"], cache_writes=False, result_cache_size=100),
+    )
+
+
+def test_service_serves_repeats_from_memory(monkeypatch, tmp_path):
+    calls = []
+
+    def api(self, q):
+        calls.append(q)
+        return [{"CID": 280, "MolecularFormula": "CO2"}], "API"
+
+    svc = _service(monkeypatch, tmp_path, api)
+    first = svc.search({"MolecularFormula": "O2 C"})
+    second = svc.search({"molecularformula": "CO2"})  # same canonical key
+    assert first == second and len(calls) == 1
+    assert svc.search_many([{"molecularformula": "CO2"}])[0] == first
+    assert len(calls) == 1
+    assert svc.result_cache.stats()["hits"] == 2
+
+
+def test_cache_write_invalidates_affected_keys(monkeypatch, tmp_path):
+    svc = _service(monkeypatch, tmp_path, lambda self, q: ([{"CID": 1}], "API"))
+    svc.search({"molecularformula": "CO2"})
+    assert svc.result_cache.get(("molecularformula", "CO2")) is not None
+    # A new compound with the same formula was written to the cache DB
+    svc._invalidate_written("inchikey", "Y", [{"CID": 2, "MolecularFormula": "CO2"}])
+    assert svc.result_cache.get(("molecularformula", "CO2")) is None
+
+
+def test_invalidate_drops_projected_entries():
+    rc = ResultCache(10)
+    rc.put(("cid", "1"), ["full"])
+    rc.put(("cid", "1", ("cid",)), ["projected"])
+    rc.invalidate_records([{"CID": 1}])
+    assert rc.get(("cid", "1")) is None
+    assert rc.get(("cid", "1", ("cid",))) is None
+
+
+def test_cached_records_are_copied_per_caller(monkeypatch, tmp_path):
+    svc = _service(monkeypatch, tmp_path, lambda self, q: ([{"CID": 1}], "API"))
+    (rec,), _ = svc.search({"cid": 1})
+    rec["CID"] = 999
+    (again,), _ = svc.search({"cid": 1})
+    assert again == {"CID": 1}
+    again["Title"] = "mutated"
+    assert svc.search({"cid": 1})[0] == [{"CID": 1}]
+
+
+def test_name_keys_are_folded(monkeypatch, tmp_path):
+    calls = []
+
+    def api(self, q):
+        calls.append(q)
+        return [{"CID": 241, "Title": "Benzene"}], "API"
+
+    svc = _service(monkeypatch, tmp_path, api)
+    svc.search({"title": "Benzene"})
+    svc.search({"title": "  BENZENE "})
+    assert len(calls) == 1
+    svc._invalidate_written("cid", 241, [{"CID": 241, "Title": "benzene"}])
+    assert svc.result_cache.get(("title", "benzene")) is None
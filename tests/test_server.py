@@ -0,0 +1,112 @@
+import http.client
+import json
+import threading
+import time
+
+import pytest
+
+from molid.search.service import SearchConfig, SearchService
+from molid.server import MolIDServer
+
+
+@pytest.fixture
+def server(seeded_dbs):
+    master, cache = seeded_dbs
+    svc = SearchService(master, cache, SearchConfig(sources=["master", "cache"]))
+    srv = MolIDServer(("127.0.0.1", 0), lambda: svc, workers=2, max_batch=3)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def _call(conn, method, path, body=None):
+    payload = None if body is None else json.dumps(body)
+    conn.request(
+        method, path, body=payload, headers={"Content-Type": "application/json"}
+    )
+    resp = conn.getresponse()
+    return resp.status, json.loads(resp.read())
+
+
+def test_routes_over_one_keepalive_connection(server):
+    conn = http.client.HTTPConnection(*server.server_address[:2], timeout=5)
+
+    status, body = _call(conn, "GET", "/health")
+    assert status == 200 and body["status"] == "ok"
+    sock = conn.sock
+
+    status, body = _call(conn, "POST", "/search", {"cid": 100})
+    assert status == 200
+    assert body["source"] == "master"
+    assert body["results"][0]["Title"] == "Acetone"
+
+    status, body = _call(conn, "POST", "/search", {"query": {"cid": 555}})
+    assert status == 404
+
+    status, body = _call(
+        conn, "POST", "/search/batch", {"queries": [{"cas": "124-38-9"}, {"cid": 9}]}
+    )
+    assert status == 200
+    assert [r["source"] for r in body["results"]] == ["cache", None]
+
+    status, body = _call(conn, "GET", "/metrics")
+    assert status == 200
+    assert body["metrics"]["counters"]["tier.master.hit"] >= 1
+
+    # All requests were served on the same socket
+    assert conn.sock is sock
+    conn.close()
+
+
+def test_bad_requests(server):
+    conn = http.client.HTTPConnection(*server.server_address[:2], timeout=5)
+    assert _call(conn, "POST", "/search", {"cid": 1, "smiles": "C"})[0] == 400
+    assert _call(conn, "POST", "/search/batch", [{"cid": 1}] * 4)[0] == 413
+    assert _call(conn, "GET", "/nope")[0] == 404
+
+    conn.request("POST", "/search", body=b"{not json")
+    resp = conn.getresponse()
+    assert resp.status == 400
+    resp.read()
+    conn.close()
+
+
+def _start(srv):
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv
+
+
+def test_full_queue_gets_503_and_idle_connections_free_their_worker(seeded_dbs):
+    master, cache = seeded_dbs
+    svc = SearchService(master, cache, SearchConfig(sources=["master", "cache"]))
+    srv = _start(
+        MolIDServer(
+            ("127.0.0.1", 0), lambda: svc, workers=1, idle_timeout=0.3, max_queued=0
+        )
+    )
+    address = srv.server_address[:2]
+    try:
+        # A kept-alive connection holds the only worker ...
+        held = http.client.HTTPConnection(*address, timeout=5)
+        assert _call(held, "GET", "/health")[0] == 200
+
+        # ... so with no queue room the next connection is turned away
+        busy = http.client.HTTPConnection(*address, timeout=5)
+        busy.request("GET", "/health")
+        resp = busy.getresponse()
+        assert resp.status == 503
+        assert resp.getheader("Retry-After") == "1"
+        assert "error" in json.loads(resp.read())
+        busy.close()
+
+        # Once idle past idle_timeout, the held connection gives its worker back
+        time.sleep(0.8)
+        fresh = http.client.HTTPConnection(*address, timeout=5)
+        assert _call(fresh, "GET", "/health")[0] == 200
+        fresh.close()
+        held.close()
+    finally:
+        srv.shutdown()
+        srv.server_close()
@@ -3,7 +3,7 @@ from pathlib import Path
 import pytest
 
 import molid.search.service as svc_mod
-from molid.search.service import SearchConfig, SearchService
+from molid.search.service import MoleculeNotFound, SearchConfig, SearchService
 
 # Create empty, readable files so the service doesn't skip for missing files
 tmp_master = Path("/tmp/master.db")
@@ -70,3 +70,190 @@ def test_pipeline_raw_xyz_parse_failure(monkeypatch):
 
     with pytest.raises(ValueError):
         search_from_input("this is not xyz at all")
+
+
+def test_search_many_matches_search_and_falls_through(seeded_dbs):
+    master, cache = seeded_dbs
+    svc = SearchService(
+        master_db=master,
+        cache_db=cache,
+        cfg=SearchConfig(sources=["master", "cache"], cache_writes=False),
+    )
+    queries = [
+        {"InChIKey": "CSCPPACGZOOCGX-UHFFFAOYSA-N"},
+        {"smiles": "C(=O)=O"},
+        {"cid": "101"},
+        {"cas": "124-38-9"},
+        {"molecularformula": "H6 C3 O"},
+        {"inchikey": "ZZZZZZZZZZZZZZ-UHFFFAOYSA-N"},
+    ]
+    results = svc.search_many(queries)
+
+    assert len(results) == len(queries)
+    assert results[0][1] == "master" and results[0][0][0]["CID"] == 100
+    assert results[1][1] == "cache" and results[1][0][0]["CID"] == 280
+    assert results[2][0][0]["CID"] == 101
+    assert results[3][1] == "cache" and results[3][0][0]["CAS"] == "124-38-9"
+    assert results[4][0][0]["CID"] == 100
+    assert results[5] is None
+
+    # Same outcome as resolving the queries one by one
+    for q, res in zip(queries[:5], results[:5]):
+        assert svc.search(q) == res
+
+
+def test_api_miss_is_negative_cached(monkeypatch, tmp_path):
+    calls = []
+
+    def fake_get_cached_or_fetch(db, id_type, id_value):
+        calls.append((id_type, id_value))
+        return [], False
+
+    monkeypatch.setattr(svc_mod, "get_cached_or_fetch", fake_get_cached_or_fetch)
+    monkeypatch.setattr(
+        svc_mod,
+        "fetch_molecule_data",
+        lambda *a: pytest.fail("PubChem must not be asked twice for a miss"),
+    )
+    svc = SearchService(
+        master_db=str(tmp_path / "m.db"),
+        cache_db=str(tmp_path / "c.db"),
+        cfg=SearchConfig(sources=["api"], cache_writes=True),
+    )
+    for _ in range(2):
+        with pytest.raises(svc_mod.MoleculeNotFound):
+            svc.search({"inchikey": "XXXXXXXXXXXXXX-UHFFFAOYSA-N"})
+    assert calls == [("inchikey", "XXXXXXXXXXXXXX-UHFFFAOYSA-N")]
+
+
+def test_fields_projection_reaches_sql_and_batches(seeded_dbs):
+    master, cache = seeded_dbs
+    svc = SearchService(
+        master_db=master,
+        cache_db=cache,
+        cfg=SearchConfig(
+            sources=["master", "cache"], cache_writes=False, result_cache_size=100
+        ),
+    )
+    records, source = svc.search({"cid": 100}, fields=["cid", "INCHIKEY"])
+    assert source == "master"
+    assert records == [{"CID": 100, "InChIKey": "CSCPPACGZOOCGX-UHFFFAOYSA-N"}]
+    # Projected and full results are cached under different keys.
+    assert "MolecularFormula" in svc.search({"cid": 100})[0][0]
+
+    many = svc.search_many(
+        [{"cid": "101"}, {"cas": "124-38-9"}],
+        fields=["CID", "CAS"],
+    )
+    assert many[0] == ([{"CID": 101}], "master")
+    assert many[1] == ([{"CID": 280, "CAS": "124-38-9"}], "cache")
+
+    with pytest.raises(ValueError):
+        svc.search({"cid": 100}, fields=["NoSuchColumn"])
+
+
+def test_compact_records_match_dict_records(seeded_dbs):
+    from molid.search.records import Record
+
+    master, cache = seeded_dbs
+    svc = SearchService(
+        master_db=master,
+        cache_db=cache,
+        cfg=SearchConfig(sources=["master", "cache"], cache_writes=False),
+    )
+    queries = [{"cid": "101"}, {"cas": "124-38-9"}, {"molecularformula": "C3H6O"}]
+    plain = svc.search_many(queries)
+    compact = svc.search_many(queries, compact_records=True)
+    for (recs, src), (crecs, csrc) in zip(plain, compact):
+        assert src == csrc
+        assert all(isinstance(r, Record) for r in crecs)
+        assert [r.to_dict() for r in crecs] == recs
+
+    (rec,), source = svc.search({"cas": "124-38-9"}, compact_records=True)
+    assert source == "cache"
+    assert rec.CID == 280 and rec["CAS"] == "124-38-9" and rec.IUPACName is None
+    assert "IUPACName" not in rec and "_key" not in rec
+    assert rec == rec.to_dict()
+
+
+def test_search_names_walks_local_tiers(seeded_dbs):
+    from molid.db.name_index import fts5_available
+
+    if not fts5_available():
+        pytest.skip("SQLite without FTS5")
+    master, cache = seeded_dbs
+    svc = SearchService(
+        master_db=master,
+        cache_db=cache,
+        cfg=SearchConfig(sources=["master", "cache", "api"], cache_writes=False),
+    )
+    records, source = svc.search_names("acetald")
+    assert source == "master" and [r["CID"] for r in records] == [101]
+    assert svc.search_names("co2")[1] == "cache"
+    with pytest.raises(MoleculeNotFound):
+        svc.search_names("benzene")
+
+
+def test_search_composition_uses_element_index(seeded_dbs):
+    from molid.db.composition import build_compositions
+    from molid.db.db_utils import save_to_database
+
+    master, cache = seeded_dbs
+    assert build_compositions(master) == 2
+    save_to_database(
+        master,
+        [
+            {"CID": 7504, "MolecularFormula": "C7H9N", "Title": "Benzylamine"},
+            {"CID": 7474, "MolecularFormula": "C6H4ClNO2", "Title": "Nitrochloro"},
+        ],
+        ["CID", "MolecularFormula", "Title"],
+    )
+    svc = SearchService(
+        master_db=master,
+        cache_db=cache,
+        cfg=SearchConfig(sources=["master", "cache"], cache_writes=False),
+    )
+
+    def cids(composition, **kw):
+        return [r["CID"] for r in svc.search_composition(composition, **kw)[0]]
+
+    no_halogens = {"F": 0, "Cl": 0, "Br": 0, "I": 0}
+    assert cids({"C": (6, 8), "N": 1, **no_halogens}) == [7504]
+    assert cids({"C": (6, None), "N": 1}) == [7474, 7504]
+    assert cids({"C": (2, 3), "O": 1}) == [100, 101]
+    assert cids({"H": (0, 4)}, limit=1) == [101]
+    assert svc.search_composition({"C": 3}, fields=["CID"])[0] == [{"CID": 100}]
+    with pytest.raises(MoleculeNotFound):
+        svc.search_composition({"C": 60})
+    with pytest.raises(ValueError):
+        svc.search_composition({"Xyz": 1})
+    with pytest.raises(TypeError):
+        svc.search_composition({"C": True})
+
+
+def test_search_mass_windows_per_target(seeded_dbs):
+    from molid.db.db_utils import save_to_database
+
+    master, cache = seeded_dbs
+    save_to_database(
+        master,
+        [
+            {"CID": 180, "MonoisotopicMass": 58.041865, "ExactMass": 58.04},
+            {"CID": 177, "MonoisotopicMass": 44.026215, "ExactMass": 44.03},
+            {"CID": 9000, "MonoisotopicMass": 58.0420, "ExactMass": 58.05},
+        ],
+        ["CID", "MonoisotopicMass", "ExactMass"],
+    )
+    svc = SearchService(
+        master_db=master,
+        cache_db=cache,
+        cfg=SearchConfig(sources=["master"], cache_writes=False),
+    )
+
+    found = svc.search_mass([58.041865, 44.0262, 300.0], ppm=5, fields=["CID"])
+    assert found == {58.041865: [{"CID": 180}, {"CID": 9000}], 44.0262: [{"CID": 177}]}
+    assert svc.search_mass([58.0419], ppm=1, limit=1)[58.0419][0]["CID"] == 180
+    found = svc.search_mass([58.044], da=0.006, column="exactmass", fields=["CID"])
+    assert found[58.044] == [{"CID": 180}, {"CID": 9000}]
+    with pytest.raises(ValueError):
+        svc.search_mass([58.0], column="MolecularWeight")
@@ -0,0 +1,93 @@
+import importlib.util
+
+import numpy as np
+import pytest
+
+import molid.search.similarity as sim
+from molid.db.db_utils import create_offline_db, save_to_database
+from molid.search.service import MoleculeNotFound, SearchConfig, SearchService
+from molid.search.similarity import (
+    FP_WORDS,
+    FingerprintIndex,
+    build_fingerprints,
+    fingerprint_dir,
+    load_fingerprint_index,
+    write_fingerprints,
+)
+
+has_openbabel = importlib.util.find_spec("openbabel") is not None
+
+ROWS = [
+    {"CID": 702, "Title": "Ethanol", "CanonicalSMILES": "CCO"},
+    {"CID": 263, "Title": "1-Butanol", "CanonicalSMILES": "CCCCO"},
+    {"CID": 241, "Title": "Benzene", "CanonicalSMILES": "C1=CC=CC=C1"},
+]
+
+
+def _fp(*bits):
+    words = np.zeros(FP_WORDS, dtype=np.uint64)
+    for b in bits:
+        words[b // 64] |= np.uint64(1) << np.uint64(b % 64)
+    return words
+
+
+def test_tanimoto_top_k_over_blocks(tmp_path, monkeypatch):
+    rows = [(10, _fp(1, 2, 3, 4)), (11, _fp(1, 2, 3)), (12, _fp(900)), (13, _fp(1))]
+    rows += [(100 + i, _fp(500 + i)) for i in range(20)]
+    assert write_fingerprints(str(tmp_path / "fp"), rows) == 24
+
+    monkeypatch.setattr(sim, "_SCAN_ROWS", 5)  # several blocks, scored in parallel
+    index = FingerprintIndex(str(tmp_path / "fp"))
+    assert len(index) == 24
+    hits = index.search(_fp(1, 2, 3, 4), k=3)
+    assert hits == [(10, 1.0), (11, 0.75), (13, 0.25)]
+    assert index.search(_fp(1, 2, 3, 4), k=10, threshold=0.5) == hits[:2]
+    assert index.search(_fp(1000), k=3, workers=1) == []
+
+
+def test_search_similar_requires_store(tmp_path):
+    db = str(tmp_path / "master.db")
+    create_offline_db(db)
+    save_to_database(db, ROWS, list(ROWS[0]))
+    svc = SearchService(
+        master_db=db,
+        cache_db=str(tmp_path / "cache.db"),
+        cfg=SearchConfig(sources=["master"], cache_writes=False),
+    )
+    assert load_fingerprint_index(db) is None
+    with pytest.raises(MoleculeNotFound, match="molid db fingerprints"):
+        svc.search_similar("CCCO")
+
+
+def test_store_is_ignored_once_master_changes(tmp_path):
+    db = str(tmp_path / "master.db")
+    create_offline_db(db)
+    save_to_database(db, ROWS, list(ROWS[0]))
+    rows = [(702, _fp(1, 2)), (263, _fp(1, 3))]
+    write_fingerprints(fingerprint_dir(db), rows, sim._db_identity(db))
+    assert len(load_fingerprint_index(db)) == 2
+
+    save_to_database(db, [{"CID": 5, "Title": "New"}], ["CID", "Title"])
+    assert load_fingerprint_index(db) is None
+
+
+@pytest.mark.skipif(
+    not has_openbabel,
+    reason="OpenBabel not installed; fingerprint similarity is optional",
+)
+def test_build_and_search_similar(tmp_path):
+    db = str(tmp_path / "master.db")
+    create_offline_db(db)
+    save_to_database(db, ROWS, list(ROWS[0]))
+    assert build_fingerprints(db) == 3
+    assert load_fingerprint_index(db).directory == fingerprint_dir(db)
+
+    svc = SearchService(
+        master_db=db,
+        cache_db=str(tmp_path / "cache.db"),
+        cfg=SearchConfig(sources=["master"], cache_writes=False),
+    )
+    records, source = svc.search_similar("CCO", k=2)
+    assert source == "master"
+    assert records[0]["CID"] == 702 and records[0]["Similarity"] == 1.0
+    assert len(records) == 2 and records[1]["Similarity"] < 1.0
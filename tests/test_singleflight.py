@@ -0,0 +1,104 @@
+import threading
+import time
+
+import pytest
+
+import molid.search.service as svc_mod
+from molid.search.service import SearchConfig, SearchService
+from molid.utils.singleflight import SingleFlight
+
+
+def _run_concurrently(n, fn):
+    barrier = threading.Barrier(n)
+    out, errors = [None] * n, [None] * n
+
+    def worker(i):
+        barrier.wait()
+        try:
+            out[i] = fn()
+        except RuntimeError as e:  # the error the shared call raises
+            errors[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return out, errors
+
+
+def test_singleflight_shares_result_and_errors():
+    sf = SingleFlight()
+    calls = []
+
+    def slow(x):
+        calls.append(x)
+        time.sleep(0.1)
+        return x * 2
+
+    out, errors = _run_concurrently(6, lambda: sf.do("k", slow, 21))
+    assert out == [42] * 6 and errors == [None] * 6
+    assert len(calls) == 1 and sf.in_flight() == 0
+
+    def boom():
+        time.sleep(0.1)
+        raise RuntimeError("down")
+
+    out, errors = _run_concurrently(4, lambda: sf.do("k", boom))
+    assert all(isinstance(e, RuntimeError) for e in errors)
+    # Nothing is cached after completion
+    assert sf.do("k", lambda: "fresh") == "fresh"
+
+
+def test_concurrent_api_lookups_fetch_once(monkeypatch, tmp_path):
+    calls = []
+
+    def fake_fetch(id_type, id_value):
+        calls.append(id_value)
+        time.sleep(0.1)
+        return [{"CID": 280}]
+
+    monkeypatch.setattr(svc_mod, "_is_writable_dir", lambda p: True)
+    monkeypatch.setattr(svc_mod, "fetch_molecule_data", fake_fetch)
+    svc = SearchService(
+        master_db=str(tmp_path / "m.db"),
+        cache_db=str(tmp_path / "c.db"),
+        cfg=SearchConfig(sources=["api"], cache_writes=False),
+    )
+    out, errors = _run_concurrently(
+        8, lambda: svc.search({"inchikey": "CURLTUGMZLYLDI-UHFFFAOYSA-N"})
+    )
+    assert errors == [None] * 8
+    assert all(r == ([{"CID": 280}], "API") for r in out)
+    assert len(calls) == 1
+    with pytest.raises(svc_mod.MoleculeNotFound):
+        monkeypatch.setattr(svc_mod, "fetch_molecule_data", lambda *a: [])
+        svc.search({"inchikey": "CURLTUGMZLYLDI-UHFFFAOYSA-N"})
+
+
+def test_coalesced_callers_get_their_own_records(monkeypatch, tmp_path):
+    calls = []
+
+    def fake_fetch(id_type, id_value):
+        calls.append(id_value)
+        time.sleep(0.1)
+        return [{"CID": 280}]
+
+    monkeypatch.setattr(svc_mod, "_is_writable_dir", lambda p: True)
+    monkeypatch.setattr(svc_mod, "fetch_molecule_data", fake_fetch)
+    svc = SearchService(
+        master_db=str(tmp_path / "m.db"),
+        cache_db=str(tmp_path / "c.db"),
+        cfg=SearchConfig(sources=["api"], cache_writes=False),
+    )
+
+    def search_and_mutate():
+        (rec,), _ = svc.search({"inchikey": "CURLTUGMZLYLDI-UHFFFAOYSA-N"})
+        rec["Owner"] = threading.get_ident()
+        time.sleep(0.05)  # let the other callers mutate theirs
+        return rec
+
+    out, errors = _run_concurrently(4, search_and_mutate)
+    assert errors == [None] * 4 and len(calls) == 1
+    assert len({id(r) for r in out}) == 4
+    assert len({r["Owner"] for r in out}) == 4